@@ -3,10 +3,47 @@ Flask API Server for Indian Sign Language Converter
 Serves the web application and provides API endpoints for GIF files
 """
 
-from flask import Flask, send_file, jsonify, send_from_directory
+from flask import (Flask, g, has_request_context, request, send_file, jsonify, send_from_directory,
+                   stream_with_context)
 from flask_cors import CORS
+from contextlib import nullcontext
+import atexit
+import base64
+import hashlib
+import io
+import json
+import mimetypes
 import os
+import time
 from pathlib import Path
+from urllib.parse import quote
+
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
+from werkzeug.http import is_resource_modified
+
+from asset_index import AssetIndex, letter_url, phrase_url
+from asset_store import DEFAULT_PACK_NAME, PackedAssetStore
+from frame_schedule import FrameSchedule
+from metrics import MetricsRegistry, RequestTimer
+from plan_cache import PlanCache, UsageLog
+from sign_planner import (DEFAULT_LETTER_DURATION_MS, MAX_LETTER_DURATION_MS, MIN_LETTER_DURATION_MS,
+                          iter_plan_steps, plan_sentence, plan_summary, tokenize)
+
+try:
+    from gif_frames import frame_cache
+    from letter_bundle import (DEFAULT_SPRITE_CELL, SPRITE_COLUMNS, SPRITE_FORMATS, LetterBundler,
+                               sprite_layout, sprite_size)
+    from renditions import (KIND_LETTERS, KIND_PHRASES, PREBUILT_DIRS, RENDITION_MIMETYPES, RenditionStore,
+                            pick_rendition, rendition_suffix, snap_width)
+    from sentence_renderer import (DEFAULT_RENDER_SIZE, MAX_RENDER_SIZE, MAX_RENDER_TEXT_CHARS, RENDER_FORMATS,
+                                   RenderCache, RenderError, render_plan)
+except ImportError:  # Pillow not installed: /api/render and resized renditions are disabled
+    frame_cache = None
+    render_plan = None
+    RenditionStore = None
+    LetterBundler = None
+    KIND_LETTERS, KIND_PHRASES = "letters", "phrases"
+    PREBUILT_DIRS = ()
 
 app = Flask(__name__, static_folder='.', static_url_path='')
 CORS(app)  # Enable CORS for all routes
@@ -14,7 +51,210 @@ CORS(app)  # Enable CORS for all routes
 # Configuration
 ISL_GIFS_DIR = "ISL_Gifs"  # For phrase/word/sentence GIFs
 LETTERS_DIR = "letters"    # For individual letter images
-BASE_DIR = Path(__file__).parent
+BASE_DIR = Path(os.environ.get('ISL_BASE_DIR') or Path(__file__).parent)  # asset root (benchmarks point it elsewhere)
+PHRASE_ALIASES_FILE = os.environ.get('ISL_PHRASE_ALIASES', 'phrase_aliases.json')  # extra names for phrase GIFs
+
+# Production file offload (see DEPLOYMENT.md): nginx X-Accel-Redirect, or X-Sendfile for Apache/lighttpd
+ACCEL_REDIRECT_PREFIX = os.environ.get('ISL_ACCEL_REDIRECT', '')  # e.g. "/_assets/"
+app.config['USE_X_SENDFILE'] = os.environ.get('ISL_X_SENDFILE', '') == '1'
+
+# Scan asset directories once; a background thread rescans on directory (or alias manifest) mtime change
+asset_index = AssetIndex(BASE_DIR, ISL_GIFS_DIR, LETTERS_DIR, aliases_file=PHRASE_ALIASES_FILE or None,
+                         rendition_dirs=PREBUILT_DIRS)
+asset_index.refresh(force=True)
+asset_index.start()
+
+# Optional packed copy of every asset, memory-mapped once and shared by all workers (see asset_store.py)
+ASSET_PACK_PATH = BASE_DIR / os.environ.get('ISL_ASSET_PACK', DEFAULT_PACK_NAME)
+asset_store = PackedAssetStore(ASSET_PACK_PATH) if ASSET_PACK_PATH.is_file() else None
+
+# Sign plans by normalized text, dropped whenever the index changes; the most frequent
+# inputs are logged to disk (ISL_PLAN_USAGE_LOG, empty to disable) and re-planned at startup
+PLAN_USAGE_LOG = os.environ.get('ISL_PLAN_USAGE_LOG', 'plan_usage.json')
+plan_cache = PlanCache(usage_log=UsageLog(BASE_DIR / PLAN_USAGE_LOG) if PLAN_USAGE_LOG else None)
+asset_index.add_listener(plan_cache.invalidate)
+if plan_cache.usage_log is not None:
+    atexit.register(plan_cache.usage_log.flush)
+
+# Rendered sentence animations, keyed by normalized text and render options
+render_cache = RenderCache() if render_plan else None
+
+# Resized / re-encoded assets (?w=240&fmt=webp): pre-built or generated into a bounded disk cache
+rendition_store = RenditionStore(BASE_DIR, asset_index) if RenditionStore else None
+
+# The whole alphabet in one response (sprite sheet + coordinate map, or zip), rebuilt when a letter changes
+letter_bundler = LetterBundler(asset_index) if LetterBundler else None
+
+# Largest asset /api/translate/stream embeds as a data: URI with ?inline=1 (bigger ones are sent by URL)
+INLINE_MAX_BYTES = 512 * 1024
+
+# Page size for /api/phrase/list when no ?limit= is given
+DEFAULT_LIST_LIMIT = 100
+
+# Fingerprinted URLs (?v=<content hash>) never change content, so they can be cached for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Request metrics, exposed at /api/metrics in Prometheus text format; with
+# ISL_METRICS_DIR set, every worker process snapshots into it and a scrape merges them
+metrics = MetricsRegistry(shared_dir=os.environ.get('ISL_METRICS_DIR') or None)
+request_latency = metrics.histogram('isl_request_duration_seconds',
+                                    'Time to build the response, by route', ('route', 'method'))
+requests_total = metrics.counter('isl_requests_total', 'Requests by route and status', ('route', 'status'))
+response_bytes = metrics.counter('isl_response_bytes_total', 'Response body bytes by route', ('route',))
+span_latency = metrics.histogram('isl_span_duration_seconds', 'Time spent in request phases', ('span',))
+asset_lookups = metrics.counter('isl_asset_lookups_total',
+                                'Letter/phrase lookups by outcome (exact, partial, fuzzy, miss)',
+                                ('kind', 'result'))
+missed_phrases = metrics.top_misses('isl_phrase_misses', 'Most frequently missed phrases (approximate)')
+
+def collect_cache_metrics():
+    """Cache and index stats, read when /api/metrics is scraped"""
+    caches = {'plans': plan_cache, 'render': render_cache, 'frames': frame_cache,
+              'renditions': rendition_store, 'letter_bundles': letter_bundler, 'asset_pack': asset_store}
+    stats = {name: cache.stats() for name, cache in caches.items() if cache is not None}
+    yield ('isl_cache_hits_total', 'counter', 'Cache hits',
+           [({'cache': name}, s['hits']) for name, s in stats.items()])
+    yield ('isl_cache_misses_total', 'counter', 'Cache misses',
+           [({'cache': name}, s['misses']) for name, s in stats.items()])
+    yield ('isl_cache_hit_ratio', 'gauge', 'Cache hits / lookups since start',
+           [({'cache': name}, round(s['hits'] / (s['hits'] + s['misses']), 4))
+            for name, s in stats.items() if s['hits'] + s['misses']])
+    yield ('isl_cache_bytes', 'gauge', 'Bytes held by each cache',
+           [({'cache': name}, s['bytes']) for name, s in stats.items()])
+    index = asset_index.stats()
+    yield ('isl_index_entries', 'gauge', 'Indexed assets',
+           [({'kind': 'phrases'}, index['phrases']), ({'kind': 'letters'}, index['letters'])])
+    yield ('isl_index_generation', 'gauge', 'Asset index rebuilds since start', [({}, index['generation'])])
+
+metrics.add_collector(collect_cache_metrics)
+metrics.start()
+
+@app.before_request
+def start_request_timer():
+    g.timer = RequestTimer()
+
+@app.after_request
+def record_request_metrics(response):
+    """Latency, status and bytes per route; spans also go out as a Server-Timing header"""
+    timer = g.pop('timer', None)
+    if timer is None:
+        return response
+    total = timer.elapsed()
+    # the URL rule (not the raw path) keeps label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    request_latency.observe(total, route, request.method)
+    requests_total.inc(route, str(response.status_code))
+    if response.content_length:
+        response_bytes.inc(route, amount=response.content_length)
+    for name, seconds in timer.spans:
+        span_latency.observe(seconds, name)
+    response.headers['Server-Timing'] = timer.server_timing(total)
+    return response
+
+def timed(name):
+    """Record a timing span for the current request (no-op outside a request)"""
+    timer = g.get('timer') if has_request_context() else None
+    return timer.span(name) if timer is not None else nullcontext()
+
+class RenditionRequestError(ValueError):
+    """Invalid ?w= / ?fmt= parameters"""
+
+def choose_rendition():
+    """
+    Pick the rendition for a request from ?w=, ?fmt= and the Accept header
+    ?w= is rounded up to a configured rendition width; ?fmt= wins over Accept,
+    which selects WebP only when the client lists image/webp explicitly
+    Returns (width, fmt, negotiated); fmt is None to send the original file and
+    negotiated means the choice depended on Accept (so responses need Vary)
+    """
+    width = request.args.get('w')
+    fmt = request.args.get('fmt')
+    if rendition_store is None:
+        if width is not None or fmt:
+            raise RenditionRequestError('Renditions require Pillow (pip install Pillow)')
+        return None, None, False
+    accepts_webp = any(value == 'image/webp' for value, quality in request.accept_mimetypes if quality > 0)
+    try:
+        return pick_rendition(width, fmt, accepts_webp)
+    except ValueError as e:
+        raise RenditionRequestError(str(e))
+
+def accel_redirect(path, mimetype, etag, last_modified):
+    """
+    Empty response telling nginx to send the file itself (X-Accel-Redirect)
+    The internal location ACCEL_REDIRECT_PREFIX must alias BASE_DIR
+    """
+    relpath = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+    response = app.response_class(
+        mimetype=mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    )
+    response.headers['X-Accel-Redirect'] = ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + quote(relpath)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # nginx answers Range requests itself; only 304s are decided here
+    return response.make_conditional(request)
+
+def send_packed(view, mimetype, etag, last_modified):
+    """
+    Response for an asset held in the packed store: no open/stat/read per request
+    304s are decided before touching the bytes; WSGI needs bytes, so the slice
+    of the shared mapping is copied once into the body
+    """
+    response = app.response_class(mimetype=mimetype)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    if not is_resource_modified(request.environ, etag=etag, last_modified=response.last_modified):
+        response.status_code = 304
+        return response
+    response.set_data(view.tobytes())
+    return response.make_conditional(request, accept_ranges=True, complete_length=len(view))
+
+def send_asset(entry, mimetype=None, kind=None):
+    """
+    Send an indexed asset with a content-hash ETag and Last-Modified
+    Handles If-None-Match / If-Modified-Since (304) and Range (206) requests;
+    fingerprinted requests are marked immutable, others must revalidate
+    With kind set, ?w= / ?fmt= / Accept select a resized rendition instead
+    """
+    # a file rewritten in place must not keep its old ETag, fingerprint or renditions
+    entry = asset_index.revalidate(entry)
+    if entry is None:
+        return jsonify({'error': 'File no longer exists'}), 404
+    path, etag, negotiated = entry.path, entry.content_hash, False
+    if kind is not None:
+        width, fmt, negotiated = choose_rendition()
+        if fmt is not None:
+            with timed('rendition'):
+                path = rendition_store.get(entry, kind, width, fmt)
+            etag = f'{entry.content_hash}-{rendition_suffix(width, fmt)}'
+            mimetype = RENDITION_MIMETYPES[fmt]
+    # nginx sends files itself; otherwise originals come from the packed store when it has them
+    packed = None
+    if asset_store is not None and path == entry.path and not ACCEL_REDIRECT_PREFIX:
+        packed = asset_store.get(entry)
+    if ACCEL_REDIRECT_PREFIX:
+        response = accel_redirect(path, mimetype, etag, entry.mtime)
+    elif packed is not None:
+        response = send_packed(packed, mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream',
+                               etag, entry.mtime)
+    else:
+        response = send_file(
+            path,
+            mimetype=mimetype,
+            etag=etag,
+            last_modified=entry.mtime,
+            conditional=True,
+        )
+    if negotiated:
+        response.vary.add('Accept')
+    response.cache_control.public = True
+    if request.args.get('v') == entry.content_hash:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
 
 @app.route('/')
 def index():
@@ -29,28 +269,28 @@ def get_letter_image(letter):
     """
     letter = letter.lower()  # Normalize to lowercase (letters folder uses lowercase)
     
-    # Try different file formats
-    possible_paths = [
-        os.path.join(LETTERS_DIR, f"{letter}.jpg"),
-        os.path.join(LETTERS_DIR, f"{letter}.png"),
-        os.path.join(LETTERS_DIR, f"{letter}.gif"),
-        os.path.join(LETTERS_DIR, f"{letter.upper()}.jpg"),
-        os.path.join(LETTERS_DIR, f"{letter.upper()}.png"),
-        os.path.join(LETTERS_DIR, f"{letter.upper()}.gif"),
-    ]
-    
-    for path in possible_paths:
-        full_path = BASE_DIR / path
-        if full_path.exists():
-            try:
-                return send_file(str(full_path))
-            except Exception as e:
-                return jsonify({
-                    'error': f'Error serving file: {str(e)}',
-                    'path': path
-                }), 500
+    with timed('lookup'):
+        entry = asset_index.find_letter(letter)
+    asset_lookups.inc('letter', 'exact' if entry is not None else 'miss')
+    if entry is not None:
+        try:
+            return send_asset(entry, kind=KIND_LETTERS)
+        except RenditionRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        except RequestedRangeNotSatisfiable:
+            raise  # 416, not a server error
+        except Exception as e:
+            return jsonify({
+                'error': f'Error serving file: {str(e)}',
+                'path': entry.relpath
+            }), 500
     
     # File not found
+    possible_paths = [
+        os.path.join(LETTERS_DIR, f"{name}{ext}")
+        for name in (letter, letter.upper())
+        for ext in ('.jpg', '.png', '.gif')
+    ]
     return jsonify({
         'error': f'Letter image not found: {letter}',
         'searched_paths': possible_paths
@@ -70,6 +310,7 @@ def get_phrase_gif(phrase):
     API endpoint to get GIF for a phrase/word/sentence (Video-like format)
     Searches ISL_Gifs folder for matching GIF files
     Returns GIF that plays automatically like a video
+    Query: ?fuzzy=1 allows an n-gram similarity match when no partial match exists
     """
     phrase_clean = phrase.strip().lower()
     
@@ -81,114 +322,499 @@ def get_phrase_gif(phrase):
         phrase_clean.replace(' ', ''),   # No spaces
     ]
     
-    # Try with .gif extension
-    for variant in variations:
-        gif_path = os.path.join(ISL_GIFS_DIR, f"{variant}.gif")
-        full_path = BASE_DIR / gif_path
-        if full_path.exists():
-            try:
-                # Set proper headers for GIF/video-like playback
-                response = send_file(str(full_path))
-                response.headers['Content-Type'] = 'image/gif'
-                response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-                response.headers['Pragma'] = 'no-cache'
-                response.headers['Expires'] = '0'
-                return response
-            except Exception as e:
-                return jsonify({
-                    'error': f'Error serving file: {str(e)}',
-                    'path': gif_path
-                }), 500
-    
-    # If exact match not found, try partial matching
-    if os.path.isdir(ISL_GIFS_DIR):
-        words = phrase_clean.split()
-        for filename in os.listdir(ISL_GIFS_DIR):
-            if not filename.lower().endswith('.gif'):
-                continue
-            filename_no_ext = os.path.splitext(filename)[0].lower()
-            # Check if all words in phrase are in filename
-            if all(word in filename_no_ext for word in words if word):
-                gif_path = os.path.join(ISL_GIFS_DIR, filename)
-                full_path = BASE_DIR / gif_path
-                if full_path.exists():
-                    try:
-                        response = send_file(str(full_path))
-                        response.headers['Content-Type'] = 'image/gif'
-                        return response
-                    except Exception as e:
-                        continue
+    with timed('lookup'):
+        entry = asset_index.find_phrase(phrase_clean)
+    if entry is not None:
+        asset_lookups.inc('phrase', 'exact')
+        try:
+            # GIF plays like a video; validators let replays skip the download
+            return send_asset(entry, mimetype='image/gif', kind=KIND_PHRASES)
+        except RenditionRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        except RequestedRangeNotSatisfiable:
+            raise  # 416, not a server error
+        except Exception as e:
+            return jsonify({
+                'error': f'Error serving file: {str(e)}',
+                'path': entry.relpath
+            }), 500
+    
+    # If exact match not found, try partial (and optionally fuzzy) matching
+    fuzzy = request.args.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+    with timed('match'):
+        candidate, match_kind = asset_index.match_phrase(phrase_clean, fuzzy=fuzzy)
+    asset_lookups.inc('phrase', match_kind or 'miss')
+    if candidate is None:
+        missed_phrases.add(phrase_clean)
+    else:
+        try:
+            response = send_asset(candidate, mimetype='image/gif', kind=KIND_PHRASES)
+            response.headers['X-Match-Type'] = match_kind
+            return response
+        except RenditionRequestError as e:
+            return jsonify({'error': str(e)}), 400
+        except (OSError, ValueError) as e:
+            # unreadable file or failed rendition: answer as if there were no match
+            print(f"Error serving partial match {candidate.relpath} for '{phrase_clean}':", e)
     
     # File not found
     return jsonify({
         'error': f'GIF not found for phrase: {phrase}',
         'searched_variations': variations,
-        'suggestion': 'Try checking available phrases with /api/phrase/list'
+        'suggestion': 'Try /api/phrase/suggest?q=... or /api/phrase/list',
+        'suggestions': [entry.name for entry, _ in asset_index.suggest(phrase_clean, limit=5)]
     }), 404
 
 @app.route('/api/phrase/list')
 def list_available_phrases():
-    """API endpoint to list all available phrase/word GIFs"""
-    phrases = []
-    
-    if not os.path.isdir(ISL_GIFS_DIR):
+    """
+    API endpoint to list available phrase/word GIFs, one page at a time
+    Query: limit (default 100, max 1000), cursor (next_cursor of the previous page),
+    prefix (start of the phrase), q (every word must appear in the phrase)
+    The listing is precomputed per index snapshot; responses carry an ETag
+    """
+    if not asset_index.phrases_dir_exists:
         return jsonify({
             'error': f'Directory {ISL_GIFS_DIR} not found',
             'phrases': []
         }), 404
     
-    # List all GIF files (excluding letter files)
-    for filename in os.listdir(ISL_GIFS_DIR):
-        if filename.lower().endswith('.gif'):
-            # Skip single letter files (they're in letters/ folder)
-            name_no_ext = os.path.splitext(filename)[0]
-            if len(name_no_ext) > 1 or not name_no_ext.isalpha():
-                phrases.append({
-                    'phrase': name_no_ext,
-                    'filename': filename,
-                    'url': f'/api/phrase/{name_no_ext}'
-                })
+    try:
+        limit = int(request.args.get('limit', DEFAULT_LIST_LIMIT))
+    except ValueError:
+        return jsonify({'error': f"Invalid limit: {request.args.get('limit')}"}), 400
+    prefix = request.args.get('prefix', '')
+    contains = request.args.get('q', '')
+    cursor = request.args.get('cursor', '')
     
-    return jsonify({
-        'phrases': sorted(phrases, key=lambda x: x['phrase']),
-        'count': len(phrases)
+    # Same snapshot + same query = same body, so answer revalidations before building it
+    query_hash = hashlib.blake2b(request.query_string, digest_size=6).hexdigest()
+    etag = f'{asset_index.listing_etag}-{query_hash}'
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    with timed('list'):
+        try:
+            entries, next_cursor, total, listing_etag = asset_index.list_phrases(
+                prefix=prefix, contains=contains, cursor=cursor, limit=limit)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        phrases = [{
+            'phrase': entry.name,
+            'filename': entry.filename,
+            'url': phrase_url(entry),
+            'etag': entry.content_hash
+        } for entry in entries]
+    
+    response = jsonify({
+        'phrases': phrases,
+        'count': len(phrases),
+        'total': total,
+        'next_cursor': next_cursor
+    })
+    response.set_etag(f'{listing_etag}-{query_hash}')
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/phrase/suggest')
+def suggest_phrases():
+    """
+    API endpoint for type-ahead phrase suggestions
+    Query: q (partially typed phrase), limit (default 10, max 20)
+    Completes from a prefix trie over every word start, then corrects typos
+    (small edit distance), then falls back to substring/fuzzy matches
+    """
+    query = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': f"Invalid limit: {request.args.get('limit')}"}), 400
+    
+    with timed('suggest'):
+        results = asset_index.suggest(query, limit=max(1, min(limit, 20)))
+    suggestions = [{
+        'phrase': entry.name,
+        'match': kind,
+        'url': phrase_url(entry)
+    } for entry, kind in results]
+    
+    response = jsonify({
+        'query': query,
+        'suggestions': suggestions,
+        'count': len(suggestions)
     })
+    response.cache_control.public = True
+    response.cache_control.max_age = 60
+    return response
+
+@app.route('/api/phrase/timing/<path:phrase>')
+def phrase_timing(phrase):
+    """
+    API endpoint for the frame timing of a phrase GIF
+    Per-frame delays and start offsets in ms, as browsers play them, so a web
+    client can sync captions or the next sign with the animation
+    Answered from the GIF headers without decoding; carries the GIF's ETag
+    """
+    entry = asset_index.find_phrase(phrase)
+    if entry is not None:
+        entry = asset_index.revalidate(entry)
+    if entry is None:
+        return jsonify({'error': f'GIF not found for phrase: {phrase}'}), 404
+    
+    # timing only changes with the file, so the GIF's own validator answers revalidations
+    if request.if_none_match.contains(entry.content_hash):
+        response = app.response_class(status=304)
+    else:
+        schedule = FrameSchedule(entry.frame_delays_ms)
+        response = jsonify({
+            'phrase': entry.name,
+            'url': phrase_url(entry),
+            'frame_count': len(schedule),
+            'frame_delays_ms': schedule.delays_ms,
+            'frame_starts_ms': schedule.starts_ms,
+            'duration_ms': schedule.loop_ms
+        })
+    response.set_etag(entry.content_hash)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/translate', methods=['GET', 'POST'])
+def translate_sentence():
+    """
+    API endpoint to plan a whole sentence in one round trip
+    Matches known phrases over the sentence and falls back to letters,
+    returning the ordered asset URLs and display durations
+    Body (POST JSON) or query (GET): text, letter_ms (optional)
+    """
+    payload = request.get_json(silent=True) or {}
+    text = payload.get('text', request.args.get('text', ''))
+    letter_ms = payload.get('letter_ms', request.args.get('letter_ms', DEFAULT_LETTER_DURATION_MS))
+    
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'Missing "text" to translate'}), 400
+    try:
+        letter_ms = parse_letter_ms(letter_ms)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    with timed('plan'):
+        plan = cached_plan(text, letter_ms)
+    return jsonify(plan)
+
+def parse_letter_ms(value):
+    """letter_ms from a request; ValueError unless it is an integer within the allowed range"""
+    try:
+        letter_ms = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Invalid letter_ms: {value}')
+    if not MIN_LETTER_DURATION_MS <= letter_ms <= MAX_LETTER_DURATION_MS:
+        raise ValueError(f'letter_ms must be between {MIN_LETTER_DURATION_MS} and {MAX_LETTER_DURATION_MS}')
+    return letter_ms
+
+def cached_plan(text, letter_ms):
+    """Sign plan for text, from the plan cache when the same normalized text was planned before"""
+    normalized = ' '.join(tokenize(text))
+    plan = plan_cache.get_or_compute(
+        (normalized, letter_ms),
+        lambda: plan_sentence(normalized, asset_index, letter_duration_ms=letter_ms))
+    return dict(plan, text=text)
+
+def warm_plan_cache():
+    """Plan the most frequently logged inputs before the first request"""
+    start = time.perf_counter()
+    warmed = plan_cache.warm(
+        lambda normalized: plan_sentence(normalized, asset_index, letter_duration_ms=DEFAULT_LETTER_DURATION_MS),
+        options=(DEFAULT_LETTER_DURATION_MS,))
+    if warmed:
+        print(f"Plan cache: warmed {warmed} frequent inputs in {time.perf_counter() - start:.2f}s")
+
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+def inline_asset(step, rendition):
+    """data: URI for a plan step's asset (or its rendition), or None if missing or too large"""
+    if step['type'] == 'phrase':
+        entry, kind = asset_index.find_phrase(step['text']), KIND_PHRASES
+    else:
+        entry, kind = asset_index.find_letter(step['text'].lower()), KIND_LETTERS
+    if entry is None:
+        return None
+    path, mimetype = entry.path, mimetypes.guess_type(entry.path)[0] or 'application/octet-stream'
+    width, fmt = rendition
+    if fmt is not None:
+        path = rendition_store.get(entry, kind, width, fmt)
+        mimetype = RENDITION_MIMETYPES[fmt]
+    if os.path.getsize(path) > INLINE_MAX_BYTES:
+        return None
+    with open(path, 'rb') as f:
+        return f'data:{mimetype};base64,{base64.b64encode(f.read()).decode("ascii")}'
+
+@app.route('/api/translate/stream', methods=['GET', 'POST'])
+def translate_sentence_stream():
+    """
+    API endpoint streaming a sentence's playback plan as Server-Sent Events
+    Each sign is pushed as a `step` event as soon as it is resolved, so a client
+    can start playing the first sign while the rest of a long text is planned
+    Body (POST JSON) or query (GET, for EventSource): text, letter_ms,
+    inline (1 = embed each asset as a data: URI the first time it appears), w, fmt
+    Events: start {text, normalized}, step {index, ...step}, end {count, ...}, error {error}
+    """
+    payload = request.get_json(silent=True) or {}
+    text = payload.get('text', request.args.get('text', ''))
+    letter_ms = payload.get('letter_ms', request.args.get('letter_ms', DEFAULT_LETTER_DURATION_MS))
+    inline = str(payload.get('inline', request.args.get('inline', ''))).lower() in ('1', 'true', 'yes')
+    
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'Missing "text" to translate'}), 400
+    try:
+        letter_ms = parse_letter_ms(letter_ms)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        width, fmt, _ = choose_rendition() if inline else (None, None, False)
+    except RenditionRequestError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    words = tokenize(text)
+    key = (' '.join(words), letter_ms)
+    plan_cache.note_use(key[0])
+    cached = plan_cache.get(key)
+    
+    def generate():
+        yield sse_event('start', {'text': text, 'normalized': key[0]})
+        steps = []
+        sent = set()  # assets already inlined in this stream
+        try:
+            planned = cached['steps'] if cached else iter_plan_steps(words, asset_index, letter_duration_ms=letter_ms)
+            for step in planned:
+                event = dict(step, index=len(steps))
+                if inline and step['url'] and step['url'] not in sent:
+                    event['data'] = inline_asset(step, (width, fmt))
+                    sent.add(step['url'])
+                steps.append(step)
+                yield sse_event('step', event)
+        except Exception as e:
+            yield sse_event('error', {'error': f'Error planning sentence: {str(e)}'})
+            return
+        if cached is None:
+            plan_cache.put(key, {'text': text, 'normalized': key[0], 'steps': steps, **plan_summary(steps)})
+        yield sse_event('end', plan_summary(steps))
+    
+    response = app.response_class(stream_with_context(generate()), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'  # nginx: pass events through as they are produced
+    return response
+
+@app.route('/api/render', methods=['GET', 'POST'])
+def render_sentence():
+    """
+    API endpoint to render a whole sentence as one animated GIF/WebP
+    Plans the sentence like /api/translate, then stitches the letter images and
+    phrase GIFs into a single downloadable animation (cached in memory)
+    Body (POST JSON) or query (GET): text, fmt (gif|webp), size, letter_ms, download
+    """
+    if render_plan is None:
+        return jsonify({'error': 'Rendering requires Pillow (pip install Pillow)'}), 501
+    
+    payload = request.get_json(silent=True) or {}
+    def param(name, default=None):
+        return payload.get(name, request.args.get(name, default))
+    
+    text = param('text', '')
+    fmt = str(param('fmt', 'gif')).lower()
+    if not isinstance(text, str) or not text.strip():
+        return jsonify({'error': 'Missing "text" to render'}), 400
+    if len(text) > MAX_RENDER_TEXT_CHARS:
+        return jsonify({'error': f'Text too long to render (max {MAX_RENDER_TEXT_CHARS} characters)'}), 400
+    if fmt not in RENDER_FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}', 'formats': sorted(RENDER_FORMATS)}), 400
+    try:
+        size = int(param('size', DEFAULT_RENDER_SIZE))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'size must be an integer'}), 400
+    if not 32 <= size <= MAX_RENDER_SIZE:
+        return jsonify({'error': f'size must be between 32 and {MAX_RENDER_SIZE}'}), 400
+    try:
+        letter_ms = parse_letter_ms(param('letter_ms', DEFAULT_LETTER_DURATION_MS))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    with timed('plan'):
+        plan = cached_plan(text, letter_ms)
+    key = (plan['normalized'], fmt, size, letter_ms, asset_index.generation)
+    cached = render_cache.get(key)
+    if cached is None:
+        try:
+            with timed('render'):
+                cached = render_cache.put(key, render_plan(plan, BASE_DIR, fmt=fmt, size=size))
+        except RenderError as e:
+            return jsonify({'error': str(e), 'text': text}), 422
+        except Exception as e:
+            return jsonify({'error': f'Error rendering sentence: {str(e)}'}), 500
+    data, etag = cached
+    
+    name = '_'.join(plan['normalized'].split())[:80] or 'sign'
+    response = send_file(
+        io.BytesIO(data),
+        mimetype=RENDER_FORMATS[fmt][1],
+        as_attachment=str(param('download', '')).lower() in ('1', 'true', 'yes'),
+        download_name=f'{name}.{fmt}',
+        etag=etag,
+        conditional=True,
+    )
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/letter/list')
 def list_available_letters():
     """API endpoint to list all available letter images"""
     available = {}
     
-    if not os.path.isdir(LETTERS_DIR):
+    if not asset_index.letters_dir_exists:
         return jsonify({
             'error': f'Directory {LETTERS_DIR} not found',
             'available': {}
         }), 404
     
-    # Check for each letter
+    letters = asset_index.letters()
     for letter in "abcdefghijklmnopqrstuvwxyz":
-        paths_to_check = [
-            f"{letter}.jpg",
-            f"{letter}.png",
-            f"{letter}.gif",
-        ]
-        
-        for filename in paths_to_check:
-            filepath = os.path.join(LETTERS_DIR, filename)
-            if os.path.exists(filepath):
-                available[letter.upper()] = {
-                    'letter': letter.upper(),
-                    'filename': filename,
-                    'path': filepath,
-                    'url': f'/api/letter/{letter}'
-                }
-                break
+        entry = letters.get(letter)
+        if entry is not None:
+            available[letter.upper()] = {
+                'letter': letter.upper(),
+                'filename': entry.filename,
+                'path': entry.relpath,
+                'url': letter_url(entry),
+                'etag': entry.content_hash
+            }
     
     return jsonify({
         'available': available,
         'count': len(available)
     })
 
+def bundle_cell():
+    """?cell= for the letter sprite, rounded up to a configured size (ValueError if invalid)"""
+    cell = request.args.get('cell', DEFAULT_SPRITE_CELL)
+    try:
+        cell = int(cell)
+    except ValueError:
+        raise ValueError(f'Invalid cell: {cell}')
+    if cell <= 0:
+        raise ValueError(f'Invalid cell: {cell}')
+    return snap_width(cell)
+
+def send_bundle(build, mimetype, etag, download_name=None):
+    """
+    Send an in-memory letter bundle with its ETag; revalidations are answered
+    before build() runs, and fingerprinted (?v=) requests are immutable
+    """
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+    else:
+        with timed('bundle'):
+            data = build()
+        response = send_file(
+            io.BytesIO(data),
+            mimetype=mimetype,
+            as_attachment=download_name is not None,
+            download_name=download_name,
+            etag=etag,
+            conditional=True,
+        )
+    response.cache_control.public = True
+    if request.args.get('v') == letter_bundler.signature():
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/letter/bundle')
+def letter_bundle_map():
+    """
+    API endpoint describing the letter sprite sheet: its fingerprinted URL and
+    where each letter sits in it, so a client can fetch the whole alphabet in
+    one image request and fingerspell without further requests
+    Query: cell (sprite cell size in px, default 240)
+    """
+    if letter_bundler is None:
+        return jsonify({'error': 'Letter bundles require Pillow (pip install Pillow)'}), 501
+    if not asset_index.letters_dir_exists:
+        return jsonify({'error': f'Directory {LETTERS_DIR} not found'}), 404
+    try:
+        cell = bundle_cell()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    letters = letter_bundler.letters()
+    signature = letter_bundler.signature(letters)
+    layout = sprite_layout(letters, cell)
+    width, height = sprite_size(cell)
+    response = jsonify({
+        'sprite': {
+            'url': f'/api/letter/sprite?cell={cell}&v={signature}',
+            'width': width,
+            'height': height,
+            'cell': cell,
+            'columns': SPRITE_COLUMNS
+        },
+        'letters': {letter.upper(): box for letter, box in layout.items()},
+        'count': len(layout),
+        'zip': f'/api/letter/bundle.zip?v={signature}',
+        'etag': signature
+    })
+    response.set_etag(f'{signature}-map{cell}')
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+@app.route('/api/letter/sprite')
+def letter_sprite():
+    """
+    API endpoint for the letter sprite sheet (every letter in one image, a-z grid)
+    Query: cell (default 240), fmt (webp|jpeg|png; default webp when the
+    client accepts it, else jpeg), v (fingerprint from /api/letter/bundle)
+    """
+    if letter_bundler is None:
+        return jsonify({'error': 'Letter bundles require Pillow (pip install Pillow)'}), 501
+    if not asset_index.letters_dir_exists:
+        return jsonify({'error': f'Directory {LETTERS_DIR} not found'}), 404
+    try:
+        cell = bundle_cell()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    fmt = request.args.get('fmt', '').lower()
+    if fmt and fmt not in SPRITE_FORMATS:
+        return jsonify({'error': f'Unsupported format: {fmt}', 'formats': sorted(SPRITE_FORMATS)}), 400
+    negotiated = not fmt
+    if negotiated:
+        accepts_webp = any(value == 'image/webp' for value, quality in request.accept_mimetypes if quality > 0)
+        fmt = 'webp' if accepts_webp else 'jpeg'
+    
+    response = send_bundle(lambda: letter_bundler.sprite(cell, fmt), SPRITE_FORMATS[fmt][1],
+                           letter_bundler.etag('sprite', cell, fmt))
+    if negotiated:
+        response.vary.add('Accept')
+    return response
+
+@app.route('/api/letter/bundle.zip')
+def letter_bundle_zip():
+    """API endpoint returning every original letter image plus manifest.json in one zip"""
+    if letter_bundler is None:
+        return jsonify({'error': 'Letter bundles require Pillow (pip install Pillow)'}), 501
+    if not asset_index.letters_dir_exists:
+        return jsonify({'error': f'Directory {LETTERS_DIR} not found'}), 404
+    return send_bundle(letter_bundler.zip, 'application/zip', letter_bundler.etag('zip'),
+                       download_name='isl_letters.zip')
+
 @app.route('/api/gif/list')
 def list_available_gifs():
     """API endpoint to list all available letter GIFs (deprecated - use /api/letter/list)"""
@@ -200,11 +826,24 @@ def health():
     return jsonify({
         'status': 'ok',
         'isl_gifs_dir': ISL_GIFS_DIR,
-        'isl_gifs_exists': os.path.isdir(ISL_GIFS_DIR),
+        'isl_gifs_exists': asset_index.phrases_dir_exists,
         'letters_dir': LETTERS_DIR,
-        'letters_exists': os.path.isdir(LETTERS_DIR)
+        'letters_exists': asset_index.letters_dir_exists,
+        'index': asset_index.stats(),
+        'plan_cache': plan_cache.stats(),
+        'render_cache': render_cache.stats() if render_cache else None,
+        'frame_cache': frame_cache.stats() if frame_cache else None,
+        'renditions': rendition_store.stats() if rendition_store else None,
+        'letter_bundles': letter_bundler.stats() if letter_bundler else None,
+        'asset_pack': asset_store.stats() if asset_store else None
     })
 
+@app.route('/api/metrics')
+def metrics_endpoint():
+    """Prometheus-style metrics: per-route latency histograms, lookup outcomes,
+    cache hit ratios, most missed phrases and request phase timings"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 # Serve static files (CSS, JS)
 @app.route('/<path:path>')
 def serve_static(path):
@@ -213,22 +852,34 @@ def serve_static(path):
         return send_file(path)
     return jsonify({'error': 'File not found'}), 404
 
+# Runs at import, so with gunicorn's preload_app the workers fork with a warm cache
+warm_plan_cache()
+
 if __name__ == '__main__':
     print("=" * 50)
     print("Indian Sign Language Converter - API Server")
     print("=" * 50)
     print(f"ISL GIFs Directory: {ISL_GIFS_DIR}")
     print(f"Directory exists: {os.path.isdir(ISL_GIFS_DIR)}")
+    print(f"Asset pack: {ASSET_PACK_PATH if asset_store else 'none (python asset_store.py to build one)'}")
     print()
     print("Server starting on: http://localhost:5000")
     print("API Endpoints:")
     print("  - GET /                        → Main application")
-    print("  - GET /api/letter/<letter>     → Get letter image from letters/ folder")
+    print("  - GET /api/letter/<letter>     → Get letter image from letters/ folder (?w=240&fmt=webp)")
     print("  - GET /api/letter/list         → List all available letters")
-    print("  - GET /api/phrase/<phrase>     → Get GIF for phrase/word/sentence")
-    print("  - GET /api/phrase/list         → List all available phrases")
+    print("  - GET /api/letter/bundle       → Letter sprite sheet map (+ /api/letter/sprite, /api/letter/bundle.zip)")
+    print("  - GET /api/phrase/<phrase>     → Get GIF for phrase/word/sentence (?w=240&fmt=webp)")
+    print("  - GET /api/phrase/list         → List available phrases (paged, ?prefix= / ?q=)")
+    print("  - GET /api/phrase/suggest?q=   → Type-ahead phrase suggestions")
+    print("  - GET /api/phrase/timing/<p>   → Per-frame delays of a phrase GIF")
+    print("  - POST /api/translate          → Plan a sentence (phrases + letters)")
+    print("  - GET /api/translate/stream    → Stream the plan as Server-Sent Events, one sign at a time")
+    print("  - GET /api/render?text=...     → Whole sentence as one GIF/WebP")
     print("  - GET /api/health              → Health check")
+    print("  - GET /api/metrics             → Prometheus metrics")
     print()
+    print("Development server only - for production see DEPLOYMENT.md (gunicorn / waitress / uvicorn)")
     print("Press Ctrl+C to stop the server")
     print("=" * 50)
     
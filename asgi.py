@@ -0,0 +1,304 @@
+"""
+ASGI entry point for the ISL Converter API (optional async variant)
+Serves the letter and phrase asset routes natively: a slow client streaming
+a large GIF costs one coroutine instead of tying up a worker thread, and file
+reads run in a thread pool (or are handed to the server with the ASGI
+pathsend extension where supported, or come straight from the packed asset
+store when one is built). Single-range requests get a 206 like the Flask
+routes. Every other route is passed to the Flask app through asgiref's WSGI
+adapter.
+
+Run: uvicorn asgi:app --workers 4   (pip install -r requirements-prod.txt)
+"""
+
+import asyncio
+import json
+import mimetypes
+import os
+import time
+from email.utils import formatdate
+from urllib.parse import parse_qs
+
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_date, parse_range_header
+
+from app import (IMMUTABLE_MAX_AGE, KIND_LETTERS, KIND_PHRASES, LETTERS_DIR, RenditionRequestError,
+                 app as flask_app, asset_index, asset_lookups, asset_store, metrics, missed_phrases,
+                 rendition_store, request_latency, requests_total)
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # only the asset routes are served without it
+    WsgiToAsgi = None
+
+try:
+    from renditions import RENDITION_MIMETYPES, pick_rendition, rendition_suffix
+except ImportError:  # Pillow not installed: originals only
+    pick_rendition = None
+
+CHUNK_SIZE = 256 * 1024
+ASSET_ENDPOINTS = {'get_letter_image', 'get_gif', 'get_phrase_gif'}
+
+asset_index.warm()
+wsgi_app = WsgiToAsgi(flask_app) if WsgiToAsgi else None
+_url_adapter = flask_app.url_map.bind('localhost')
+_asset_rules = {endpoint: next(flask_app.url_map.iter_rules(endpoint)).rule for endpoint in ASSET_ENDPOINTS}
+
+
+class AssetRequest:
+    """The bits of an ASGI HTTP scope the asset routes need."""
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.method = scope['method']
+        self.args = {k: v[0] for k, v in parse_qs(scope['query_string'].decode('latin-1')).items()}
+        self.headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope['headers']}
+
+    def accepts_webp(self):
+        for part in self.headers.get('accept', '').split(','):
+            value, _, params = part.strip().partition(';')
+            if value.strip() == 'image/webp' and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+                return True
+        return False
+
+    def etag_matches(self, etag):
+        header = self.headers.get('if-none-match')
+        if not header:
+            return False
+        tags = [t.strip().removeprefix('W/').strip('"') for t in header.split(',')]
+        return '*' in tags or etag in tags
+
+    def byte_range(self, etag, mtime, size):
+        """(start, stop) of a single satisfiable Range, None to send everything, or False for a 416.
+
+        Same rules as werkzeug: an If-Range that no longer matches the file
+        means the whole file, and several ranges are not supported.
+        """
+        header = self.headers.get('range')
+        if not header or not size:
+            return None
+        if_range = self.headers.get('if-range', '').strip()
+        if if_range:
+            if if_range.startswith(('"', 'W/')):
+                if if_range.strip('"') != etag:  # strong comparison: weak tags never match
+                    return None
+            else:
+                date = parse_date(if_range)
+                if date is None or int(mtime) > date.timestamp():
+                    return None
+        parsed = parse_range_header(header)
+        span = parsed.range_for_length(size) if parsed is not None else None
+        return span if span is not None else False
+
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode('utf-8')
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json'),
+                            (b'content-length', str(len(body)).encode()),
+                            (b'access-control-allow-origin', b'*'), *headers]})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def _prepare_asset(entry, kind, width, fmt):
+    """The blocking half of send_asset, run in the thread pool: revalidation, hashing, renditions, size.
+
+    Returns (entry, path, etag, packed bytes or None, size), or None if the file is gone.
+    """
+    entry = asset_index.revalidate(entry)
+    if entry is None:
+        return None
+    path, etag = entry.path, entry.content_hash
+    if fmt is not None:
+        path = rendition_store.get(entry, kind, width, fmt)
+        etag = f'{entry.content_hash}-{rendition_suffix(width, fmt)}'
+    packed = asset_store.get(entry) if asset_store is not None and path == entry.path else None
+    size = len(packed) if packed is not None else os.path.getsize(path)
+    return entry, path, etag, packed, size
+
+
+def _open_at(path, offset):
+    f = open(path, 'rb')
+    if offset:
+        f.seek(offset)
+    return f
+
+
+async def send_asset(req, send, entry, mimetype=None, kind=None, extra_headers=(), passthrough=()):
+    """Async counterpart of app.send_asset: same renditions, ETags, cache headers, Range and errors.
+
+    Nothing touches the filesystem on the event loop; a failure before the
+    response starts is the same 500 JSON body the Flask routes send, except
+    for exception types in passthrough, which are raised to the caller.
+    """
+    loop = asyncio.get_running_loop()
+    width, fmt, negotiated = None, None, False
+    if kind is not None and rendition_store is not None:
+        try:
+            width, fmt, negotiated = pick_rendition(req.args.get('w'), req.args.get('fmt'), req.accepts_webp())
+        except ValueError as e:
+            raise RenditionRequestError(str(e))
+    elif req.args.get('w') or req.args.get('fmt'):
+        raise RenditionRequestError('Renditions require Pillow (pip install Pillow)')
+
+    relpath = entry.relpath
+    f = None  # opened last in the try block, so nothing after open() can fail there
+    try:
+        prepared = await loop.run_in_executor(None, _prepare_asset, entry, kind, width, fmt)
+        if prepared is None:
+            return await send_json(send, 404, {'error': 'File no longer exists'})
+        entry, path, etag, packed, size = prepared
+        if fmt is not None:
+            mimetype = RENDITION_MIMETYPES[fmt]
+
+        if req.args.get('v') == entry.content_hash:
+            cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            cache_control = 'public, no-cache'
+        headers = [
+            (b'etag', f'"{etag}"'.encode()),
+            (b'last-modified', formatdate(entry.mtime, usegmt=True).encode()),
+            (b'cache-control', cache_control.encode()),
+            (b'access-control-allow-origin', b'*'),
+        ]
+        # ASGI header names must be lowercase
+        headers += [(k.lower().encode(), v.encode()) for k, v in extra_headers]
+        if negotiated:
+            headers.append((b'vary', b'Accept'))
+
+        not_modified = req.etag_matches(etag)
+        span = None if not_modified else req.byte_range(etag, entry.mtime, size)
+        start, length = span if span else (0, size)
+        if span:
+            length -= start
+        # the server's pathsend always sends the whole file
+        pathsend = span is None and 'http.response.pathsend' in req.scope.get('extensions', {})
+        if not not_modified and span is not False and req.method != 'HEAD' and packed is None and not pathsend:
+            f = await loop.run_in_executor(None, _open_at, path, start)
+    except passthrough:
+        raise
+    except Exception as e:
+        return await send_json(send, 500, {'error': f'Error serving file: {str(e)}', 'path': relpath})
+
+    if not_modified:
+        await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if span is False:
+        return await send_json(send, 416, {'error': 'Requested range not satisfiable'},
+                               headers=[(b'content-range', f'bytes */{size}'.encode())])
+
+    status = 200
+    headers.append((b'accept-ranges', b'bytes'))
+    if span:
+        status = 206
+        headers.append((b'content-range', f'bytes {start}-{start + length - 1}/{size}'.encode()))
+    mimetype = mimetype or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    headers += [(b'content-type', mimetype.encode()), (b'content-length', str(length).encode())]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    if req.method == 'HEAD':
+        await send({'type': 'http.response.body', 'body': b''})
+        return
+    if packed is not None:  # already in memory: no thread pool round trip
+        await send({'type': 'http.response.body', 'body': bytes(packed[start:start + length])})
+        return
+    if pathsend:
+        await send({'type': 'http.response.pathsend', 'path': os.path.abspath(path)})
+        return
+
+    try:
+        remaining = length
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, min(CHUNK_SIZE, remaining))
+            remaining -= len(chunk)
+            more = remaining > 0 and bool(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': more})
+            if not more:
+                break
+    finally:
+        f.close()
+
+
+async def letter_route(req, send, letter):
+    letter = letter.lower()
+    entry = asset_index.find_letter(letter)
+    asset_lookups.inc('letter', 'exact' if entry is not None else 'miss')
+    if entry is not None:
+        return await send_asset(req, send, entry, kind=KIND_LETTERS)
+    await send_json(send, 404, {
+        'error': f'Letter image not found: {letter}',
+        'searched_paths': [os.path.join(LETTERS_DIR, f"{name}{ext}")
+                           for name in (letter, letter.upper()) for ext in ('.jpg', '.png', '.gif')]
+    })
+
+
+async def phrase_route(req, send, phrase):
+    phrase_clean = phrase.strip().lower()
+    entry = asset_index.find_phrase(phrase_clean)
+    if entry is not None:
+        asset_lookups.inc('phrase', 'exact')
+        return await send_asset(req, send, entry, mimetype='image/gif', kind=KIND_PHRASES)
+    fuzzy = req.args.get('fuzzy', '').lower() in ('1', 'true', 'yes')
+    candidate, match_kind = asset_index.match_phrase(phrase_clean, fuzzy=fuzzy)
+    asset_lookups.inc('phrase', match_kind or 'miss')
+    if candidate is None:
+        missed_phrases.add(phrase_clean)
+    else:
+        try:
+            return await send_asset(req, send, candidate, mimetype='image/gif', kind=KIND_PHRASES,
+                                    extra_headers=[('X-Match-Type', match_kind)], passthrough=(OSError, ValueError))
+        except (OSError, ValueError) as e:
+            # unreadable file or failed rendition: answer as if there were no match, like the Flask route
+            print(f"Error serving partial match {candidate.relpath} for '{phrase_clean}':", e)
+    await send_json(send, 404, {
+        'error': f'GIF not found for phrase: {phrase}',
+        'searched_variations': [phrase_clean, phrase_clean.replace(' ', '_'),
+                                phrase_clean.replace(' ', '-'), phrase_clean.replace(' ', '')],
+        'suggestion': 'Try /api/phrase/suggest?q=... or /api/phrase/list',
+        'suggestions': [entry.name for entry, _ in asset_index.suggest(phrase_clean, limit=5)]
+    })
+
+
+async def app(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                asset_index.start()
+                metrics.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                asset_index.stop()
+                metrics.stop()
+                metrics.flush(final=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+        # Route with Flask's own URL map so both servers agree on what is an asset URL
+        try:
+            endpoint, values = _url_adapter.match(scope['path'], method='GET')
+        except HTTPException:
+            endpoint = None
+        if endpoint in ASSET_ENDPOINTS:
+            req = AssetRequest(scope)
+            route = _asset_rules[endpoint]
+            start = time.perf_counter()
+
+            async def send_recording(message):
+                if message['type'] == 'http.response.start':
+                    # same metrics as the Flask routes (time to response start)
+                    request_latency.observe(time.perf_counter() - start, route, scope['method'])
+                    requests_total.inc(route, str(message['status']))
+                await send(message)
+
+            try:
+                if endpoint == 'get_phrase_gif':
+                    return await phrase_route(req, send_recording, values['phrase'])
+                return await letter_route(req, send_recording, values['letter'])
+            except RenditionRequestError as e:
+                return await send_json(send_recording, 400, {'error': str(e)})
+
+    if wsgi_app is None:
+        return await send_json(send, 501, {'error': 'Only asset routes are available (pip install asgiref)'})
+    await wsgi_app(scope, receive, send)
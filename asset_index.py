@@ -0,0 +1,566 @@
+"""
+In-memory asset index for the Indian Sign Language Converter
+Scans ISL_Gifs/ and letters/ once into normalized-key -> file metadata maps
+and refreshes them in the background when a directory's mtime changes
+(or, for files rewritten in place, when a stat sweep or a request notices),
+so request handlers never have to search the filesystem.
+An optional alias manifest maps extra spoken forms onto existing phrase GIFs.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from urllib.parse import quote
+
+from gif_info import playback_delays_ms
+from phrase_matcher import PhraseMatcher
+from phrase_suggest import PhraseSuggester
+
+PHRASE_EXTENSIONS = ('.gif',)
+LETTER_EXTENSIONS = ('.jpg', '.png', '.gif')  # priority order used by the letter route
+RENDITION_EXTENSIONS = ('.gif', '.webp', '.png')
+MAX_LIST_LIMIT = 1000
+
+_SEPARATORS = re.compile(r'[\s_\-]+')
+
+
+def normalize_phrase(text):
+    """Normalize a phrase or filename stem to its lookup key.
+
+    Lowercases, trims and folds spaces, underscores and hyphens into single
+    spaces, so "Thank_You", "thank-you" and "thank  you" share one key.
+    """
+    if not text:
+        return ''
+    return _SEPARATORS.sub(' ', text.strip().lower()).strip()
+
+
+def compact_key(key):
+    """Return the separator-free form of a normalized key ("thank you" -> "thankyou")."""
+    return key.replace(' ', '')
+
+
+def _stat_key(path):
+    """(size, mtime_ns) of a file as it is on disk now, or None if it is gone."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+class AssetEntry:
+    """Metadata for one asset file, captured at scan time.
+
+    An entry describes one version of the file: when the file is rewritten in
+    place the index replaces the entry (see AssetIndex.revalidate) instead of
+    updating it, so cached hashes and durations never outlive the bytes.
+    """
+    __slots__ = ('key', 'name', 'filename', 'relpath', 'path', 'size', 'mtime', 'mtime_ns',
+                 '_frame_delays_ms', '_content_hash')
+
+    def __init__(self, key, name, filename, relpath, path, size, mtime, mtime_ns=None):
+        self.key = key            # normalized lookup key
+        self.name = name          # filename stem, original case
+        self.filename = filename  # filename with extension
+        self.relpath = relpath    # path relative to the base directory
+        self.path = path          # absolute path
+        self.size = size
+        self.mtime = mtime
+        self.mtime_ns = mtime_ns if mtime_ns is not None else int(mtime * 1e9)
+        self._frame_delays_ms = None
+        self._content_hash = None
+
+    @property
+    def stat_key(self):
+        """(size, mtime_ns) at scan time; compare with _stat_key(path) to detect in-place edits."""
+        return (self.size, self.mtime_ns)
+
+    @property
+    def content_hash(self):
+        """Short hash of the file contents, used for ETags and URL fingerprints; read once."""
+        if self._content_hash is None:
+            digest = hashlib.blake2b(digest_size=8)
+            try:
+                with open(self.path, 'rb') as f:
+                    st = os.fstat(f.fileno())
+                    for chunk in iter(lambda: f.read(1 << 16), b''):
+                        digest.update(chunk)
+            except OSError:
+                # unreadable right now; fall back to metadata so callers still get a validator
+                digest.update(f"{self.size}-{self.mtime}".encode())
+                return digest.hexdigest()
+            if (st.st_size, st.st_mtime_ns) != self.stat_key:
+                # the file changed since the scan: these bytes belong to the next entry, not this one
+                return digest.hexdigest()
+            self._content_hash = digest.hexdigest()
+        return self._content_hash
+
+    @property
+    def frame_delays_ms(self):
+        """Per-frame delays in ms as browsers play them ([] for still images); read once."""
+        if self._frame_delays_ms is None:
+            self._frame_delays_ms = playback_delays_ms(self.path)
+        return self._frame_delays_ms
+
+    @property
+    def duration_ms(self):
+        """One loop of the animation in ms as browsers play it (0 for still images)."""
+        return sum(self.frame_delays_ms)
+
+    def __repr__(self):
+        return f"AssetEntry({self.relpath!r}, size={self.size})"
+
+
+def _listable(entry):
+    return len(entry.name) > 1 or not entry.name.isalpha()
+
+
+def _listing_key(entry):
+    return (entry.key, entry.filename)
+
+
+def _encode_cursor(listing_key):
+    raw = '\0'.join(listing_key).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        key, filename = raw.split('\0')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return (key, filename)
+
+
+class _Snapshot:
+    """Immutable view of both directories; swapped atomically on refresh."""
+    __slots__ = ('phrases', 'phrases_compact', 'phrase_list', 'matcher', 'suggester', 'max_phrase_words', 'letters',
+                 'listing', 'listing_keys', 'listing_etag', 'phrases_dir_exists', 'letters_dir_exists',
+                 'aliases', 'entries', 'renditions', 'dir_mtimes')
+
+    def __init__(self):
+        self.phrases = {}          # normalized key -> AssetEntry
+        self.phrases_compact = {}  # compact key -> AssetEntry
+        self.phrase_list = []      # AssetEntry sorted by name
+        self.matcher = PhraseMatcher()
+        self.suggester = PhraseSuggester()
+        self.max_phrase_words = 0
+        self.letters = {}          # lowercase letter stem -> AssetEntry
+        self.listing = []          # listable phrase entries sorted by (key, filename)
+        self.listing_keys = []     # (key, filename) per listing entry, for bisecting
+        self.listing_etag = ''     # changes whenever any listed file is added, removed or modified
+        self.aliases = {}          # normalized alias -> AssetEntry of the phrase it stands for
+        self.entries = {}          # relpath -> AssetEntry for every scanned file
+        self.renditions = {}       # relpath -> mtime of every pre-built rendition
+        self.phrases_dir_exists = False
+        self.letters_dir_exists = False
+        self.dir_mtimes = (None, None, None)
+
+
+def phrase_url(entry):
+    """Fingerprinted URL for a phrase GIF; changes whenever the file content does."""
+    return f'/api/phrase/{quote(entry.name)}?v={entry.content_hash}'
+
+
+def letter_url(entry):
+    """Fingerprinted URL for a letter image; changes whenever the file content does."""
+    return f'/api/letter/{quote(entry.name.lower())}?v={entry.content_hash}'
+
+
+def _dir_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_aliases(path):
+    """Read an alias manifest: JSON {"phrase": ["alias", ...]} -> {alias key: phrase key}.
+
+    A missing file means no aliases; a malformed one is reported and ignored,
+    so a half-saved edit never takes the index down.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring phrase alias manifest {path}: {e}")
+        return {}
+    aliases = {}
+    if not isinstance(manifest, dict):
+        print(f"Ignoring phrase alias manifest {path}: expected an object of phrase -> [aliases]")
+        return aliases
+    for phrase, names in manifest.items():
+        if isinstance(names, str):
+            names = [names]
+        for name in names if isinstance(names, list) else ():
+            key = normalize_phrase(str(name))
+            if key:
+                aliases.setdefault(key, normalize_phrase(phrase))
+    return aliases
+
+
+def _scan_dir(base_dir, rel_dir, extensions):
+    """Yield AssetEntry objects for files in rel_dir with one of the extensions."""
+    abs_dir = base_dir / rel_dir
+    try:
+        it = os.scandir(abs_dir)
+    except OSError:
+        return
+    with it:
+        for dirent in it:
+            stem, ext = os.path.splitext(dirent.name)
+            if ext.lower() not in extensions:
+                continue
+            try:
+                if not dirent.is_file():
+                    continue
+                st = dirent.stat()
+            except OSError:
+                continue
+            yield AssetEntry(
+                key=normalize_phrase(stem),
+                name=stem,
+                filename=dirent.name,
+                relpath=os.path.join(rel_dir, dirent.name),
+                path=str(abs_dir / dirent.name),
+                size=st.st_size,
+                mtime=st.st_mtime,
+                mtime_ns=st.st_mtime_ns,
+            )
+
+
+def _letter_priority(entry):
+    """Sort key reproducing the route's lookup order: lowercase stem first, then jpg/png/gif."""
+    ext = os.path.splitext(entry.filename)[1].lower()
+    return (entry.name != entry.name.lower(), LETTER_EXTENSIONS.index(ext), entry.filename)
+
+
+class AssetIndex:
+    """Normalized in-memory index over the phrase GIF and letter image directories.
+
+    Lookups read a snapshot without locking; refresh() builds a new snapshot and
+    swaps it in. `generation` increases every time the contents change, which
+    lets callers invalidate anything derived from the index.
+
+    aliases_file (relative to base_dir) is an optional JSON manifest of extra
+    names for phrase GIFs, e.g. {"hello": ["hi", "namaste"]}. Aliases resolve
+    like the phrase itself in find_phrase() and sentence planning; a GIF
+    named like an alias always wins. Editing the manifest triggers a rebuild.
+
+    rendition_dirs (relative to base_dir) are directories of pre-built
+    renditions; their files' mtimes are kept in the snapshot so serving one
+    needs no stat (see rendition_mtime()).
+    """
+
+    def __init__(self, base_dir, phrases_dir, letters_dir, refresh_interval=2.0, aliases_file=None,
+                 verify_interval=10.0, rendition_dirs=()):
+        self.base_dir = Path(base_dir)
+        self.phrases_dir = phrases_dir
+        self.letters_dir = letters_dir
+        self.aliases_file = aliases_file
+        self.rendition_dirs = tuple(rendition_dirs)
+        self.refresh_interval = refresh_interval
+        self.verify_interval = verify_interval
+        self.generation = 0
+        self._snapshot = _Snapshot()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners = []
+
+    # --- scanning ---
+    def _current_mtimes(self):
+        return (_dir_mtime(self.base_dir / self.phrases_dir),
+                _dir_mtime(self.base_dir / self.letters_dir),
+                _dir_mtime(self.base_dir / self.aliases_file) if self.aliases_file else None,
+                *(_dir_mtime(self.base_dir / rel_dir) for rel_dir in self.rendition_dirs))
+
+    def _build(self, mtimes):
+        snap = _Snapshot()
+        snap.dir_mtimes = mtimes
+        snap.phrases_dir_exists = mtimes[0] is not None
+        snap.letters_dir_exists = mtimes[1] is not None
+
+        # sorted scan so collisions on a normalized key resolve deterministically
+        phrases = sorted(_scan_dir(self.base_dir, self.phrases_dir, PHRASE_EXTENSIONS),
+                         key=lambda e: e.filename)
+        for entry in phrases:
+            snap.entries[entry.relpath] = entry
+            snap.phrases.setdefault(entry.key, entry)
+            snap.phrases_compact.setdefault(compact_key(entry.key), entry)
+            snap.matcher.add(entry.key, entry)
+            if _listable(entry):
+                snap.suggester.add(entry.key, entry)
+            snap.max_phrase_words = max(snap.max_phrase_words, len(entry.key.split()))
+        snap.matcher.freeze()
+        snap.phrase_list = sorted(phrases, key=lambda e: e.name)
+
+        # aliases share the exact-match maps, so lookups stay one dict probe
+        if mtimes[2] is not None:
+            for alias, target in load_aliases(self.base_dir / self.aliases_file).items():
+                entry = snap.phrases.get(target)
+                if entry is None or alias in snap.phrases:
+                    continue
+                snap.aliases[alias] = entry
+                snap.phrases[alias] = entry
+                snap.phrases_compact.setdefault(compact_key(alias), entry)
+                snap.max_phrase_words = max(snap.max_phrase_words, len(alias.split()))
+
+        # single-letter GIFs are fingerspelling, not phrases: they are not listed
+        snap.listing = sorted(filter(_listable, phrases), key=_listing_key)
+        snap.listing_keys = [_listing_key(e) for e in snap.listing]
+        digest = hashlib.blake2b(digest_size=8)
+        for entry in snap.listing:
+            digest.update(f'{entry.filename}\0{entry.size}\0{entry.mtime_ns}\n'.encode('utf-8', 'replace'))
+        snap.listing_etag = digest.hexdigest()
+
+        letters = sorted(_scan_dir(self.base_dir, self.letters_dir, LETTER_EXTENSIONS),
+                         key=_letter_priority)
+        for entry in letters:
+            snap.entries[entry.relpath] = entry
+            snap.letters.setdefault(entry.name.lower(), entry)
+
+        for rel_dir in self.rendition_dirs:
+            for entry in _scan_dir(self.base_dir, rel_dir, RENDITION_EXTENSIONS):
+                snap.renditions[entry.relpath] = entry.mtime
+        return snap
+
+    def refresh(self, force=False, stale=None):
+        """Rescan if either directory or the alias manifest changed (or force). Returns True if rebuilt.
+
+        stale is a (relpath, stat key) seen on disk that differs from the index;
+        the rescan is skipped if another thread has already picked that version up.
+        """
+        with self._lock:
+            mtimes = self._current_mtimes()
+            if stale is not None:
+                relpath, key = stale
+                current = self._snapshot.entries.get(relpath)
+                if (current.stat_key if current is not None else None) == key:
+                    return False
+                force = True
+            if not force and mtimes == self._snapshot.dir_mtimes:
+                return False
+            self._snapshot = self._build(mtimes)
+            self.generation += 1
+            listeners = list(self._listeners)
+        for callback in listeners:
+            try:
+                callback(self)
+            except Exception as e:
+                print("Asset index listener error:", e)
+        return True
+
+    def revalidate(self, entry):
+        """The entry for the file as it is on disk now.
+
+        Rewriting a file in place changes neither its directory's mtime nor
+        the scan-time metadata, so callers about to hand out an ETag or a
+        fingerprinted URL check the file's size and mtime first (one stat).
+        If they changed, the index is rebuilt and the new entry returned;
+        None means the file is gone.
+        """
+        key = _stat_key(entry.path)
+        if key == entry.stat_key:
+            return entry
+        self.refresh(stale=(entry.relpath, key))
+        return self._snapshot.entries.get(entry.relpath)
+
+    def verify(self):
+        """Stat every indexed file and rebuild if any changed in place. Returns True if rebuilt."""
+        for entry in list(self._snapshot.entries.values()):
+            if self._stop.is_set():
+                return False
+            key = _stat_key(entry.path)
+            if key != entry.stat_key:
+                return self.refresh(stale=(entry.relpath, key))
+        return False
+
+    def add_listener(self, callback):
+        """Register callback(index) to run after every rebuild."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    # --- background refresh ---
+    def warm(self):
+        """Build the suggestion index and compute content hashes so request threads never have to."""
+        snap = self._snapshot
+        snap.suggester.prepare()
+        for entry in list(snap.phrase_list) + list(snap.letters.values()):
+            if self._stop.is_set():
+                return
+            entry.content_hash
+
+    def _watch(self):
+        self.warm()
+        last_verify = time.monotonic()
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                rebuilt = self.refresh()
+                # in-place edits leave directory mtimes alone: catch them with a periodic stat sweep
+                if not rebuilt and time.monotonic() - last_verify >= self.verify_interval:
+                    last_verify = time.monotonic()
+                    rebuilt = self.verify()
+                if rebuilt:
+                    self.warm()
+            except Exception as e:
+                print("Asset index refresh failed:", e)
+
+    def start(self):
+        """Start the background mtime watcher (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="asset-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.refresh_interval + 1)
+            self._thread = None
+
+    # --- lookups ---
+    @property
+    def phrases_dir_exists(self):
+        return self._snapshot.phrases_dir_exists
+
+    @property
+    def letters_dir_exists(self):
+        return self._snapshot.letters_dir_exists
+
+    def find_letter(self, letter):
+        """Return the AssetEntry for a letter (case-insensitive) or None."""
+        return self._snapshot.letters.get(letter.strip().lower())
+
+    def find_phrase(self, phrase):
+        """Return the AssetEntry whose name matches phrase under any separator variant, or None."""
+        key = normalize_phrase(phrase)
+        if not key:
+            return None
+        snap = self._snapshot
+        entry = snap.phrases.get(key)
+        if entry is None:
+            entry = snap.phrases_compact.get(compact_key(key))
+        return entry
+
+    def match_phrase(self, phrase, fuzzy=False):
+        """Find the best phrase entry, falling back to partial and (optionally) fuzzy matching.
+
+        Returns (entry, kind) where kind is 'exact', 'partial' or 'fuzzy',
+        or (None, None) when nothing matches.
+        """
+        entry = self.find_phrase(phrase)
+        if entry is not None:
+            return entry, 'exact'
+        results = self._snapshot.matcher.search(normalize_phrase(phrase), limit=1, fuzzy=fuzzy)
+        if results:
+            return results[0]
+        return None, None
+
+    @property
+    def listing_etag(self):
+        """Validator for the phrase listing; changes when any listed file is added, removed or modified.
+
+        Additions and removals show up on the next directory check; files
+        rewritten in place on the next stat sweep (verify_interval) or as soon
+        as one of them is requested.
+        """
+        return self._snapshot.listing_etag
+
+    def suggest(self, query, limit=10):
+        """Type-ahead candidates for a partially typed phrase, best first.
+
+        Returns [(entry, kind)] with kind 'prefix' (completion), 'typo'
+        (within a small edit distance), or 'partial' / 'fuzzy' from the
+        matcher when the first two do not fill the list.
+        """
+        key = normalize_phrase(query)
+        if not key:
+            return []
+        snap = self._snapshot
+        results = snap.suggester.suggest(key, limit)
+        # substring/fuzzy fallback; words under 3 letters match too much to be useful suggestions
+        if len(results) < limit and min(len(w) for w in key.split()) >= 3:
+            seen = {id(entry) for entry, _ in results}
+            for entry, kind in snap.matcher.search(key, limit=limit, fuzzy=True):
+                if id(entry) not in seen and _listable(entry) and len(results) < limit:
+                    seen.add(id(entry))
+                    results.append((entry, kind))
+        return results
+
+    @property
+    def max_phrase_words(self):
+        """Number of words in the longest indexed phrase or alias."""
+        return self._snapshot.max_phrase_words
+
+    def aliases(self):
+        """Mapping of normalized alias -> AssetEntry of the phrase it stands for."""
+        return self._snapshot.aliases
+
+    def phrases(self):
+        """All phrase GIF entries sorted by name."""
+        return self._snapshot.phrase_list
+
+    def list_phrases(self, prefix=None, contains=None, cursor=None, limit=100):
+        """One page of the phrase listing, ordered by normalized name.
+
+        prefix matches the start of the normalized name; contains requires
+        every word to appear somewhere in it (answered from the matcher's
+        n-gram index). cursor is the opaque next_cursor of the previous page.
+        Returns (entries, next_cursor or None, total matching, listing etag).
+        Raises ValueError for a malformed cursor.
+        """
+        snap = self._snapshot
+        keys = snap.listing_keys
+        lo, hi = 0, len(keys)
+        if prefix:
+            prefix = normalize_phrase(prefix)
+            lo = bisect_left(keys, (prefix,))
+            hi = bisect_left(keys, (prefix + '\uffff',))
+
+        contains = normalize_phrase(contains or '')
+        if contains:
+            entries = sorted((e for e in snap.matcher.containing(contains)
+                              if _listable(e) and e.key.startswith(prefix or '')), key=_listing_key)
+            keys = [_listing_key(e) for e in entries]
+            lo, hi = 0, len(entries)
+        else:
+            entries = snap.listing
+
+        total = hi - lo
+        if cursor:
+            lo = bisect_right(keys, _decode_cursor(cursor), lo, hi)
+        limit = max(1, min(int(limit), MAX_LIST_LIMIT))
+        page = entries[lo:min(lo + limit, hi)]
+        next_cursor = _encode_cursor(_listing_key(page[-1])) if page and lo + limit < hi else None
+        return page, next_cursor, total, snap.listing_etag
+
+    def letters(self):
+        """Mapping of lowercase letter stem -> AssetEntry."""
+        return self._snapshot.letters
+
+    def rendition_mtime(self, relpath):
+        """mtime of a pre-built rendition under one of rendition_dirs, or None if there is none."""
+        return self._snapshot.renditions.get(relpath)
+
+    def stats(self):
+        snap = self._snapshot
+        return {
+            'generation': self.generation,
+            'phrases': len(snap.phrase_list),
+            'aliases': len(snap.aliases),
+            'letters': len(snap.letters),
+            'renditions': len(snap.renditions),
+        }
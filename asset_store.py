@@ -0,0 +1,148 @@
+"""
+Packed, memory-mapped asset store for the ISL Converter API
+Packs every indexed phrase GIF and letter image into one file with an offset
+index, so the server maps it once at startup and answers asset requests from
+memory instead of opening, stat-ing and reading a file per request. The
+mapping is read-only and file-backed: every worker process maps the same page
+cache pages (and with gunicorn's preload_app they inherit the mapping itself).
+
+Build (or rebuild after adding assets):
+    python asset_store.py [--base DIR] [--out assets.pack]
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'ISLPACK1'
+HEADER = struct.Struct('<8sQQ')   # magic, index offset, index length
+ALIGNMENT = 64                    # every asset starts on a cache-line boundary
+DEFAULT_PACK_NAME = 'assets.pack'
+
+
+def _pack_key(relpath):
+    return relpath.replace(os.sep, '/')
+
+
+def build_pack(index, out_path):
+    """Write every asset of an AssetIndex into one pack file; returns (files, bytes)."""
+    entries = {_pack_key(e.relpath): e for e in list(index.phrases()) + list(index.letters().values())}
+    tmp_path = f'{out_path}.{os.getpid()}.tmp'
+    files = {}
+    with open(tmp_path, 'wb') as out:
+        out.write(HEADER.pack(MAGIC, 0, 0))
+        for key, entry in sorted(entries.items()):
+            out.write(b'\0' * (-out.tell() % ALIGNMENT))
+            offset = out.tell()
+            with open(entry.path, 'rb') as f:
+                data = f.read()
+            out.write(data)
+            # size and mtime as scanned: the server only trusts the pack while they still match
+            files[key] = [offset, len(data), entry.mtime]
+        index_offset = out.tell()
+        raw = json.dumps({'version': 1, 'files': files}, separators=(',', ':')).encode('utf-8')
+        out.write(raw)
+        out.seek(0)
+        out.write(HEADER.pack(MAGIC, index_offset, len(raw)))
+    os.replace(tmp_path, out_path)  # atomic: running servers keep their old mapping until they reload
+    return len(files), index_offset
+
+
+class PackedAssetStore:
+    """Read-only view of a pack file: get(entry) returns a memoryview slice or None.
+
+    An entry is only served from the pack while its size and mtime match what
+    was packed, so an edited or re-added file falls back to the normal disk
+    path until the pack is rebuilt. reload() picks up a rebuilt pack.
+    """
+
+    def __init__(self, path, check_interval=2.0):
+        self.path = str(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._state = None      # (stat key, mmap, memoryview, files)
+        self._checked = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.reload()
+
+    def _open(self):
+        st = os.stat(self.path)
+        with open(self.path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_offset, index_length = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            mapped.close()
+            raise ValueError(f"Not an asset pack: {self.path}")
+        if hasattr(mapped, 'madvise'):
+            mapped.madvise(mmap.MADV_WILLNEED)  # start faulting pages in now, not on first request
+        files = json.loads(mapped[index_offset:index_offset + index_length])['files']
+        return ((st.st_ino, st.st_size, st.st_mtime_ns), mapped, memoryview(mapped), files)
+
+    def reload(self, force=True):
+        """Map the pack file again if it was replaced (or always, with force). Returns True if remapped."""
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return False
+            if not force and self._state and self._state[0] == (st.st_ino, st.st_size, st.st_mtime_ns):
+                return False
+            # the old mapping is released once no response still holds a slice of it
+            self._state = self._open()
+            self._checked = time.monotonic()
+            return True
+
+    def get(self, entry):
+        """memoryview of the entry's bytes, or None if it is not packed (or changed since)."""
+        if self.check_interval and time.monotonic() - self._checked > self.check_interval:
+            self._checked = time.monotonic()
+            self.reload(force=False)
+        _, _, view, files = self._state
+        record = files.get(_pack_key(entry.relpath))
+        if record is None:
+            self.misses += 1
+            return None
+        offset, size, mtime = record
+        if size != entry.size or mtime != entry.mtime:
+            self.stale += 1
+            return None
+        self.hits += 1
+        return view[offset:offset + size]
+
+    def __contains__(self, entry):
+        return _pack_key(entry.relpath) in self._state[3]
+
+    def stats(self):
+        _, mapped, _, files = self._state
+        return {
+            'path': self.path,
+            'files': len(files),
+            'bytes': len(mapped),
+            'hits': self.hits,
+            'misses': self.misses,
+            'stale': self.stale,
+        }
+
+
+if __name__ == '__main__':
+    from asset_index import AssetIndex
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--base', default=os.path.dirname(os.path.abspath(__file__)),
+                        help='project folder containing ISL_Gifs/ and letters/')
+    parser.add_argument('--out', help=f'pack file to write (default BASE/{DEFAULT_PACK_NAME})')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    assets = AssetIndex(args.base, 'ISL_Gifs', 'letters')
+    assets.refresh(force=True)
+    out_path = args.out or os.path.join(args.base, DEFAULT_PACK_NAME)
+    count, size = build_pack(assets, out_path)
+    print(f"Packed {count} assets ({size / 1e6:.1f} MB) into {out_path} "
+          f"in {time.perf_counter() - start:.1f}s")
@@ -0,0 +1,308 @@
+"""
+Headless batch translation for the ISL converter
+Streams text lines (plain text, or the cues of .srt/.vtt subtitle files) from
+files or stdin and resolves each one to a sign plan with the same asset index
+and planner as the API server, writing one JSON record per line (JSONL) and,
+optionally, one rendered GIF/WebP animation per line.
+
+Lines are planned in chunks on a process pool. Only a fixed number of chunks
+is in flight at a time and records are written in input order as soon as the
+oldest chunk is done, so memory stays flat however large the input is.
+Progress (lines/s and peak memory) is reported on stderr.
+
+Usage:
+    python batch_translate.py subtitles.srt transcript.txt > plans.jsonl
+    cat transcript.txt | python batch_translate.py - --out plans.jsonl --jobs 4
+    python batch_translate.py talk.vtt --render out/ --fmt webp --size 240
+"""
+
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from asset_index import AssetIndex
+from plan_cache import DEFAULT_MAX_ENTRIES, PlanCache
+from sign_planner import DEFAULT_LETTER_DURATION_MS, plan_sentence, tokenize
+
+try:
+    import resource
+except ImportError:  # Windows: no peak RSS in the progress line
+    resource = None
+
+ISL_GIFS_DIR = "ISL_Gifs"
+LETTERS_DIR = "letters"
+PHRASE_ALIASES_FILE = "phrase_aliases.json"
+BASE_DIR = Path(__file__).parent
+DEFAULT_CHUNK_LINES = 256
+WORKER_FRAME_CACHE_BYTES = 64 * 1024 * 1024
+PROGRESS_INTERVAL = 2.0
+
+_SUBTITLE_TIMING = re.compile(r'-->')
+_SUBTITLE_MARKUP = re.compile(r'<[^>]*>|\{[^}]*\}')
+
+
+# --- input ---
+def open_input(path):
+    if path == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8', errors='replace')
+    return open(path, encoding='utf-8-sig', errors='replace')
+
+
+def iter_text_lines(f):
+    """(line number, text) for every non-blank line."""
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if line:
+            yield number, line
+
+
+def iter_subtitle_cues(f):
+    """(line number of the cue text, text) for every SRT/WebVTT cue, markup removed.
+
+    Cue numbers, timing lines, the WEBVTT header and NOTE/STYLE blocks are
+    skipped; the text lines of one cue are joined into one utterance.
+    """
+    parts = []
+    start = None
+    skipping = False
+    for number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            if parts:
+                yield start, ' '.join(parts)
+            parts, start, skipping = [], None, False
+            continue
+        if skipping:
+            continue
+        if not parts and (line.startswith(('WEBVTT', 'NOTE', 'STYLE', 'REGION'))):
+            skipping = True
+            continue
+        if _SUBTITLE_TIMING.search(line):
+            parts, start = [], None  # a cue number or id before the timing line is not text
+            continue
+        text = _SUBTITLE_MARKUP.sub('', line).strip()
+        if text:
+            if start is None:
+                start = number
+            parts.append(text)
+    if parts:
+        yield start, ' '.join(parts)
+
+
+def iter_inputs(paths, input_format='auto'):
+    """(source name, line number, text) over every input, read one line at a time."""
+    for path in paths:
+        fmt = input_format
+        if fmt == 'auto':
+            fmt = os.path.splitext(path)[1].lower().lstrip('.') if path != '-' else 'text'
+        reader = iter_subtitle_cues if fmt in ('srt', 'vtt') else iter_text_lines
+        source = '<stdin>' if path == '-' else path
+        with open_input(path) as f:
+            for number, text in reader(f):
+                yield source, number, text
+
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# --- workers ---
+_worker = {}
+
+
+def init_worker(base_dir, aliases_file, letter_ms, render_dir, fmt, size, plan_cache_entries):
+    """Per-process setup: one asset index (no watcher thread) and a plan cache."""
+    index = AssetIndex(base_dir, ISL_GIFS_DIR, LETTERS_DIR, aliases_file=aliases_file)
+    index.refresh(force=True)
+    _worker.update(
+        index=index,
+        base_dir=Path(base_dir),
+        letter_ms=letter_ms,
+        render_dir=render_dir,
+        fmt=fmt,
+        size=size,
+        plans=PlanCache(max_entries=plan_cache_entries, ttl=float('inf')),
+    )
+    if render_dir:
+        from gif_frames import frame_cache
+        frame_cache.max_bytes = WORKER_FRAME_CACHE_BYTES
+
+
+def _render_name(source, number, fmt):
+    stem = re.sub(r'[^\w\-]+', '_', os.path.basename(source)).strip('_') or 'line'
+    return f'{stem}_{number:08d}.{fmt}'
+
+
+def translate_chunk(chunk):
+    """Plan (and optionally render) a chunk of (source, line, text).
+
+    Returns (JSONL strings, the worker's peak RSS in MB or None).
+    """
+    index = _worker['index']
+    letter_ms = _worker['letter_ms']
+    plans = _worker['plans']
+    records = []
+    for source, number, text in chunk:
+        normalized = ' '.join(tokenize(text))
+        # cached already encoded: repeated lines cost one lookup, and an entry is one string
+        encoded = plans.get_or_compute((normalized, letter_ms), lambda: _encode_plan(
+            plan_sentence(normalized, index, letter_duration_ms=letter_ms)))
+        head = {'source': source, 'line': number, 'text': text}
+        if _worker['render_dir']:
+            head.update(_render(json.loads(encoded), source, number))
+        records.append(json.dumps(head, ensure_ascii=False)[:-1] + ', ' + encoded[1:])
+    return records, peak_rss_mb()
+
+
+def _encode_plan(plan):
+    plan = dict(plan)
+    del plan['text']  # the record carries the original line instead
+    return json.dumps(plan, ensure_ascii=False)
+
+
+def _render(plan, source, number):
+    from sentence_renderer import RenderError, render_plan
+    fmt = _worker['fmt']
+    name = _render_name(source, number, fmt)
+    try:
+        data = render_plan(plan, _worker['base_dir'], fmt=fmt, size=_worker['size'])
+    except RenderError as e:
+        return {'error': str(e)}
+    path = os.path.join(_worker['render_dir'], name)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return {'output': path}
+
+
+# --- driver ---
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024  # bytes on macOS, KiB elsewhere
+
+
+class Progress:
+    """Periodic lines/s and peak memory report on stderr."""
+
+    def __init__(self, interval=PROGRESS_INTERVAL, quiet=False):
+        self.interval = interval
+        self.quiet = quiet
+        self.started = self.last = time.monotonic()
+        self.lines = 0
+        self.worker_rss_mb = None
+
+    def add(self, count, worker_rss_mb=None):
+        self.lines += count
+        if worker_rss_mb is not None:
+            self.worker_rss_mb = max(self.worker_rss_mb or 0, worker_rss_mb)
+        now = time.monotonic()
+        if not self.quiet and now - self.last >= self.interval:
+            self.last = now
+            self.report()
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started
+        return {
+            'lines': self.lines,
+            'seconds': round(elapsed, 2),
+            'lines_per_second': round(self.lines / elapsed, 1) if elapsed else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1) if resource else None,
+            'worker_peak_rss_mb': round(self.worker_rss_mb, 1) if self.worker_rss_mb else None,
+        }
+
+    def report(self, final=False):
+        s = self.summary()
+        memory = ''
+        if s['peak_rss_mb'] is not None:
+            memory = f", peak RSS {s['peak_rss_mb']} MB"
+            if s['worker_peak_rss_mb'] is not None:
+                memory += f" driver / {s['worker_peak_rss_mb']} MB largest worker"
+        label = 'Done' if final else 'Progress'
+        print(f"{label}: {s['lines']} lines in {s['seconds']}s ({s['lines_per_second']} lines/s{memory})",
+              file=sys.stderr)
+
+
+def run(paths, out, jobs=None, chunk_lines=DEFAULT_CHUNK_LINES, input_format='auto', base_dir=BASE_DIR,
+        aliases_file=PHRASE_ALIASES_FILE, letter_ms=DEFAULT_LETTER_DURATION_MS, render_dir=None, fmt='gif',
+        size=320, plan_cache_entries=DEFAULT_MAX_ENTRIES, quiet=False):
+    """Translate every line of paths into out (a text file object). Returns the progress summary."""
+    jobs = jobs or os.cpu_count() or 1
+    init_args = (str(base_dir), aliases_file, letter_ms, render_dir, fmt, size, plan_cache_entries)
+    chunks = iter_chunks(iter_inputs(paths, input_format), chunk_lines)
+    progress = Progress(quiet=quiet)
+
+    def write(records, count, worker_rss_mb=None):
+        out.writelines(record + '\n' for record in records)
+        progress.add(count, worker_rss_mb)
+
+    if jobs == 1:
+        init_worker(*init_args)
+        for chunk in chunks:
+            records, _ = translate_chunk(chunk)
+            write(records, len(chunk))
+    else:
+        window = jobs * 4  # chunks in flight: enough to keep every worker busy, bounded memory
+        pending = deque()
+        with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=init_args) as pool:
+            for chunk in chunks:
+                pending.append((pool.submit(translate_chunk, chunk), len(chunk)))
+                if len(pending) >= window:
+                    future, count = pending.popleft()
+                    records, worker_rss_mb = future.result()
+                    write(records, count, worker_rss_mb)
+            while pending:
+                future, count = pending.popleft()
+                records, worker_rss_mb = future.result()
+                write(records, count, worker_rss_mb)
+    out.flush()
+    if not quiet:
+        progress.report(final=True)
+    return progress.summary()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inputs', nargs='+', help="text, .srt or .vtt files ('-' for stdin)")
+    parser.add_argument('--out', help='JSONL output file (default: stdout)')
+    parser.add_argument('--format', dest='input_format', choices=('auto', 'text', 'srt', 'vtt'), default='auto',
+                        help='input format (default: by file extension, plain text for stdin)')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count; 1 = no pool)')
+    parser.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_LINES, help='lines per work item')
+    parser.add_argument('--base', default=str(BASE_DIR), help='project folder containing ISL_Gifs/ and letters/')
+    parser.add_argument('--aliases', default=PHRASE_ALIASES_FILE,
+                        help="phrase alias manifest under --base ('' to disable)")
+    parser.add_argument('--letter-ms', type=int, default=DEFAULT_LETTER_DURATION_MS)
+    parser.add_argument('--render', metavar='DIR', help='also render each line into DIR as one animation')
+    parser.add_argument('--fmt', choices=('gif', 'webp'), default='gif', help='rendered animation format')
+    parser.add_argument('--size', type=int, default=320, help='rendered animation size in px')
+    parser.add_argument('--quiet', action='store_true', help='no progress on stderr')
+    args = parser.parse_args()
+
+    if args.render:
+        os.makedirs(args.render, exist_ok=True)
+    out = open(args.out, 'w', encoding='utf-8') if args.out else \
+        io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', newline='\n')
+    try:
+        run(args.inputs, out, jobs=args.jobs, chunk_lines=max(1, args.chunk), input_format=args.input_format,
+            base_dir=args.base, aliases_file=args.aliases or None, letter_ms=args.letter_ms,
+            render_dir=args.render, fmt=args.fmt, size=args.size, quiet=args.quiet)
+    except BrokenPipeError:
+        pass  # e.g. piped into head
+    finally:
+        if args.out:
+            out.close()
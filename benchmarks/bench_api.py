@@ -0,0 +1,315 @@
+"""
+Benchmark: Flask API latency and throughput on a synthetic asset tree
+Generates ISL_Gifs/ and letters/ of the requested size (or uses --base), then
+drives the letter, phrase (exact and fuzzy), and list endpoints through the
+Flask test client (in-process, no sockets) and/or over HTTP with a threaded
+load generator against a local server subprocess (or --url). Reports
+p50/p95/p99 latency and throughput, and saves/compares JSON baselines.
+
+Usage:
+    python benchmarks/bench_api.py [--phrases 10000] [--modes client http] [--requests 2000]
+    python benchmarks/bench_api.py --save-baseline main
+    python benchmarks/bench_api.py --compare main [--threshold 0.15] [--fail-on-regression]
+    python benchmarks/bench_api.py --url http://127.0.0.1:5000 --modes http   # e.g. gunicorn
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCH_DIR, 'baselines')
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_assets import make_tree  # noqa: E402
+
+SCENARIOS = ('letter', 'phrase_exact', 'phrase_fuzzy', 'phrase_list', 'letter_list')
+
+
+def make_urls(scenario, names, count, rng):
+    """count request paths for one scenario."""
+    if scenario == 'letter':
+        return [f'/api/letter/{rng.choice(string.ascii_letters)}' for _ in range(count)]
+    if scenario == 'phrase_exact':
+        return [f'/api/phrase/{quote(rng.choice(names).replace("_", " "))}' for _ in range(count)]
+    if scenario == 'phrase_fuzzy':
+        urls = []
+        for _ in range(count):
+            words = rng.choice(names).split('_')
+            word = rng.randrange(len(words))
+            if len(words[word]) > 3:  # one typo, so neither exact nor partial lookups hit
+                cut = rng.randrange(len(words[word]))
+                words[word] = words[word][:cut] + words[word][cut + 1:]
+            urls.append(f'/api/phrase/{quote(" ".join(words))}?fuzzy=1')
+        return urls
+    if scenario == 'phrase_list':
+        return ['/api/phrase/list'] * count
+    if scenario == 'letter_list':
+        return ['/api/letter/list'] * count
+    raise ValueError(scenario)
+
+
+def summarize(samples_ms, wall_seconds, statuses):
+    ordered = sorted(samples_ms)
+    n = len(ordered)
+
+    def pct(p):
+        return ordered[min(n - 1, int(n * p))]
+
+    return {
+        'requests': n,
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(pct(0.50), 3),
+        'p95_ms': round(pct(0.95), 3),
+        'p99_ms': round(pct(0.99), 3),
+        'rps': round(n / wall_seconds, 1) if wall_seconds else None,
+        'errors': sum(1 for s in statuses if s >= 500),
+    }
+
+
+# --- drivers ---
+def run_client(urls):
+    """Sequential requests through app.test_client(): server-side cost only."""
+    import app as api
+    client = api.app.test_client()
+    for url in urls[:20]:  # warm the route and the index hashes
+        client.get(url)
+    samples, statuses = [], []
+    wall = time.perf_counter()
+    for url in urls:
+        start = time.perf_counter()
+        response = client.get(url)
+        response.get_data()
+        samples.append((time.perf_counter() - start) * 1000)
+        statuses.append(response.status_code)
+    return summarize(samples, time.perf_counter() - wall, statuses)
+
+
+def run_http(urls, base_url, concurrency):
+    """Closed-loop load: `concurrency` keep-alive connections sharing the URL list."""
+    parts = urlsplit(base_url)
+    samples, statuses = [], []
+    lock = threading.Lock()
+    cursor = iter(urls)
+
+    def worker():
+        conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+        local_samples, local_statuses = [], []
+        while True:
+            with lock:
+                url = next(cursor, None)
+            if url is None:
+                break
+            start = time.perf_counter()
+            try:
+                conn.request('GET', url)
+                response = conn.getresponse()
+                response.read()
+                status = response.status
+                if response.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                status = 599
+            local_samples.append((time.perf_counter() - start) * 1000)
+            local_statuses.append(status)
+        conn.close()
+        with lock:
+            samples.extend(local_samples)
+            statuses.extend(local_statuses)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    wall = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.perf_counter() - wall, statuses)
+
+
+def serve(port):
+    """--serve mode: threaded Werkzeug server with HTTP/1.1 keep-alive, no debugger or reloader."""
+    import logging
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    import app as api
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request log lines
+    WSGIRequestHandler.protocol_version = 'HTTP/1.1'
+    make_server('127.0.0.1', port, api.app, threaded=True).serve_forever()
+
+
+def start_server(base_dir, port):
+    env = dict(os.environ, ISL_BASE_DIR=base_dir)
+    log = tempfile.TemporaryFile()  # a file, not a pipe: an unread pipe would stall the server
+    proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), '--serve', str(port)],
+                            env=env, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=log)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            log.seek(0)
+            raise RuntimeError(f"server exited: {log.read().decode(errors='replace')}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/api/health')
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("server did not start within 60s")
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+# --- baselines ---
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def save_baseline(name, report):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(baseline_path(name), 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"Saved baseline {baseline_path(name)}")
+
+
+def compare(report, name, threshold):
+    """Print p50/p99/rps changes against a stored baseline; returns the regressions found."""
+    with open(baseline_path(name), encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta'].get('phrases') != report['meta'].get('phrases'):
+        print(f"Note: baseline used {baseline['meta'].get('phrases')} phrases, this run "
+              f"{report['meta'].get('phrases')}")
+    regressions = []
+    print(f"\nCompared with baseline '{name}' (regression threshold {threshold:.0%}):")
+    print(f"{'mode':<7} {'scenario':<14} {'p50 ms':>16} {'p99 ms':>16} {'req/s':>16}")
+    for mode, scenarios in report['results'].items():
+        for scenario, now in scenarios.items():
+            before = baseline['results'].get(mode, {}).get(scenario)
+            if before is None:
+                continue
+            cells = []
+            for key, higher_is_worse in (('p50_ms', True), ('p99_ms', True), ('rps', False)):
+                old, new = before.get(key), now.get(key)
+                if not old or new is None:
+                    cells.append(f"{'-':>16}")
+                    continue
+                change = (new - old) / old
+                worse = change > threshold if higher_is_worse else change < -threshold
+                if worse:
+                    regressions.append((mode, scenario, key, old, new))
+                cells.append(f"{new:>8.2f} {change:+6.0%}{'!' if worse else ' '}")
+            print(f"{mode:<7} {scenario:<14} " + ' '.join(cells))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--phrases', type=int, default=10_000, help='synthetic phrase GIFs to generate')
+    parser.add_argument('--base', help='use an existing project folder instead of a synthetic tree')
+    parser.add_argument('--modes', nargs='+', choices=('client', 'http'), default=['client', 'http'])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--requests', type=int, default=2000, help='requests per scenario')
+    parser.add_argument('--list-requests', type=int, default=100, help='requests for the list scenarios')
+    parser.add_argument('--concurrency', type=int, default=8, help='HTTP connections')
+    parser.add_argument('--url', help='benchmark an already running server (HTTP mode)')
+    parser.add_argument('--save-baseline', metavar='NAME')
+    parser.add_argument('--compare', metavar='NAME')
+    parser.add_argument('--threshold', type=float, default=0.15, help='relative change counted as regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--serve', type=int, metavar='PORT', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        return serve(args.serve)
+
+    tmp_dir = None
+    base_dir = args.base
+    if base_dir is None:
+        tmp_dir = tempfile.mkdtemp(prefix='isl-bench-')
+        start = time.perf_counter()
+        names = make_tree(tmp_dir, args.phrases, seed=args.seed)
+        print(f"Generated {len(names)} phrases in {time.perf_counter() - start:.1f}s under {tmp_dir}")
+        base_dir = tmp_dir
+    else:
+        names = [os.path.splitext(f)[0] for f in os.listdir(os.path.join(base_dir, 'ISL_Gifs'))
+                 if f.lower().endswith('.gif')]
+    os.environ['ISL_BASE_DIR'] = os.path.abspath(base_dir)
+
+    rng = random.Random(args.seed)
+    workload = {
+        s: make_urls(s, names, args.list_requests if s.endswith('_list') else args.requests, rng)
+        for s in args.scenarios
+    }
+
+    report = {
+        'meta': {
+            'phrases': len(names),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+        },
+        'results': {},
+    }
+    server = None
+    try:
+        for mode in args.modes:
+            if mode == 'http' and not args.url and server is None:
+                port = free_port()
+                server = start_server(os.path.abspath(base_dir), port)
+            results = report['results'][mode] = {}
+            print("=" * 86)
+            print(f"{mode:<7} {'scenario':<14} {'n':>6} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} "
+                  f"{'p99 ms':>9} {'req/s':>9} {'5xx':>5}")
+            print("-" * 86)
+            for scenario, urls in workload.items():
+                if mode == 'client':
+                    stats = run_client(urls)
+                else:
+                    stats = run_http(urls, args.url or f'http://127.0.0.1:{port}', args.concurrency)
+                results[scenario] = stats
+                print(f"{mode:<7} {scenario:<14} {stats['requests']:>6} {stats['mean_ms']:>9.3f} "
+                      f"{stats['p50_ms']:>9.3f} {stats['p95_ms']:>9.3f} {stats['p99_ms']:>9.3f} "
+                      f"{stats['rps']:>9.1f} {stats['errors']:>5}")
+        print("=" * 86)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if args.save_baseline:
+        save_baseline(args.save_baseline, report)
+    if args.compare:
+        regressions = compare(report, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+            if args.fail_on_regression:
+                sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark: packed memory-mapped asset store vs per-file send_file
+Builds a synthetic asset tree and its pack file, then measures
+  raw     reading one asset: open + fstat + read vs a slice of the mapping
+  client  GET /api/phrase/<p> and /api/letter/<l> through the Flask test client
+  http    the same URLs over HTTP against a local server (one per store mode)
+with the pack disabled ("disk") and enabled ("pack").
+
+Usage:
+    python benchmarks/bench_asset_store.py [--phrases 5000] [--frames 12] [--size 320] [--requests 3000]
+    python benchmarks/bench_asset_store.py --modes raw client
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_api import free_port, make_urls, run_client, run_http, start_server, summarize  # noqa: E402
+from synthetic_assets import make_tree  # noqa: E402
+
+NO_PACK = 'no-such-file.pack'
+
+
+def read_file(entry):
+    with open(entry.path, 'rb') as f:
+        os.fstat(f.fileno())  # send_file stats the file for Content-Length / Last-Modified
+        return f.read()
+
+
+def run_raw(entries, store, count, rng):
+    """Per-read latency of both paths over the same random sequence of assets."""
+    picks = [rng.choice(entries) for _ in range(count)]
+    results = {}
+    for name, read in (('disk', read_file), ('pack', lambda entry: bytes(store.get(entry)))):
+        samples = []
+        wall = time.perf_counter()
+        for entry in picks:
+            start = time.perf_counter()
+            read(entry)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = summarize(samples, time.perf_counter() - wall, [200] * len(samples))
+    return results
+
+
+def print_row(mode, store, scenario, stats):
+    print(f"{mode:<7} {store:<5} {scenario:<13} {stats['requests']:>6} {stats['mean_ms']:>9.3f} "
+          f"{stats['p50_ms']:>9.3f} {stats['p99_ms']:>9.3f} {stats['rps']:>10.1f} {stats['errors']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--phrases', type=int, default=5000)
+    parser.add_argument('--frames', type=int, default=12, help='frames per synthetic GIF')
+    parser.add_argument('--size', type=int, default=320, help='synthetic GIF size in px')
+    parser.add_argument('--requests', type=int, default=3000, help='requests (or reads) per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='HTTP connections')
+    parser.add_argument('--modes', nargs='+', choices=('raw', 'client', 'http'), default=['raw', 'client', 'http'])
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='isl-pack-bench-')
+    servers = []
+    try:
+        start = time.perf_counter()
+        names = make_tree(tmp_dir, args.phrases, args.frames, args.size, args.seed)
+        print(f"Generated {len(names)} phrases in {time.perf_counter() - start:.1f}s under {tmp_dir}")
+        os.environ['ISL_BASE_DIR'] = tmp_dir
+        os.environ['ISL_ASSET_PACK'] = NO_PACK
+
+        from asset_index import AssetIndex
+        from asset_store import DEFAULT_PACK_NAME, PackedAssetStore, build_pack
+        assets = AssetIndex(tmp_dir, 'ISL_Gifs', 'letters')
+        assets.refresh(force=True)
+        pack_path = os.path.join(tmp_dir, DEFAULT_PACK_NAME)
+        start = time.perf_counter()
+        count, size = build_pack(assets, pack_path)
+        print(f"Packed {count} assets ({size / 1e6:.1f} MB) in {time.perf_counter() - start:.1f}s")
+        store = PackedAssetStore(pack_path)
+
+        rng = random.Random(args.seed)
+        workload = {
+            'phrase_exact': make_urls('phrase_exact', names, args.requests, rng),
+            'letter': make_urls('letter', names, args.requests, rng),
+        }
+
+        print("=" * 78)
+        print(f"{'mode':<7} {'store':<5} {'scenario':<13} {'n':>6} {'mean ms':>9} {'p50 ms':>9} "
+              f"{'p99 ms':>9} {'req/s':>10} {'5xx':>5}")
+        print("-" * 78)
+        if 'raw' in args.modes:
+            entries = list(assets.phrases()) + list(assets.letters().values())
+            for name, stats in run_raw(entries, store, args.requests, rng).items():
+                print_row('raw', name, 'read', stats)
+        if 'client' in args.modes:
+            import app as api
+            for name, asset_store in (('disk', None), ('pack', store)):
+                api.asset_store = asset_store
+                for scenario, urls in workload.items():
+                    print_row('client', name, scenario, run_client(urls))
+        if 'http' in args.modes:
+            for name, pack in (('disk', NO_PACK), ('pack', DEFAULT_PACK_NAME)):
+                os.environ['ISL_ASSET_PACK'] = pack
+                port = free_port()
+                servers.append(start_server(tmp_dir, port))
+                for scenario, urls in workload.items():
+                    print_row('http', name, scenario, run_http(urls, f'http://127.0.0.1:{port}', args.concurrency))
+        print("=" * 78)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait(timeout=10)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: batch_translate.py throughput and memory as the input grows
+Builds a synthetic asset tree and transcript corpora of increasing size
+(sentences mixing known phrases with words to fingerspell, with the repeats
+real subtitles have), runs the CLI on each in a fresh process and reports
+lines/s and peak RSS, which should both stay flat as the input grows.
+
+Usage:
+    python benchmarks/bench_batch_translate.py [--lines 50000 200000 800000] [--jobs 4] [--phrases 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from synthetic_assets import COMMON_WORDS, make_tree  # noqa: E402
+
+
+def write_corpus(path, lines, names, rng, distinct=20000):
+    """lines transcript lines drawn from `distinct` sentences, written in one pass."""
+    fillers = COMMON_WORDS + [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 8)))
+                              for _ in range(500)]
+    sentences = []
+    for _ in range(distinct):
+        words = []
+        for _ in range(rng.randint(1, 4)):
+            words.append(rng.choice(names).replace('_', ' ') if rng.random() < 0.5 else rng.choice(fillers))
+        sentences.append(' '.join(words).capitalize() + rng.choice(['.', '!', '?', '']))
+    with open(path, 'w', encoding='utf-8') as f:
+        for _ in range(lines):
+            f.write(rng.choice(sentences) + '\n')
+    return os.path.getsize(path)
+
+
+def run_cli(corpus, base_dir, jobs):
+    """Run batch_translate.py with output discarded; returns its progress summary and wall time."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-c',
+         'import json, os, sys, batch_translate as bt; '
+         'out = open(os.devnull, "w", encoding="utf-8"); '
+         'print(json.dumps(bt.run([sys.argv[1]], out, jobs=int(sys.argv[3]), base_dir=sys.argv[2], quiet=True)))',
+         corpus, base_dir, str(jobs)],
+        cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1]), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[50_000, 200_000, 800_000])
+    parser.add_argument('--jobs', type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument('--phrases', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix='isl-batch-bench-')
+    try:
+        names = make_tree(tmp_dir, args.phrases, frames=3, size=64, seed=args.seed)
+        print(f"Generated {len(names)} phrases under {tmp_dir}; {args.jobs} worker processes")
+        print("=" * 78)
+        print(f"{'lines':>9} {'input MB':>9} {'seconds':>8} {'lines/s':>10} {'driver RSS MB':>14} "
+              f"{'worker RSS MB':>14}")
+        print("-" * 78)
+        for lines in args.lines:
+            corpus = os.path.join(tmp_dir, f'corpus_{lines}.txt')
+            size = write_corpus(corpus, lines, names, random.Random(args.seed))
+            summary, _ = run_cli(corpus, tmp_dir, args.jobs)
+            os.remove(corpus)
+            print(f"{summary['lines']:>9} {size / 1e6:>9.1f} {summary['seconds']:>8.1f} "
+                  f"{summary['lines_per_second']:>10.1f} {summary['peak_rss_mb'] or 0:>14.1f} "
+                  f"{summary['worker_peak_rss_mb'] or 0:>14.1f}")
+        print("=" * 78)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark: GIF playback timing accuracy, fixed delay chain vs monotonic scheduler
+Plays synthetic clips with variable, fast and uniform frame delays through
+  legacy     the old ImageLabel loop: the first frame's delay for every frame
+             (below 50ms clamped to 100ms), re-armed after each frame
+  scheduler  frame_schedule.FramePlayer: per-frame delays, position worked out
+             from a monotonic clock on every tick, late frames skipped
+while each tick also costs some simulated UI work (jitter plus occasional
+stalls, as when Tk is busy decoding the next clip). Reports how late each
+frame appears relative to when it should start and how far the whole
+playback overruns its intended length. No display or Pillow needed.
+
+Usage:
+    python benchmarks/bench_frame_timing.py [--loops 3] [--jitter-ms 4] [--stall-ms 80] [--stall-rate 0.03]
+    python benchmarks/bench_frame_timing.py --virtual   # simulated clock: instant and deterministic
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_schedule import FramePlayer, FrameSchedule  # noqa: E402
+
+CLIPS = {
+    'variable': [40, 40, 200, 30, 30, 500, 60, 60, 120, 40],
+    'fast': [20] * 30,
+    'uniform': [100] * 10,
+}
+
+
+class VirtualClock:
+    """Monotonic clock that only advances when sleep() is called."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class RealClock:
+    def __call__(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+def make_work(rng, jitter_ms, stall_ms, stall_rate):
+    """Seconds of simulated UI-thread work before the next timer callback runs."""
+    def work():
+        ms = abs(rng.gauss(0, jitter_ms))
+        if rng.random() < stall_rate:
+            ms += stall_ms
+        return ms / 1000
+    return work
+
+
+def summarize(late_ms, overrun_ms, skipped):
+    late = sorted(late_ms)
+    return {
+        'frames': len(late),
+        'skipped': skipped,
+        'mean_late_ms': sum(late) / len(late) if late else 0.0,
+        'p95_late_ms': late[min(len(late) - 1, int(len(late) * 0.95))] if late else 0.0,
+        'max_late_ms': late[-1] if late else 0.0,
+        'overrun_ms': overrun_ms,
+    }
+
+
+def run_legacy(delays, loops, clock, work):
+    """The previous ImageLabel._animate: one fixed delay, chained after() calls."""
+    schedule = FrameSchedule(delays)
+    delay = delays[0] if delays[0] >= 50 else 100
+    late = []
+    start = clock()
+    for loop in range(loops):
+        for index in range(len(delays)):
+            elapsed_ms = (clock() - start) * 1000
+            late.append(elapsed_ms - (loop * schedule.loop_ms + schedule.starts_ms[index]))
+            clock.sleep(delay / 1000 + work())  # after(delay) fires once the UI work is done
+    overrun_ms = (clock() - start) * 1000 - loops * schedule.loop_ms
+    return summarize(late, overrun_ms, 0)
+
+
+def run_scheduler(delays, loops, clock, work):
+    player = FramePlayer(FrameSchedule(delays), loops=loops, clock=clock)
+    player.start()
+    while True:
+        index, wait_ms = player.tick()
+        if index is None:
+            break
+        clock.sleep(max(1, int(wait_ms + 0.5)) / 1000 + work())
+    overrun_ms = (clock() - player.started) * 1000 - loops * player.schedule.loop_ms
+    stats = summarize(player.late_samples_ms, overrun_ms, player.skipped)
+    # the player's exact running aggregates, not the (possibly sampled) list
+    stats.update(frames=player.shown, mean_late_ms=player.late_sum_ms / player.shown if player.shown else 0.0,
+                 max_late_ms=player.late_max_ms or 0.0)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--loops', type=int, default=3)
+    parser.add_argument('--jitter-ms', type=float, default=4.0, help='std dev of per-tick UI work')
+    parser.add_argument('--stall-ms', type=float, default=80.0, help='length of an occasional UI stall')
+    parser.add_argument('--stall-rate', type=float, default=0.03, help='probability of a stall per tick')
+    parser.add_argument('--virtual', action='store_true', help='simulated clock instead of real sleeps')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 86)
+    print(f"{'clip':<9} {'player':<10} {'frames':>7} {'skipped':>8} {'mean late':>10} "
+          f"{'p95 late':>9} {'max late':>9} {'overrun ms':>11}")
+    print("-" * 86)
+    for clip, delays in CLIPS.items():
+        for name, runner in (('legacy', run_legacy), ('scheduler', run_scheduler)):
+            clock = VirtualClock() if args.virtual else RealClock()
+            work = make_work(random.Random(args.seed), args.jitter_ms, args.stall_ms, args.stall_rate)
+            stats = runner(delays, args.loops, clock, work)
+            print(f"{clip:<9} {name:<10} {stats['frames']:>7} {stats['skipped']:>8} "
+                  f"{stats['mean_late_ms']:>10.1f} {stats['p95_late_ms']:>9.1f} "
+                  f"{stats['max_late_ms']:>9.1f} {stats['overrun_ms']:>11.1f}")
+    print("=" * 86)
+    print("late: ms between a frame's scheduled start and when it appeared (negative: early); "
+          "overrun: playback length minus the intended length")
+
+
+if __name__ == '__main__':
+    main()
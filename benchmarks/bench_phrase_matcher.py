@@ -0,0 +1,126 @@
+"""
+Benchmark: PhraseMatcher vs the original linear partial-match scan
+Builds synthetic phrase libraries of 100, 10k and 100k names and times
+partial-match lookups through both implementations.
+
+Usage:
+    python benchmarks/bench_phrase_matcher.py [--sizes 100 10000 100000] [--queries 2000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_index import normalize_phrase  # noqa: E402
+from phrase_matcher import PhraseMatcher  # noqa: E402
+
+COMMON_WORDS = [
+    'all', 'the', 'best', 'any', 'questions', 'are', 'you', 'angry', 'busy',
+    'hungry', 'be', 'careful', 'good', 'morning', 'hello', 'how', 'i', 'am',
+    'fine', 'nice', 'to', 'meet', 'thank', 'welcome', 'please', 'sorry',
+]
+
+
+def make_vocabulary(size, rng):
+    words = set(COMMON_WORDS)
+    while len(words) < size:
+        words.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))))
+    return sorted(words)
+
+
+def make_library(count, rng):
+    vocab = make_vocabulary(max(200, count // 20), rng)
+    names = set()
+    while len(names) < count:
+        names.add('_'.join(rng.choice(vocab) for _ in range(rng.randint(1, 5))))
+    return [f"{name}.gif" for name in sorted(names)]
+
+
+def legacy_scan(filenames, phrase):
+    """The original get_phrase_gif / find_gif_for_phrase partial-match loop."""
+    words = phrase.strip().lower().split()
+    for filename in filenames:
+        if not filename.lower().endswith('.gif'):
+            continue
+        filename_no_ext = os.path.splitext(filename)[0].lower()
+        if all(word in filename_no_ext for word in words if word):
+            return filename
+    return None
+
+
+def make_queries(filenames, count, rng):
+    queries = []
+    for _ in range(count):
+        words = os.path.splitext(rng.choice(filenames))[0].split('_')
+        kind = rng.random()
+        if kind < 0.5 and len(words) > 1:
+            query = ' '.join(rng.sample(words, rng.randint(1, len(words) - 1)))  # subset
+        elif kind < 0.8:
+            query = ' '.join(w[:max(1, len(w) - 2)] for w in words[:2])           # prefixes
+        else:
+            query = ' '.join(rng.choice(COMMON_WORDS) for _ in range(3))          # likely miss
+        queries.append(query)
+    return queries
+
+
+def time_calls(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return {
+        'mean_us': statistics.fmean(samples),
+        'p50_us': samples[len(samples) // 2],
+        'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def run(size, query_count, seed):
+    rng = random.Random(seed)
+    filenames = make_library(size, rng)
+    queries = make_queries(filenames, query_count, rng)
+
+    start = time.perf_counter()
+    matcher = PhraseMatcher()
+    for filename in filenames:
+        matcher.add(normalize_phrase(os.path.splitext(filename)[0]), filename)
+    matcher.freeze()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # the linear scan is slow at large sizes; sample fewer queries for it
+    legacy_queries = queries[:max(20, query_count // max(1, size // 1000))]
+    legacy = time_calls(lambda q: legacy_scan(filenames, q), legacy_queries)
+    indexed = time_calls(lambda q: matcher.match(normalize_phrase(q)), queries)
+    fuzzy = time_calls(lambda q: matcher.match(normalize_phrase(q), fuzzy=True), queries)
+    return build_ms, legacy, indexed, fuzzy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"{'entries':>8} {'impl':<14} {'mean us':>10} {'p50 us':>10} {'p99 us':>10}  build")
+    print("-" * 78)
+    for size in args.sizes:
+        build_ms, legacy, indexed, fuzzy = run(size, args.queries, args.seed)
+        for name, stats in (('linear scan', legacy), ('matcher', indexed), ('matcher+fuzzy', fuzzy)):
+            extra = f"{build_ms:.0f} ms" if name == 'matcher' else ''
+            print(f"{size:>8} {name:<14} {stats['mean_us']:>10.1f} {stats['p50_us']:>10.1f} "
+                  f"{stats['p99_us']:>10.1f}  {extra}")
+    print("=" * 78)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark: end-to-end recognition latency with mock backends (runs offline)
+Simulates a remote and a local recognizer with configurable latency,
+confidence and network failures, and measures RecognizerChain latency in
+sequential and race mode, online, offline and with a flaky network.
+
+Usage:
+    python benchmarks/bench_recognizers.py [--utterances 20] [--scale 0.25]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recognizers import (DEFAULT_MIN_CONFIDENCE, SPHINX_CONFIDENCE, BackendUnavailable,  # noqa: E402
+                         NetworkState, RecognitionResult, RecognizerBackend, RecognizerChain)
+
+
+class MockBackend(RecognizerBackend):
+    """Sleeps for `latency` seconds, then answers or fails as configured."""
+
+    def __init__(self, name, remote, latency, confidence, fail_latency=None, online=lambda: True):
+        self.name = name
+        self.remote = remote
+        self.latency = latency
+        self.confidence = confidence
+        self.fail_latency = fail_latency if fail_latency is not None else latency
+        self.online = online
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        if self.remote and not self.online():
+            time.sleep(self.fail_latency)  # e.g. DNS / connect timeout
+            raise BackendUnavailable("network unreachable")
+        time.sleep(self.latency)
+        return RecognitionResult(f"{self.name}: {audio}", self.confidence, self.name)
+
+
+SCENARIOS = {
+    'online': lambda rng: True,
+    'offline': lambda rng: False,
+    'flaky (30% down)': lambda rng: rng.random() > 0.3,
+}
+
+
+def run(scenario, mode, backoff, utterances, scale, seed):
+    rng = random.Random(seed)
+    online = SCENARIOS[scenario]
+    remote = MockBackend("remote", True, latency=0.40 * scale, confidence=0.9,
+                         fail_latency=2.0 * scale, online=lambda: online(rng))
+    # configured like the shipped SphinxBackend and chain, so the acceptance rule measured is the real one
+    local = MockBackend("local", False, latency=0.25 * scale, confidence=SPHINX_CONFIDENCE)
+    network = NetworkState(initial_backoff=5.0 * scale if backoff else 0.0, max_backoff=60.0 * scale)
+    chain = RecognizerChain([remote, local], mode=mode, min_confidence=DEFAULT_MIN_CONFIDENCE, network=network)
+
+    samples = []
+    for i in range(utterances):
+        start = time.perf_counter()
+        chain.recognize(f"utterance {i}")
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.05 * scale)  # gap between utterances
+    samples.sort()
+    return {
+        'mean_ms': statistics.fmean(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        'remote_calls': remote.calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--utterances', type=int, default=20)
+    parser.add_argument('--scale', type=float, default=0.25, help='multiply all simulated latencies')
+    parser.add_argument('--seed', type=int, default=3)
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"{'network':<18} {'mode':<11} {'backoff':<8} {'mean ms':>9} {'p95 ms':>9} {'remote calls':>13}")
+    print("-" * 78)
+    for scenario in SCENARIOS:
+        for mode, backoff in (('sequential', False), ('sequential', True), ('race', False), ('race', True)):
+            stats = run(scenario, mode, backoff, args.utterances, args.scale, args.seed)
+            print(f"{scenario:<18} {mode:<11} {'yes' if backoff else 'no':<8} {stats['mean_ms']:>9.1f} "
+                  f"{stats['p95_ms']:>9.1f} {stats['remote_calls']:>13}")
+    print("=" * 78)
+    print(f"Simulated: remote 400ms @0.9 confidence, local 250ms @{SPHINX_CONFIDENCE} (Sphinx), "
+          f"threshold {DEFAULT_MIN_CONFIDENCE}, remote failure 2s (x scale).")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: fingerspelling frame-to-frame latency, Tk vs matplotlib renderer
+Plays the same text through main2.SignWindow and main2.LetterDisplay and
+reports window setup time plus how far each frame interval strays from the
+requested per-letter delay. Needs a display, the letters/ folder and the
+desktop app dependencies (see main2.py).
+
+Usage:
+    python benchmarks/bench_renderers.py [--text "the quick brown fox"] [--delay 0.25]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # main2 resolves ISL_Gifs/ and letters/ relative to the cwd
+
+import main2  # noqa: E402
+
+
+def run_tk(text, delay):
+    start = time.perf_counter()
+    window = main2.SignWindow()
+    window.preload_letters()
+    setup_ms = (time.perf_counter() - start) * 1000
+    try:
+        window.play_letters(text, delay=delay)
+    finally:
+        window.close()
+    return setup_ms, window.timer.summary()
+
+
+def run_matplotlib(text, delay):
+    start = time.perf_counter()
+    display = main2.LetterDisplay()
+    setup_ms = (time.perf_counter() - start) * 1000
+    try:
+        display.display_sequence(text, delay=delay)
+    finally:
+        display.close()
+    return setup_ms, display.timer.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--text', default='the quick brown fox jumps over the lazy dog')
+    parser.add_argument('--delay', type=float, default=0.25, help='seconds per letter')
+    args = parser.parse_args()
+
+    main2.assets.refresh()
+    if not main2.letter_atlas.wait(timeout=30):
+        sys.exit("Letter atlas did not load; is the letters/ folder present?")
+
+    print("=" * 78)
+    print(f"{'renderer':<12} {'setup ms':>9} {'frames':>7} {'mean err':>9} {'p95 |err|':>10} {'max |err|':>10}")
+    print("-" * 78)
+    for name, runner in (('tk', run_tk), ('matplotlib', run_matplotlib)):
+        setup_ms, stats = runner(args.text, args.delay)
+        print(f"{name:<12} {setup_ms:>9.1f} {stats['frames']:>7} {stats.get('mean_error_ms', 0):>9.2f} "
+              f"{stats.get('p95_abs_error_ms', 0):>10.2f} {stats.get('max_abs_error_ms', 0):>10.2f}")
+    print("=" * 78)
+    print("Errors are (actual frame interval - requested delay) in ms.")
+
+
+if __name__ == '__main__':
+    main()
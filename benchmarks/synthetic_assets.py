@@ -0,0 +1,82 @@
+"""
+Synthetic asset trees for benchmarks
+Writes an ISL_Gifs/ folder with N multi-word phrase GIFs and a letters/
+folder with a-z images, shaped like the real project. Every phrase shares
+one encoded GIF, so trees of 100k entries take seconds to build.
+
+Usage:
+    python benchmarks/synthetic_assets.py OUT_DIR [--phrases 10000] [--frames 3] [--size 200]
+"""
+
+import argparse
+import io
+import os
+import random
+import string
+
+from PIL import Image
+
+COMMON_WORDS = [
+    'all', 'the', 'best', 'any', 'questions', 'are', 'you', 'angry', 'busy',
+    'hungry', 'be', 'careful', 'good', 'morning', 'hello', 'how', 'i', 'am',
+    'fine', 'nice', 'to', 'meet', 'thank', 'welcome', 'please', 'sorry',
+]
+
+
+def make_phrase_names(count, seed=7):
+    """count distinct phrase names ("good_morning_you") over a vocabulary that grows with count."""
+    rng = random.Random(seed)
+    vocab = set(COMMON_WORDS)
+    while len(vocab) < max(200, count // 20):
+        vocab.add(''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))))
+    vocab = sorted(vocab)
+    names = set()
+    while len(names) < count:
+        names.add('_'.join(rng.choice(vocab) for _ in range(rng.randint(1, 5))))
+    return sorted(names)
+
+
+def encode_gif(frames=3, size=200, durations=(80, 120, 200)):
+    colors = [(200, 40, 40), (40, 200, 40), (40, 40, 200), (200, 200, 40)]
+    images = [Image.new('RGB', (size, size), colors[i % len(colors)]) for i in range(frames)]
+    out = io.BytesIO()
+    images[0].save(out, format='GIF', save_all=True, append_images=images[1:],
+                   duration=[durations[i % len(durations)] for i in range(frames)], loop=0)
+    return out.getvalue()
+
+
+def encode_jpg(size=200):
+    out = io.BytesIO()
+    Image.new('RGB', (size, size), (230, 230, 230)).save(out, format='JPEG', quality=85)
+    return out.getvalue()
+
+
+def make_tree(root, phrases=1000, frames=3, size=200, seed=7):
+    """Create root/ISL_Gifs and root/letters; returns the list of phrase names written."""
+    gif_dir = os.path.join(root, 'ISL_Gifs')
+    letters_dir = os.path.join(root, 'letters')
+    os.makedirs(gif_dir, exist_ok=True)
+    os.makedirs(letters_dir, exist_ok=True)
+
+    gif = encode_gif(frames, size)
+    names = make_phrase_names(phrases, seed)
+    for name in names:
+        with open(os.path.join(gif_dir, f'{name}.gif'), 'wb') as f:
+            f.write(gif)
+    jpg = encode_jpg(size)
+    for letter in string.ascii_lowercase:
+        with open(os.path.join(letters_dir, f'{letter}.jpg'), 'wb') as f:
+            f.write(jpg)
+    return names
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('out_dir')
+    parser.add_argument('--phrases', type=int, default=10_000)
+    parser.add_argument('--frames', type=int, default=3)
+    parser.add_argument('--size', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+    names = make_tree(args.out_dir, args.phrases, args.frames, args.size, args.seed)
+    print(f"Wrote {len(names)} phrase GIFs and 26 letters under {args.out_dir}")
@@ -1,47 +1,69 @@
 """
-Helper script to convert existing letter JPG files to GIF format
-This script helps prepare letter images for the web-based ISL converter
+Asset build tool for the ISL converter
+Builds normalized renditions of every letter image (letters/) and phrase GIF
+(ISL_Gifs/): resized, palette-optimized GIFs, WebPs and first-frame PNG
+thumbnails under renditions/, ready for the API server to send as-is.
 
-Note: This script converts static JPG to static GIF (not animated).
-For animated GIFs, you would need source animation files.
+Work is spread over a process pool, and a content-hash manifest
+(renditions/manifest.json) records what each output was built from, so only
+new or changed sources are rebuilt and outputs of deleted sources are removed.
+
+Usage:
+    python convert_letters_to_gif.py [--jobs N] [--force] [--widths 120 240 500] [--formats gif webp]
+    python convert_letters_to_gif.py --legacy-gif   # old behaviour: ISL_Gifs/A.jpg -> ISL_Gifs/A.gif
 """
 
+import argparse
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
 from PIL import Image
 
+from asset_index import AssetIndex
+from renditions import (KIND_LETTERS, KIND_PHRASES, RENDITION_FORMATS, RENDITION_WIDTHS,
+                        RENDITIONS_DIR, THUMBNAIL_WIDTH, build_rendition, load_frames,
+                        rendition_relpath, rendition_stem, thumbnail_relpath)
+
 # Configuration
 ISL_GIFS_DIR = "ISL_Gifs"
+LETTERS_DIR = "letters"
 LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BASE_DIR = Path(__file__).parent
+MANIFEST_PATH = os.path.join(RENDITIONS_DIR, "manifest.json")
+MANIFEST_VERSION = 1
+
 
 def convert_jpg_to_gif():
-    """Convert existing JPG letter files to GIF format"""
+    """Convert existing JPG letter files to GIF format (legacy, static GIFs in ISL_Gifs/)"""
     if not os.path.isdir(ISL_GIFS_DIR):
         print(f"Error: {ISL_GIFS_DIR} directory not found!")
         return
-    
+
     converted = 0
     skipped = 0
     errors = 0
-    
+
     print(f"Scanning {ISL_GIFS_DIR} for letter images...")
     print("-" * 50)
-    
+
     for letter in LETTERS:
         jpg_path = os.path.join(ISL_GIFS_DIR, f"{letter}.jpg")
         gif_path = os.path.join(ISL_GIFS_DIR, f"{letter}.gif")
-        
+
         # Check if JPG exists
         if not os.path.exists(jpg_path):
             print(f"  {letter}: JPG not found, skipping")
             skipped += 1
             continue
-        
-        # Check if GIF already exists
-        if os.path.exists(gif_path):
-            print(f"  {letter}: GIF already exists, skipping")
+
+        # Skip only if the GIF is at least as new as its source
+        if os.path.exists(gif_path) and os.path.getmtime(gif_path) >= os.path.getmtime(jpg_path):
+            print(f"  {letter}: GIF up to date, skipping")
             skipped += 1
             continue
-        
+
         # Convert JPG to GIF
         try:
             img = Image.open(jpg_path)
@@ -55,7 +77,7 @@ def convert_jpg_to_gif():
                 img = background
             elif img.mode != 'RGB':
                 img = img.convert('RGB')
-            
+
             # Save as GIF
             img.save(gif_path, 'GIF')
             print(f"  {letter}: ✓ Converted {jpg_path} → {gif_path}")
@@ -63,24 +85,150 @@ def convert_jpg_to_gif():
         except Exception as e:
             print(f"  {letter}: ✗ Error converting: {e}")
             errors += 1
-    
+
     print("-" * 50)
     print(f"Summary: {converted} converted, {skipped} skipped, {errors} errors")
-    
-    if converted > 0:
-        print(f"\n✓ Successfully converted {converted} letter images to GIF format!")
-        print("  The web application will now use these GIF files.")
-    else:
-        print("\n⚠ No files were converted.")
-        print("  The web application will use existing JPG files as fallback.")
+
+
+# --- rendition build ---
+def asset_outputs(kind, stem, widths, formats):
+    """Output paths (relative to base_dir) of every rendition of one source, thumbnail last."""
+    outputs = [rendition_relpath(kind, stem, width, fmt) for width in widths for fmt in formats]
+    return outputs + [thumbnail_relpath(kind, stem)]
+
+
+def build_asset(src_path, kind, stem, widths, formats, base_dir):
+    """Build every rendition of one source (runs in a worker process).
+
+    Decodes the source once and returns the list of output paths relative to base_dir.
+    """
+    frames, durations = load_frames(src_path)
+    outputs = asset_outputs(kind, stem, widths, formats)
+    sizes = [(width, fmt) for width in widths for fmt in formats] + [(THUMBNAIL_WIDTH, 'png')]
+    for relpath, (width, fmt) in zip(outputs, sizes):
+        build_rendition(src_path, os.path.join(base_dir, relpath), width, fmt,
+                        frames=frames, durations=durations)
+    return outputs
+
+
+def load_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "options": {}, "assets": {}}
+
+
+def save_manifest(path, manifest):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _remove_outputs(base_dir, outputs):
+    for relpath in outputs:
+        try:
+            os.remove(os.path.join(base_dir, relpath))
+        except OSError:
+            pass
+
+
+def build_renditions(jobs=None, force=False, widths=RENDITION_WIDTHS, formats=RENDITION_FORMATS,
+                     base_dir=BASE_DIR):
+    """Incrementally (re)build renditions for all letters and phrase GIFs. Returns a summary dict."""
+    base_dir = Path(base_dir)
+    index = AssetIndex(base_dir, ISL_GIFS_DIR, LETTERS_DIR)
+    index.refresh(force=True)
+    sources = [(entry, KIND_LETTERS) for _, entry in sorted(index.letters().items())]
+    sources += [(entry, KIND_PHRASES) for entry in index.phrases()]
+
+    manifest_path = base_dir / MANIFEST_PATH
+    manifest = load_manifest(manifest_path)
+    options = {"widths": list(widths), "formats": list(formats), "thumbnail": THUMBNAIL_WIDTH}
+    options_changed = manifest.get("options") != options
+    old_assets = manifest.get("assets", {})
+    new_assets = {}
+
+    tasks = []
+    skipped = 0
+    for entry, kind in sources:
+        digest = entry.content_hash
+        previous = old_assets.get(entry.relpath)
+        up_to_date = (
+            not force and not options_changed and previous is not None
+            and previous.get("hash") == digest
+            and previous.get("outputs") == sorted(asset_outputs(kind, rendition_stem(entry), widths, formats))
+            and all((base_dir / o).exists() for o in previous.get("outputs", []))
+        )
+        if up_to_date:
+            new_assets[entry.relpath] = previous
+            skipped += 1
+        else:
+            tasks.append((entry, kind, digest))
+
+    built = 0
+    errors = 0
+    stale = set()  # previous outputs of rebuilt sources, removed below unless rebuilt again
+    print(f"Building renditions for {len(sources)} assets ({len(tasks)} changed, {skipped} up to date)...")
+    print("-" * 50)
+    if tasks:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(build_asset, entry.path, kind, rendition_stem(entry),
+                            tuple(widths), tuple(formats), str(base_dir)): (entry, kind, digest)
+                for entry, kind, digest in tasks
+            }
+            for future in as_completed(futures):
+                entry, kind, digest = futures[future]
+                try:
+                    outputs = future.result()
+                except Exception as e:
+                    print(f"  {entry.relpath}: ✗ Error building renditions: {e}")
+                    errors += 1
+                    continue
+                stale.update(old_assets.get(entry.relpath, {}).get("outputs", []))
+                new_assets[entry.relpath] = {"hash": digest, "kind": kind, "outputs": sorted(outputs)}
+                print(f"  {entry.relpath}: ✓ {len(outputs)} renditions")
+                built += 1
+
+    # sources that disappeared: delete what was built from them. Old outputs are
+    # only removed once no current source owns the same file (a.png replaced by
+    # a.jpg keeps the letter's renditions)
+    removed = 0
+    for relpath in set(old_assets) - {entry.relpath for entry, _ in sources}:
+        stale.update(old_assets[relpath].get("outputs", []))
+        removed += 1
+    current = {o for asset in new_assets.values() for o in asset["outputs"]}
+    _remove_outputs(base_dir, stale - current)
+
+    manifest = {"version": MANIFEST_VERSION, "options": options, "assets": new_assets}
+    save_manifest(manifest_path, manifest)
+
+    print("-" * 50)
+    print(f"Summary: {built} built, {skipped} up to date, {removed} removed, {errors} errors")
+    return {"built": built, "skipped": skipped, "removed": removed, "errors": errors}
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build resized GIF/WebP renditions of ISL assets")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="rebuild everything, ignoring the manifest")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(RENDITION_WIDTHS))
+    parser.add_argument("--formats", nargs="+", choices=RENDITION_FORMATS, default=list(RENDITION_FORMATS))
+    parser.add_argument("--legacy-gif", action="store_true",
+                        help="only convert ISL_Gifs/<LETTER>.jpg to static GIFs (old behaviour)")
+    args = parser.parse_args()
+
     print("=" * 50)
-    print("Letter Image Converter (JPG → GIF)")
+    print("ISL Asset Builder")
     print("=" * 50)
     print()
-    convert_jpg_to_gif()
-    print()
-    print("Note: This creates static GIFs from JPG files.")
-    print("For animated GIFs, you need source animation files.")
-
+    if args.legacy_gif:
+        convert_jpg_to_gif()
+    else:
+        build_renditions(jobs=args.jobs, force=args.force, widths=args.widths, formats=args.formats)
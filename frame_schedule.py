@@ -0,0 +1,116 @@
+"""
+Frame scheduling for animated GIF playback
+Plays every frame for its own delay, normalized the way browsers do it, and
+drives playback from a monotonic clock instead of chaining fixed timers: each
+tick works out which frame should be visible from the time elapsed since
+playback started, so timer lateness never accumulates and a frame whose slot
+has already passed is skipped rather than shown late.
+"""
+
+import random
+import time
+from bisect import bisect_right
+
+from gif_info import browser_delay
+
+# Lateness samples kept for the p95: playback can run forever, so beyond this
+# many frames a uniform random sample (reservoir) stands in for all of them
+LATENESS_SAMPLES = 1024
+
+
+class FrameSchedule:
+    """Per-frame delays (ms) of one animation and the offset where each frame starts."""
+
+    def __init__(self, delays_ms):
+        self.delays_ms = [browser_delay(int(d or 0)) for d in delays_ms]
+        self.starts_ms = []
+        total = 0
+        for delay in self.delays_ms:
+            self.starts_ms.append(total)
+            total += delay
+        self.loop_ms = total
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Schedule for PIL frames carrying their delay in info["duration"] (see compose_frames)."""
+        return cls(f.info.get("duration", 0) for f in frames)
+
+    def __len__(self):
+        return len(self.delays_ms)
+
+    def frame_at(self, offset_ms):
+        """Index of the frame visible offset_ms into one loop."""
+        return bisect_right(self.starts_ms, offset_ms % self.loop_ms) - 1
+
+
+class FramePlayer:
+    """Clock-driven playback position over a FrameSchedule.
+
+    Call start(), then tick() whenever a timer fires: it returns the frame to
+    show now and how long to wait before the next tick. loops=None plays
+    forever; otherwise tick() returns (None, None) once the loops are done.
+    Lateness is kept as a running count, sum and max plus a bounded sample,
+    so an endlessly looping clip does not grow memory.
+    """
+
+    def __init__(self, schedule, loops=None, clock=time.monotonic):
+        self.schedule = schedule
+        self.loops = loops
+        self.clock = clock
+        self.started = None
+        self._rng = random.Random()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.shown = 0
+        self.skipped = 0
+        # how long after its scheduled start each shown frame appeared
+        self.late_sum_ms = 0.0
+        self.late_max_ms = None
+        self.late_samples_ms = []  # every frame's lateness in order, until LATENESS_SAMPLES frames
+        self._last = -1            # absolute number (loop * frames + index) of the last frame shown
+
+    def _record_lateness(self, late_ms):
+        self.late_sum_ms += late_ms
+        if self.late_max_ms is None or late_ms > self.late_max_ms:
+            self.late_max_ms = late_ms
+        if len(self.late_samples_ms) < LATENESS_SAMPLES:
+            self.late_samples_ms.append(late_ms)
+        else:
+            slot = self._rng.randrange(self.shown)  # shown already counts this frame
+            if slot < LATENESS_SAMPLES:
+                self.late_samples_ms[slot] = late_ms
+
+    def start(self):
+        self.started = self.clock()
+        self.reset_stats()
+
+    def tick(self):
+        """(frame index, ms until the next frame starts), or (None, None) when finished."""
+        schedule = self.schedule
+        if self.started is None or not len(schedule):
+            return None, None
+        elapsed = (self.clock() - self.started) * 1000
+        loop, offset = divmod(elapsed, schedule.loop_ms)
+        if self.loops is not None and loop >= self.loops:
+            return None, None
+        index = schedule.frame_at(offset)
+        frame_start = schedule.starts_ms[index]
+        absolute = int(loop) * len(schedule) + index
+        if absolute != self._last:
+            self.skipped += max(0, absolute - self._last - 1)
+            self.shown += 1
+            self._record_lateness(offset - frame_start)
+            self._last = absolute
+        return index, frame_start + schedule.delays_ms[index] - offset
+
+    def stats(self):
+        """Frame counts and lateness; mean and max are exact, p95 comes from the sample."""
+        late = sorted(self.late_samples_ms)
+        return {
+            'frames': self.shown,
+            'skipped': self.skipped,
+            'mean_late_ms': round(self.late_sum_ms / self.shown, 2) if self.shown else None,
+            'p95_late_ms': round(late[min(len(late) - 1, int(len(late) * 0.95))], 2) if late else None,
+            'max_late_ms': round(self.late_max_ms, 2) if self.shown else None,
+        }
@@ -0,0 +1,125 @@
+"""
+Shared GIF frame composition helpers
+Composes animated GIF frames onto a running RGBA canvas so partial frames and
+transparency (GIF disposal) display correctly. Used by the desktop app's
+ImageLabel and by the server-side sentence renderer.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageSequence
+
+DEFAULT_FRAME_DELAY_MS = 100
+DEFAULT_FRAME_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def compose_frames(im, maxdim=500):
+    """Return a list of RGBA PIL Images representing each displayed frame.
+
+    Each composed frame carries the source frame's delay in
+    frame.info["duration"] (ms, as stored in the file).
+    """
+    frames = []
+    mode = 'RGBA'
+    base = Image.new(mode, im.size)  # composite background
+    palette = im.getpalette() if hasattr(im, "getpalette") else None
+
+    try:
+        for frame in ImageSequence.Iterator(im):
+            # ensure palette retained for 'P' frames
+            if palette and getattr(frame, "mode", None) == "P":
+                frame.putpalette(palette)
+            frame_rgba = frame.convert(mode)
+
+            # paste onto composite using frame alpha as mask
+            composite = base.copy()
+            composite.paste(frame_rgba, (0, 0), frame_rgba)
+            duration = frame.info.get("duration", im.info.get("duration", DEFAULT_FRAME_DELAY_MS))
+
+            # update base to composite (simple disposal handling) before resizing
+            base = composite
+
+            # resize if needed (maintain aspect)
+            if composite.width > maxdim or composite.height > maxdim:
+                composite = composite.copy()
+                composite.thumbnail((maxdim, maxdim), Image.Resampling.LANCZOS)
+
+            composite.info["duration"] = duration
+            frames.append(composite)
+    except Exception as e:
+        print("Error composing GIF frames:", e)
+    return frames
+
+
+def _frames_nbytes(frames):
+    return sum(f.width * f.height * len(f.getbands()) for f in frames)
+
+
+class FrameCache:
+    """Process-wide LRU of composed, resized frames.
+
+    Keyed by (absolute path, mtime, maxdim) so an edited file is decoded again;
+    bounded by an estimate of decoded pixel memory. Cached frames are shared
+    and must be treated as read-only by callers.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (frames, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_frames(self, path, maxdim=500):
+        """Return composed frames for path, decoding only on a cache miss."""
+        path = os.path.abspath(path)
+        key = (path, os.stat(path).st_mtime_ns, maxdim)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+
+        # decode outside the lock so other lookups are not blocked
+        with Image.open(path) as im:
+            frames = compose_frames(im, maxdim=maxdim)
+        nbytes = _frames_nbytes(frames)
+        if not frames or nbytes > self.max_bytes:
+            return frames
+
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._items[key] = (frames, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._bytes -= evicted
+        return frames
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# shared by every ImageLabel and the sentence renderer in this process
+frame_cache = FrameCache()
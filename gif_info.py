@@ -0,0 +1,86 @@
+"""
+Lightweight GIF metadata reader
+Walks the GIF block structure to extract per-frame delays without decoding
+any image data, so the API can report clip durations without Pillow.
+"""
+
+import os
+
+BROWSER_MIN_DELAY_MS = 20      # browsers treat delays at or below 10ms as "too fast"
+BROWSER_DEFAULT_DELAY_MS = 100  # ...and play those frames at 100ms instead
+
+
+def _skip_sub_blocks(data, pos):
+    while pos < len(data):
+        size = data[pos]
+        pos += 1
+        if size == 0:
+            break
+        pos += size
+    return pos
+
+
+def parse_frame_delays(data):
+    """Return the raw per-frame delays (ms) of GIF bytes; [] if not a GIF."""
+    if len(data) < 13 or data[:3] != b'GIF':
+        return []
+    packed = data[10]
+    pos = 13
+    if packed & 0x80:
+        pos += 3 * (2 << (packed & 0x07))
+
+    delays = []
+    pending_delay = 0
+    while pos < len(data):
+        block = data[pos]
+        pos += 1
+        if block == 0x21:  # extension
+            if pos >= len(data):
+                break
+            label = data[pos]
+            pos += 1
+            if label == 0xF9 and pos + 5 <= len(data):  # graphic control extension
+                pending_delay = int.from_bytes(data[pos + 2:pos + 4], 'little') * 10
+            pos = _skip_sub_blocks(data, pos)
+        elif block == 0x2C:  # image descriptor
+            if pos + 9 > len(data):
+                break
+            packed = data[pos + 8]
+            pos += 9
+            if packed & 0x80:
+                pos += 3 * (2 << (packed & 0x07))
+            pos += 1  # LZW minimum code size
+            pos = _skip_sub_blocks(data, pos)
+            delays.append(pending_delay)
+            pending_delay = 0
+        elif block == 0x3B:  # trailer
+            break
+        else:
+            break  # corrupt stream; return what we have
+    return delays
+
+
+def read_frame_delays(path):
+    """Return the raw per-frame delays (ms) of a GIF file; [] for other formats."""
+    if os.path.splitext(path)[1].lower() != '.gif':
+        return []
+    try:
+        with open(path, 'rb') as f:
+            return parse_frame_delays(f.read())
+    except OSError:
+        return []
+
+
+def browser_delay(delay_ms):
+    """Delay a browser will actually use for a frame with the given GIF delay."""
+    return BROWSER_DEFAULT_DELAY_MS if delay_ms < BROWSER_MIN_DELAY_MS else delay_ms
+
+
+def playback_delays_ms(path):
+    """Per-frame delays (ms) of the GIF as browsers play them ([] for non-GIFs)."""
+    return [browser_delay(d) for d in read_frame_delays(path)]
+
+
+def playback_duration_ms(path):
+    """Length of one loop of the GIF as browsers play it (0 for non-GIFs)."""
+    return sum(playback_delays_ms(path))
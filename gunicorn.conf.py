@@ -0,0 +1,68 @@
+"""
+gunicorn configuration for the ISL Converter API
+Usage: gunicorn -c gunicorn.conf.py wsgi:app
+Every setting can be overridden with ISL_* environment variables.
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+bind = os.environ.get('ISL_BIND', '0.0.0.0:5000')
+
+# Workers merge their metrics through this directory, so a scrape of
+# /api/metrics covers every worker whichever one answers it. Set before the
+# app is imported; a temporary one is made (and removed on exit) if unset.
+if not os.environ.get('ISL_METRICS_DIR'):
+    os.environ['ISL_METRICS_DIR'] = tempfile.mkdtemp(prefix='isl-metrics-')
+    _temporary_metrics_dir = True
+else:
+    _temporary_metrics_dir = False
+
+# Threaded workers: requests are mostly file I/O, so a few processes with
+# several threads each keep many downloads in flight without much memory
+worker_class = 'gthread'
+workers = int(os.environ.get('ISL_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads = int(os.environ.get('ISL_THREADS', '8'))
+timeout = 60
+keepalive = 5
+
+# Import the app (and build the asset index) once in the master before forking
+preload_app = True
+
+# Let the kernel copy file bodies (os.sendfile) instead of reading them into Python
+sendfile = True
+
+accesslog = os.environ.get('ISL_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    # The index watcher and metrics threads started at import do not survive
+    # fork; stop them in the master so neither holds a lock while a worker is
+    # forked, and start the workers from empty metric snapshots
+    from app import asset_index, metrics
+    from metrics import clear_shared
+    asset_index.stop()
+    metrics.stop()
+    clear_shared(metrics.shared_dir)
+
+
+def post_fork(server, worker):
+    # Each worker watches the asset folders and writes its metric snapshots itself
+    from app import asset_index, metrics
+    asset_index.start()
+    metrics.start()
+
+
+def worker_exit(server, worker):
+    # Keep the exiting worker's request counts in the merged metrics
+    from app import metrics
+    metrics.stop()
+    metrics.flush(final=True)
+
+
+def on_exit(server):
+    if _temporary_metrics_dir:
+        shutil.rmtree(os.environ['ISL_METRICS_DIR'], ignore_errors=True)
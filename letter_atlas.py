@@ -0,0 +1,163 @@
+"""
+Preloaded letter atlas for fingerspelling
+Decodes and resizes every letter image once, on a background thread, into a
+single packed NumPy buffer. Display code then reads zero-copy views from
+memory, so no file is opened or resized while letters are being shown.
+The atlas is rebuilt in the background whenever the asset index sees a letter
+image added, removed or replaced; the old one is served until then. If it is
+not ready in time, or loading failed, letters are decoded from disk instead.
+"""
+
+import string
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+BACKGROUND = (255, 255, 255)
+DEFAULT_WAIT = 10.0  # seconds get() waits for the atlas before decoding from disk
+
+
+def _load_rgb(path, maxdim):
+    """Decode an image, flatten any alpha onto white and shrink to maxdim."""
+    with Image.open(path) as im:
+        rgba = im.convert("RGBA")
+    rgba.thumbnail((maxdim, maxdim), Image.Resampling.LANCZOS)
+    rgb = Image.new("RGB", rgba.size, BACKGROUND)
+    rgb.paste(rgba, (0, 0), rgba)
+    return np.asarray(rgb, dtype=np.uint8)
+
+
+class LetterAtlas:
+    """All letter images as RGB uint8 arrays packed into one contiguous buffer."""
+
+    def __init__(self, assets, maxdim=500, letters=string.ascii_lowercase):
+        self.assets = assets
+        self.maxdim = maxdim
+        self.letters = letters
+        self._atlas = (np.empty(0, dtype=np.uint8), {})  # (buffer, letter -> (offset, height, width))
+        self._loaded = None  # letter files (see _entries) the buffer was built from
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._running = False  # a loader thread is running
+        self._again = False    # the letters changed while it was decoding
+        self.load_seconds = None
+        self.error = None  # exception of the last failed load, None once one succeeds
+        assets.add_listener(self._index_changed)
+
+    def _entries(self):
+        """(letter -> AssetEntry or None, a signature that changes when any letter file does)."""
+        entries = {ch: self.assets.find_letter(ch) for ch in self.letters}
+        signature = tuple((ch, e.relpath, e.stat_key) if e is not None else (ch, None, None)
+                          for ch, e in entries.items())
+        return entries, signature
+
+    def load(self):
+        """Decode every letter now (runs on the background thread via start())."""
+        if self.assets.generation == 0:
+            self.assets.refresh()  # never scanned yet: loading now would cache an empty atlas
+        start = time.perf_counter()
+        entries, signature = self._entries()
+        arrays = {}
+        for ch, entry in entries.items():
+            if entry is None:
+                print("Letter image missing:", ch)
+                continue
+            try:
+                arrays[ch] = _load_rgb(entry.path, self.maxdim)
+            except Exception as e:
+                print("Error loading letter image:", entry.relpath, e)
+
+        total = sum(a.size for a in arrays.values())
+        buffer = np.empty(total, dtype=np.uint8)
+        slots = {}
+        offset = 0
+        for ch, a in arrays.items():
+            buffer[offset:offset + a.size] = a.ravel()
+            slots[ch] = (offset, a.shape[0], a.shape[1])
+            offset += a.size
+        self._atlas, self._loaded = (buffer, slots), signature
+        self.load_seconds = time.perf_counter() - start
+        self._ready.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.load()
+                self.error = None
+            except Exception as e:
+                self.error = e
+                print("Letter atlas load failed:", e)
+            finally:
+                self._ready.set()  # waiters fall back to disk rather than block forever
+            with self._lock:
+                # a change may just be the refresh load() did itself: go again only if letters differ
+                if not self._again or self._entries()[1] == self._loaded:
+                    self._again = self._running = False
+                    return
+                self._again = False
+
+    def _spawn(self):
+        with self._lock:
+            if self._running:
+                self._again = True  # the running loader goes round once more
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="letter-atlas", daemon=True).start()
+
+    def _index_changed(self, assets):
+        # called after every index rebuild, on whichever thread refreshed it: only compare and hand off
+        if self._running or (self._ready.is_set() and self._entries()[1] != self._loaded):
+            self._spawn()
+
+    def start(self):
+        """Begin loading in the background (idempotent)."""
+        if not self._ready.is_set() and not self._running:
+            self._spawn()
+
+    def wait(self, timeout=DEFAULT_WAIT):
+        """Block until a load attempt finished (see error); starts loading if nobody did yet.
+
+        Returns False if it did not within timeout seconds (None waits forever).
+        """
+        self.start()
+        return self._ready.wait(timeout)
+
+    @property
+    def ready(self):
+        return self._ready.is_set() and self.error is None
+
+    def get(self, ch, timeout=DEFAULT_WAIT):
+        """Return a read-only (H, W, 3) view of the letter image, or None if missing.
+
+        Decodes the file itself when the atlas is not loaded within timeout
+        seconds or its load failed.
+        """
+        if self.wait(timeout):
+            buffer, slots = self._atlas
+            slot = slots.get(ch.lower())
+            if slot is not None:
+                offset, height, width = slot
+                view = buffer[offset:offset + height * width * 3].reshape(height, width, 3)
+                view.flags.writeable = False
+                return view
+            if self.error is None:
+                return None
+        return self._from_disk(ch)
+
+    def _from_disk(self, ch):
+        entry = self.assets.find_letter(ch.lower())
+        if entry is None:
+            return None
+        try:
+            image = _load_rgb(entry.path, self.maxdim)
+        except Exception as e:
+            print("Error loading letter image:", entry.relpath, e)
+            return None
+        image.flags.writeable = False
+        return image
+
+    @property
+    def nbytes(self):
+        return self._atlas[0].nbytes
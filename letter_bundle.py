@@ -0,0 +1,160 @@
+"""
+Letter bundles for the ISL converter web client
+Packs the whole alphabet into one response so fingerspelling needs no
+per-letter requests: a sprite sheet (every letter centered in a square cell
+of a fixed a-z grid) with a coordinate map, or a zip of the original files
+with a manifest. Bundles are built once per set of letter files and kept in
+memory; their ETags come from the letters' content hashes, so conditional
+requests are answered without building anything.
+"""
+
+import hashlib
+import io
+import json
+import string
+import threading
+import zipfile
+
+from PIL import Image
+
+SPRITE_COLUMNS = 13
+DEFAULT_SPRITE_CELL = 240
+SPRITE_FORMATS = {
+    'webp': ('WEBP', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'image/jpeg', {'quality': 85, 'optimize': True}),
+    'png': ('PNG', 'image/png', {'optimize': True}),
+}
+BACKGROUND = (255, 255, 255)
+LETTERS = string.ascii_lowercase
+
+
+def sprite_layout(letters, cell=DEFAULT_SPRITE_CELL, columns=SPRITE_COLUMNS):
+    """{letter: {x, y, w, h}} in sprite pixels; cells follow a-z order whether or not a letter exists."""
+    layout = {}
+    for position, letter in enumerate(LETTERS):
+        if letter in letters:
+            row, column = divmod(position, columns)
+            layout[letter] = {'x': column * cell, 'y': row * cell, 'w': cell, 'h': cell}
+    return layout
+
+
+def sprite_size(cell=DEFAULT_SPRITE_CELL, columns=SPRITE_COLUMNS):
+    """(width, height) of the sprite sheet in pixels."""
+    return columns * cell, -(-len(LETTERS) // columns) * cell
+
+
+def _fit_in_cell(path, cell):
+    """The first frame of an image, flattened onto white and centered in a cell x cell square."""
+    with Image.open(path) as im:
+        frame = im.convert('RGBA')
+    frame.thumbnail((cell, cell), Image.Resampling.LANCZOS)
+    canvas = Image.new('RGB', (cell, cell), BACKGROUND)
+    canvas.paste(frame, ((cell - frame.width) // 2, (cell - frame.height) // 2), frame)
+    return canvas
+
+
+def build_sprite(letters, cell=DEFAULT_SPRITE_CELL, fmt='webp', columns=SPRITE_COLUMNS):
+    """Encode the sprite sheet for {letter: AssetEntry}; returns the image bytes."""
+    pil_format, _, options = SPRITE_FORMATS[fmt]
+    sheet = Image.new('RGB', sprite_size(cell, columns), BACKGROUND)
+    for letter, box in sprite_layout(letters, cell, columns).items():
+        sheet.paste(_fit_in_cell(letters[letter].path, cell), (box['x'], box['y']))
+    out = io.BytesIO()
+    sheet.save(out, format=pil_format, **options)
+    return out.getvalue()
+
+
+def build_zip(letters, manifest):
+    """Zip the original letter files (already compressed, so stored) plus manifest.json."""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as bundle:
+        for letter in sorted(letters):
+            bundle.write(letters[letter].path, letters[letter].filename, compress_type=zipfile.ZIP_STORED)
+        bundle.writestr('manifest.json', json.dumps(manifest, indent=2), compress_type=zipfile.ZIP_DEFLATED)
+    return out.getvalue()
+
+
+class LetterBundler:
+    """Builds and caches sprite sheets and zip bundles for the indexed letters.
+
+    Everything is keyed by a signature of the letters' content hashes, so a
+    changed or added letter file produces new bundles (and new ETags) and the
+    old ones are dropped on the next request.
+    """
+
+    def __init__(self, assets):
+        self.assets = assets
+        self._signature = None
+        self._items = {}          # (kind, cell, fmt) -> bytes, for the current signature
+        self._lock = threading.Lock()
+        self._building = {}       # key -> lock, so concurrent requests build once
+        self.hits = 0
+        self.misses = 0
+
+    def letters(self):
+        indexed = self.assets.letters()
+        return {letter: indexed[letter] for letter in LETTERS if letter in indexed}
+
+    def signature(self, letters=None):
+        """Short hash over every letter's name and content hash."""
+        letters = self.letters() if letters is None else letters
+        digest = hashlib.blake2b(digest_size=8)
+        for letter, entry in sorted(letters.items()):
+            digest.update(f'{letter}:{entry.content_hash};'.encode())
+        return digest.hexdigest()
+
+    def etag(self, kind, cell=None, fmt=None):
+        """ETag of a bundle, computed without building it."""
+        return '-'.join(str(part) for part in (self.signature(), kind, cell, fmt) if part is not None)
+
+    def manifest(self, letters=None):
+        letters = self.letters() if letters is None else letters
+        return {
+            'letters': {letter.upper(): {'filename': entry.filename, 'etag': entry.content_hash}
+                        for letter, entry in letters.items()},
+            'count': len(letters),
+            'etag': self.signature(letters),
+        }
+
+    def _get(self, key, build):
+        letters = self.letters()
+        signature = self.signature(letters)
+        with self._lock:
+            if signature != self._signature:
+                self._signature, self._items = signature, {}
+            data = self._items.get(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            self.misses += 1
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            with self._lock:
+                data = self._items.get(key) if signature == self._signature else None
+            if data is None:
+                data = build(letters)
+                with self._lock:
+                    if signature == self._signature:
+                        self._items[key] = data
+        return data
+
+    def sprite(self, cell=DEFAULT_SPRITE_CELL, fmt='webp'):
+        """Sprite sheet bytes for the current letters."""
+        return self._get(('sprite', cell, fmt), lambda letters: build_sprite(letters, cell, fmt))
+
+    def zip(self):
+        """Zip bundle bytes (originals + manifest.json) for the current letters."""
+        return self._get(('zip', None, None), lambda letters: build_zip(letters, self.manifest(letters)))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': sum(len(data) for data in self._items.values()),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
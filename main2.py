@@ -1,23 +1,47 @@
+import argparse
+import atexit
 import os
 import time
 import string
-import speech_recognition as sr
-from easygui import buttonbox
-from PIL import Image, ImageTk, ImageSequence
-import matplotlib.pyplot as plt
+
+from startup import LazyModule, Warmup, profile  # first: the startup profile's clock starts here
+
 import tkinter as tk
+from PIL import Image
+
+# heavy subsystems are imported on first use; the menu window only needs easygui
+sr = LazyModule("speech_recognition")
+plt = LazyModule("matplotlib.pyplot")
+easygui = LazyModule("easygui")
+ImageTk = LazyModule("PIL.ImageTk")
+
+from asset_index import AssetIndex
+from frame_schedule import FramePlayer, FrameSchedule
+from gif_frames import compose_frames, frame_cache
+from letter_atlas import LetterAtlas
+from plan_cache import PlanCache, UsageLog
+from recognizers import GoogleBackend, NetworkState, RecognizerChain, SphinxBackend
+from sign_planner import segment, tokenize
+from voice_pipeline import STOP, VoicePipeline
 
 # --- configuration ---
 ISL_GIFS_DIR = "ISL_Gifs"
 LETTERS_DIR = "letters"
+PHRASE_ALIASES_FILE = "phrase_aliases.json"  # extra spoken forms for phrase GIFs, e.g. "hi" -> hello
 SIGN_IMG = "signlang.png"
+RENDERER = "tk"  # "tk": one persistent window for letters and GIFs; "matplotlib": legacy figure
+RECOGNIZER_MODE = "race"  # "race": Google and Sphinx in parallel; "sequential": Google, then Sphinx
 
-isl_gif = [
-    'all the best', 'any questions', 'are you angry', 'are you busy',
-    'are you hungry', 'be careful', 'good morning', 'hello',
-    'how are you', 'i am fine', 'nice to meet you', 'thank you', 'welcome'
-]
 arr = list(string.ascii_lowercase)
+# the phrase vocabulary is every GIF in ISL_Gifs plus the alias manifest, rescanned when either changes
+assets = AssetIndex(".", ISL_GIFS_DIR, LETTERS_DIR, aliases_file=PHRASE_ALIASES_FILE)
+letter_atlas = LetterAtlas(assets, maxdim=500)
+network_state = NetworkState()  # shared so a detected outage is remembered across sessions
+# utterances planned before are not segmented again; frequent ones are re-planned at startup
+plan_cache = PlanCache(usage_log=UsageLog("plan_usage_desktop.json"))
+assets.add_listener(plan_cache.invalidate)
+atexit.register(plan_cache.usage_log.flush)
+profile.mark("main2 module loaded")
 
 
 # --- utilities ---
@@ -33,65 +57,86 @@ def list_microphones():
     return mics
 
 
-def recognize_audio_with_fallback(recognizer, audio):
-    try:
-        text = recognizer.recognize_google(audio)
-        print("Recognized with Google:", text)
-        return text
-    except sr.RequestError as e:
-        print("Google SR request failed:", e)
-    except sr.UnknownValueError:
-        print("Google SR could not understand audio")
+def build_recognizer_chain(recognizer, mode=RECOGNIZER_MODE):
+    """Google (remote) and Sphinx (local) backends sharing the process network state."""
+    return RecognizerChain(
+        [GoogleBackend(recognizer), SphinxBackend(recognizer)],
+        mode=mode,
+        network=network_state,
+    )
+
+
+_recognizer_chains = {}  # mode -> RecognizerChain, reused for every utterance and session
+
+
+def recognizer_chain(recognizer, mode=RECOGNIZER_MODE):
+    """The chain for mode, built (with its thread pool) on first use; later calls point it at recognizer."""
+    chain = _recognizer_chains.get(mode)
+    if chain is None:
+        chain = _recognizer_chains[mode] = build_recognizer_chain(recognizer, mode=mode)
+    else:
+        for backend in chain.backends:
+            backend.recognizer = recognizer
+    return chain
 
-    try:
-        text = recognizer.recognize_sphinx(audio)
-        print("Recognized with Sphinx:", text)
-        return text
-    except ImportError:
-        print("PocketSphinx not installed, skipping Sphinx fallback")
-    except sr.UnknownValueError:
-        print("Sphinx could not understand audio")
-    except sr.RequestError as e:
-        print("Sphinx error:", e)
 
-    return None
+def recognize_audio_with_fallback(recognizer, audio):
+    """Google first, Sphinx as fallback; Google is skipped while the network is backing off."""
+    return recognizer_chain(recognizer, mode="sequential").recognize_text(audio)
 
 
 def find_gif_for_phrase(phrase):
     """Return a matching GIF path for a phrase using variants and partial matching."""
     if not phrase:
-        return N    
-    base = phrase.lower().strip()
-    candidates = [
-        base,
-        base.replace(" ", "_"),
-        base.replace(" ", "-"),
-        base.replace(" ", ""),
-    ]
-    for c in candidates:
-        p = os.path.join(ISL_GIFS_DIR, f"{c}.gif")
-        if os.path.exists(p):
-            return p
-    if os.path.isdir(ISL_GIFS_DIR):
-        words = [w for w in base.split() if w]
-        for fname in os.listdir(ISL_GIFS_DIR):
-            if not fname.lower().endswith(".gif"):
-                continue
-            fname_no_ext = os.path.splitext(fname)[0].lower()
-            if all(w in fname_no_ext for w in words):
-                return os.path.join(ISL_GIFS_DIR, fname)
-    return None
+        return None
+    assets.refresh()  # cheap: only rescans when a directory mtime changed
+    entry, _ = assets.match_phrase(phrase)
+    return entry.relpath if entry is not None else None
+
+
+class FrameTimer:
+    """Measures frame-to-frame latency of a renderer against the intended delay."""
+    def __init__(self, name):
+        self.name = name
+        self.errors = []  # actual interval - intended delay, in ms
+        self._last = None
+        self._expected = None
+
+    def reset(self):
+        """Start a new sequence (the gap between sequences is not a frame interval)."""
+        self._last = None
+
+    def mark(self, expected_ms):
+        """Call when a frame becomes visible; expected_ms is how long it should stay."""
+        now = time.monotonic()
+        if self._last is not None:
+            self.errors.append((now - self._last) * 1000 - self._expected)
+        self._last = now
+        self._expected = expected_ms
+
+    def summary(self):
+        if not self.errors:
+            return {"renderer": self.name, "frames": 0}
+        late = sorted(abs(e) for e in self.errors)
+        return {
+            "renderer": self.name,
+            "frames": len(self.errors),
+            "mean_error_ms": round(sum(self.errors) / len(self.errors), 2),
+            "p95_abs_error_ms": round(late[min(len(late) - 1, int(len(late) * 0.95))], 2),
+            "max_abs_error_ms": round(late[-1], 2),
+        }
 
 
 # --- GIF/Tk helpers ---
 class ImageLabel(tk.Label):
     """Tkinter Label that can display animated GIFs (keeps PhotoImage refs).
     Improved frame extraction: composes frames to handle GIF disposal/transparency.
+    Each frame is held for its own delay, scheduled against a monotonic clock.
     """
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._frames = []
-        self._delay = 100
+        self._player = None
         self._index = 0
         self._running = False
         self._after_id = None
@@ -99,51 +144,29 @@ class ImageLabel(tk.Label):
 
     def _compose_frames(self, im, maxdim=500):
         """Return a list of RGBA PIL Images representing each displayed frame."""
-        frames = []
-        mode = 'RGBA'
-        base = Image.new(mode, im.size)  # composite background
-        palette = im.getpalette() if hasattr(im, "getpalette") else None
-
-        try:
-            for frame in ImageSequence.Iterator(im):
-                # ensure palette retained for 'P' frames
-                if palette and getattr(frame, "mode", None) == "P":
-                    frame.putpalette(palette)
-                frame_rgba = frame.convert(mode)
-
-                # paste onto composite using frame alpha as mask
-                composite = base.copy()
-                composite.paste(frame_rgba, (0, 0), frame_rgba)
-
-                # resize if needed (maintain aspect)
-                if composite.width > maxdim or composite.height > maxdim:
-                    composite.thumbnail((maxdim, maxdim), Image.Resampling.LANCZOS)
-
-                frames.append(composite)
-                # update base to composite (simple disposal handling)
-                base = composite
-        except Exception as e:
-            print("Error composing GIF frames:", e)
-        return frames
+        return compose_frames(im, maxdim=maxdim)
 
     def load(self, path):
-        """Load frames from a GIF file path. Returns True on success."""
+        """Load frames from a GIF file path. Returns True on success.
+
+        Composed frames come from the process-wide frame_cache, so replaying a
+        phrase skips decoding and resizing entirely.
+        """
         if not os.path.exists(path):
             print("GIF not found:", path)
             return False
         try:
-            im = Image.open(path)
+            pil_frames = frame_cache.get_frames(path, maxdim=500)
         except Exception as e:
             print("Error opening GIF:", e)
             return False
 
         # clear previous
+        self.stop()
         self._frames.clear()
         self._photo_refs.clear()
         self._index = 0
 
-        # extract composed RGBA frames
-        pil_frames = self._compose_frames(im, maxdim=500)
         if not pil_frames:
             print("No frames extracted from GIF.")
             return False
@@ -157,14 +180,8 @@ class ImageLabel(tk.Label):
             print("Error converting frames to PhotoImage:", e)
             return False
 
-        # read delay (ms) from original image info, fallback to 100
-        try:
-            delay = int(im.info.get("duration", 100))
-            if delay <= 0:
-                delay = 100
-        except Exception:
-            delay = 100
-        self._delay = delay if delay >= 50 else 100
+        # per-frame delays, with browsers' rule for 0/10ms frames so desktop and web play alike
+        self._player = FramePlayer(FrameSchedule.from_frames(pil_frames))
 
         # start animation if frames present
         if self._frames:
@@ -175,16 +192,30 @@ class ImageLabel(tk.Label):
         print("No frames available after processing.")
         return False
 
+    @property
+    def loop_ms(self):
+        """Length of one loop of the loaded animation in ms."""
+        return self._player.schedule.loop_ms if self._player else 0
+
     def _animate(self):
         if not self._running or not self._frames:
             return
-        self.config(image=self._frames[self._index])
-        self._index = (self._index + 1) % len(self._frames)
-        self._after_id = self.after(self._delay, self._animate)
+        index, wait_ms = self._player.tick()
+        if index is None:
+            self._running = False
+            return
+        # frames whose slot passed while Tk was busy are skipped, not shown late
+        if index != self._index:
+            self._index = index
+            self.config(image=self._frames[index])
+        self._after_id = self.after(max(1, int(wait_ms + 0.5)), self._animate)
 
     def start(self):
         if not self._running:
             self._running = True
+            self._index = 0
+            self.config(image=self._frames[0])
+            self._player.start()
             self._animate()
 
     def stop(self):
@@ -200,28 +231,40 @@ class ImageLabel(tk.Label):
 
 # --- Letter display (matplotlib) ---
 class LetterDisplay:
-    def __init__(self):
+    def __init__(self, atlas=None):
         plt.ion()
         self.fig, self.ax = plt.subplots(figsize=(6, 6))
         self.ax.axis("off")
         self._open = True
+        self.atlas = atlas or letter_atlas
+        self._image = None
+        self.timer = FrameTimer("matplotlib")
 
     def display_sequence(self, text, delay=0.8):
+        """Show each letter for `delay` seconds, drawing from the preloaded atlas.
+
+        Draw time is subtracted from the pause so the per-letter timing stays
+        exact instead of drifting by the cost of each redraw.
+        """
+        self.timer.reset()
         for ch in text.lower():
             if ch not in arr:
                 continue
-            path = os.path.join(LETTERS_DIR, f"{ch}.jpg")
-            if not os.path.exists(path):
-                print("Letter image missing:", path)
+            started = time.monotonic()
+            img = self.atlas.get(ch)
+            if img is None:
+                print("Letter image missing:", ch)
                 continue
             try:
-                img = Image.open(path).convert("RGBA")
-                img.thumbnail((500, 500), Image.Resampling.LANCZOS)
-                self.ax.clear()
-                self.ax.axis("off")
-                self.ax.imshow(img)
-                self.fig.canvas.draw()
-                plt.pause(delay)
+                if self._image is None:
+                    self._image = self.ax.imshow(img)
+                else:
+                    self._image.set_data(img)
+                    self._image.set_extent((-0.5, img.shape[1] - 0.5, img.shape[0] - 0.5, -0.5))
+                self.fig.canvas.draw_idle()
+                self.fig.canvas.flush_events()
+                self.timer.mark(delay * 1000)
+                plt.pause(max(0.001, delay - (time.monotonic() - started)))
             except Exception as e:
                 print("Error showing letter image:", e)
 
@@ -233,109 +276,348 @@ class LetterDisplay:
         self._open = False
 
 
+def show_phrase_gif(phrase, gif_path):
+    """Open a window playing the GIF for phrase; blocks until the window is closed."""
+    root = tk.Tk()
+    root.title(f"Sign: {phrase}")
+    root.geometry("520x640")
+    container = tk.Frame(root)
+    container.pack(expand=True, fill="both", padx=8, pady=8)
+    tk.Label(container, text=f'Showing: "{phrase}"', font=("Arial", 12, "bold")).pack(pady=4)
+    lbl = ImageLabel(container)
+    lbl.pack(expand=True)
+    btn_frame = tk.Frame(container)
+    btn_frame.pack(pady=6)
+    tk.Button(btn_frame, text="Play", command=lbl.start).pack(side="left", padx=6)
+    tk.Button(btn_frame, text="Stop", command=lbl.stop).pack(side="left", padx=6)
+    tk.Button(btn_frame, text="Close", command=root.destroy).pack(side="left", padx=6)
+    success = lbl.load(gif_path)
+    if success:
+        root.mainloop()
+    else:
+        print("Failed to load GIF frames.")
+        root.destroy()
+
+
+# --- Persistent Tk sign window ---
+class SignWindow:
+    """One persistent Tk window that plays both phrase GIFs and fingerspelling.
+
+    Letters are shown by swapping precomputed PhotoImages on after() timers, so
+    a letter change is a single label reconfigure instead of a figure redraw,
+    and phrases no longer need a new tk.Tk() each time.
+    """
+    def __init__(self, atlas=None, gif_loops=2):
+        self.atlas = atlas or letter_atlas
+        self.gif_loops = gif_loops
+        self.timer = FrameTimer("tk")
+        self._letter_photos = {}
+        self._after_id = None
+        self._open = True
+
+        self.root = tk.Tk()
+        self.root.title("Sign")
+        self.root.geometry("520x640")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        container = tk.Frame(self.root)
+        container.pack(expand=True, fill="both", padx=8, pady=8)
+        self.caption = tk.Label(container, text="Waiting for speech...", font=("Arial", 12, "bold"))
+        self.caption.pack(pady=4)
+        self.label = ImageLabel(container)
+        self.label.pack(expand=True)
+        btn_frame = tk.Frame(container)
+        btn_frame.pack(pady=6)
+        tk.Button(btn_frame, text="Skip", command=self.skip).pack(side="left", padx=6)
+        tk.Button(btn_frame, text="Close", command=self.close).pack(side="left", padx=6)
+        self._done = tk.BooleanVar(master=self.root, value=True)
+
+    @property
+    def is_open(self):
+        return self._open
+
+    def _letter_photo(self, ch):
+        photo = self._letter_photos.get(ch)
+        if photo is None:
+            img = self.atlas.get(ch)
+            if img is None:
+                return None
+            photo = ImageTk.PhotoImage(Image.fromarray(img), master=self.root)
+            self._letter_photos[ch] = photo
+        return photo
+
+    def preload_letters(self):
+        """Build PhotoImages for every letter up front (after the atlas is loaded)."""
+        for ch in arr:
+            self._letter_photo(ch)
+
+    def _wait(self):
+        """Run the Tk event loop until the current sequence finishes."""
+        self._done.set(False)
+        self.root.wait_variable(self._done)
+
+    def _finish(self):
+        self._after_id = None
+        self._done.set(True)
+
+    def skip(self):
+        """Stop whatever is playing and move on to the next sign."""
+        self.label.stop()
+        if self._after_id:
+            self.root.after_cancel(self._after_id)
+        self._finish()
+
+    def play_letters(self, text, delay=0.8):
+        """Fingerspell text, holding each letter for `delay` seconds."""
+        if not self._open:
+            return
+        photos = []
+        for ch in text.lower():
+            if ch not in arr:
+                continue
+            photo = self._letter_photo(ch)
+            if photo is None:
+                print("Letter image missing:", ch)
+                continue
+            photos.append((ch, photo))
+        if not photos:
+            return
+
+        self.label.stop()
+        self.timer.reset()
+        start = time.monotonic()
+
+        def show(i):
+            if not self._open:
+                return
+            if i >= len(photos):
+                self._finish()
+                return
+            ch, photo = photos[i]
+            self.caption.config(text=f"Spelling: {text.upper()}  [{ch.upper()}]")
+            self.label.config(image=photo)
+            self.timer.mark(delay * 1000)
+            # schedule against the sequence start so timer slop does not accumulate
+            remaining = start + (i + 1) * delay - time.monotonic()
+            self._after_id = self.root.after(max(1, int(remaining * 1000)), show, i + 1)
+
+        show(0)
+        self._wait()
+
+    def play_gif(self, phrase, path):
+        """Play a phrase GIF for `gif_loops` loops. Returns False if it could not be loaded."""
+        if not self._open:
+            return False
+        self.caption.config(text=f'Showing: "{phrase}"')
+        if not self.label.load(path):
+            return False
+        duration = self.label.loop_ms * self.gif_loops
+        self._after_id = self.root.after(duration, self._finish)
+        self._wait()
+        self.label.stop()
+        return True
+
+    def pump(self):
+        """Process pending Tk events while idle (keeps the window responsive)."""
+        if self._open:
+            try:
+                self.root.update()
+            except tk.TclError:
+                self._open = False
+
+    def close(self):
+        if not self._open:
+            return
+        self._open = False
+        self.skip()
+        try:
+            self.root.destroy()
+        except Exception:
+            pass
+
+
 # --- main voice loop ---
-def func(device_index=None, timeout=5, phrase_time_limit=6):
-    r = sr.Recognizer()
-    list_microphones()
-    letter_display = LetterDisplay()
+def _segment_normalized(text):
+    return segment(text.split(), assets)
+
+
+def plan_phrase(phrase):
+    """Split recognized text into (part, entry) segments: GIF clips or words to spell."""
+    assets.refresh()  # a changed index invalidates the plan cache
+    normalized = " ".join(tokenize(phrase))
+    return plan_cache.get_or_compute((normalized,), lambda: _segment_normalized(normalized))
+
 
+# --- background warm-up ---
+def calibrate_microphone(device_index=None, duration=1.0):
+    """A recognizer already adjusted to the room's ambient noise (runs while the menu is shown)."""
+    list_microphones()
+    r = sr.Recognizer()
+    with sr.Microphone(device_index=device_index) as source:
+        r.adjust_for_ambient_noise(source, duration=duration)
+    return r
+
+
+def _warm_plan(text):
+    """Plan a frequent utterance and decode its GIFs, so its first playback skips both."""
+    plan = _segment_normalized(text)
+    for _, entry in plan:
+        if entry is not None:
+            frame_cache.get_frames(entry.relpath, maxdim=500)
+    return plan
+
+
+def warm_asset_caches():
+    assets.refresh()
+    letter_atlas.start()  # decodes every letter image on its own thread
+    stats = assets.stats()
+    print(f"Assets: {stats['phrases']} phrase GIFs, {stats['aliases']} aliases, {stats['letters']} letters")
+    warmed = plan_cache.warm(_warm_plan, limit=100, budget=5.0)
+    print("Plan cache warmed:", warmed)
+    return warmed
+
+
+def start_warmup(renderer=RENDERER):
+    """Start the background warm-up tasks; the first voice session waits for the microphone."""
+    warmup = Warmup()
+    warmup.start("asset caches", warm_asset_caches)
+    warmup.start("microphone", calibrate_microphone)
+    if renderer == "matplotlib":
+        warmup.start("matplotlib", plt.load)
+    return warmup
+
+
+def func(device_index=None, timeout=5, phrase_time_limit=6, renderer=RENDERER, workers=2, recognizer=None):
+    """Voice loop: capture, recognition and playback run as a pipeline.
+
+    A capture thread keeps listening while earlier phrases are recognized by a
+    worker pool and played here, on the UI thread, in the order spoken.
+    recognizer may be one calibrated in advance (see calibrate_microphone).
+    """
+    r = recognizer
+    if r is None:
+        r = sr.Recognizer()
+        list_microphones()
+    window = None
+    letter_display = None
+    if renderer == "tk":
+        window = SignWindow()
+        timer = window.timer
+    else:
+        letter_display = LetterDisplay()
+        timer = letter_display.timer
+
+    pipeline = None
     try:
         with sr.Microphone(device_index=device_index) as source:
-            print("Adjusting for ambient noise...")
-            r.adjust_for_ambient_noise(source, duration=1.0)
+            if recognizer is None:
+                print("Adjusting for ambient noise...")
+                r.adjust_for_ambient_noise(source, duration=1.0)
             print("Ready. Speak a phrase (say 'goodbye' to exit).")
 
-            while True:
+            def listen():
                 print("\nListening...")
                 try:
-                    audio = r.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+                    return r.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
                 except sr.WaitTimeoutError:
-                    print("Listening timed out waiting for phrase to start. Try again.")
-                    continue
-                except Exception as e:
-                    print("Listen error:", e)
-                    continue
-
-                text = recognize_audio_with_fallback(r, audio)
-                if not text:
-                    continue
+                    return None
 
-                phrase = text.lower().strip()
-                print("You said:", phrase)
+            chain = recognizer_chain(r)
+            pipeline = VoicePipeline(
+                listen=listen,
+                recognize=chain.recognize_text,
+                plan=plan_phrase,
+                workers=workers,
+            )
+            pipeline.start()
 
-                if phrase == "goodbye":
-                    print("Exiting voice loop.")
-                    letter_display.close()
+            while True:
+                utterance = pipeline.next_item(timeout=0.05)
+                if utterance is None:
+                    # idle: keep the window responsive while the capture thread listens
+                    if window is not None:
+                        window.pump()
+                    else:
+                        plt.pause(0.01)
+                    continue
+                if utterance is STOP:
                     break
 
-                if phrase in isl_gif:
-                    gif_path = find_gif_for_phrase(phrase)
-                    if gif_path:
-                        print("Found GIF:", os.path.abspath(gif_path))
-                        root = tk.Tk()
-                        root.title(f"Sign: {phrase}")
-                        root.geometry("520x640")
-                        container = tk.Frame(root)
-                        container.pack(expand=True, fill="both", padx=8, pady=8)
-                        tk.Label(container, text=f'Showing: "{phrase}"', font=("Arial", 12, "bold")).pack(pady=4)
-                        lbl = ImageLabel(container)
-                        lbl.pack(expand=True)
-                        btn_frame = tk.Frame(container)
-                        btn_frame.pack(pady=6)
-                        tk.Button(btn_frame, text="Play", command=lbl.start).pack(side="left", padx=6)
-                        tk.Button(btn_frame, text="Stop", command=lbl.stop).pack(side="left", padx=6)
-                        tk.Button(btn_frame, text="Close", command=root.destroy).pack(side="left", padx=6)
-                        success = lbl.load(gif_path)
-                        if success:
-                            root.mainloop()
+                if window is not None and not window.is_open:
+                    window = SignWindow()  # user closed it; reopen for the next phrase
+                    timer = window.timer
+
+                # known phrases play as GIFs, everything else is fingerspelled
+                pipeline.played(utterance)
+                for part, entry in utterance.plan:
+                    if entry is not None:
+                        print("Found GIF:", os.path.abspath(entry.relpath))
+                        if window is not None:
+                            window.play_gif(part, entry.relpath)
                         else:
-                            print("Failed to load GIF frames.")
+                            show_phrase_gif(part, entry.relpath)
+                    elif window is not None:
+                        window.play_letters(part, delay=0.8)
                     else:
-                        print("No GIF matched for phrase. Files in ISL_Gifs:", os.listdir(ISL_GIFS_DIR) if os.path.isdir(ISL_GIFS_DIR) else "missing")
-                else:
-                    letter_display.display_sequence(phrase, delay=0.8)
+                        letter_display.display_sequence(part, delay=0.8)
+
+            # let the capture thread leave listen() before the microphone closes
+            pipeline.stop()
+            pipeline.join(timeout=phrase_time_limit + 1)
 
     except Exception as e:
         print("Microphone or recognition error:", e)
     finally:
+        if pipeline is not None:
+            pipeline.stop()
+            print("Stage latency:", pipeline.stats.summary())
         try:
-            letter_display.close()
+            if window is not None:
+                window.close()
+            if letter_display is not None:
+                letter_display.close()
         except Exception:
             pass
+        print("Frame cache:", frame_cache.stats())
+        print("Plan cache:", plan_cache.stats())
+        print("Frame timing:", timer.summary())
 
 
 # --- startup / main loop ---
-def main():
+def main(profile_startup=False, profile_out=None):
+    # microphone calibration and asset caches warm up in the background while the menu is shown
+    warmup = start_warmup()
+
     print("Working directory:", os.getcwd())
     print("ISL_Gifs present:", os.path.isdir(ISL_GIFS_DIR))
-    if os.path.isdir(ISL_GIFS_DIR):
-        print("ISL_Gifs files:", os.listdir(ISL_GIFS_DIR))
     print("Letters present:", os.path.isdir(LETTERS_DIR))
-    if os.path.isdir(LETTERS_DIR):
-        print("Letters files:", os.listdir(LETTERS_DIR)[:20])
 
+    easygui.load()
+    profile.mark("menu ready")
+    if profile_startup:
+        warmup.wait_all(timeout=30)
+        profile.report()
+        if profile_out:
+            profile.append_to(profile_out)
+        return
+
+    first_session = True
     while True:
-        reply = buttonbox("HEARING IMPAIRMENT ASSISTANT", image=SIGN_IMG, choices=["Live Voice", "All Done!"])
+        reply = easygui.buttonbox("HEARING IMPAIRMENT ASSISTANT", image=SIGN_IMG, choices=["Live Voice", "All Done!"])
         if reply == "Live Voice":
-            func()
+            # the warm-up calibration only describes the room as it was at startup:
+            # later sessions pass None so func recalibrates to the noise as it is now
+            recognizer = warmup.result("microphone", timeout=10) if first_session else None
+            first_session = False
+            func(recognizer=recognizer)
         else:
             break
 
 
 if __name__ == "__main__":
-    main()
-
-import os
-ISL='ISL_Gifs'; LET='letters'; SIGN='signlang.png'
-print('cwd:', os.getcwd())
-print('ISL_Gifs exists:', os.path.isdir(ISL))
-print('ISL_Gifs files:', os.listdir(ISL) if os.path.isdir(ISL) else [])
-print('letters exists:', os.path.isdir(LET))
-print('letters files:', os.listdir(LET) if os.path.isdir(LET) else [])
-print('signlang.png exists:', os.path.exists(SIGN))
-# check common phrase→gif names
-phrases=['all the best','are you hungry','hello']
-for p in phrases:
-    variants=[p, p.replace(' ','_'), p.replace(' ','-'), p.replace(' ','')]
-    found=[v for v in variants if os.path.exists(os.path.join(ISL,f"{v}.gif"))] if os.path.isdir(ISL) else []
-    print(p, 'found variants:', found)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Speech to Indian Sign Language converter (desktop)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="time startup up to the menu window and the background warm-up, print it and exit")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="with --profile-startup, also append the run to FILE as one JSON line")
+    args = parser.parse_args()
+    main(profile_startup=args.profile_startup, profile_out=args.profile_out)
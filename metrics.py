@@ -0,0 +1,347 @@
+"""
+Request metrics for the ISL Converter API
+Counters, histograms and a bounded "most missed" tracker, rendered in the
+Prometheus text exposition format. Recording is a dict lookup, a bisect and
+an add under a per-metric lock, so instrumentation can stay on in production.
+
+Under a multi-process server each worker has its own registry. Given a
+shared directory, every worker writes a snapshot there every few seconds and
+a scrape merges them all: counters and histograms are summed (a worker that
+exited keeps its counts), while collector gauges such as cache sizes get a
+`worker` label because they describe one process.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Seconds; fine-grained at the low end where index lookups and 304s live
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Seconds between a worker's snapshots in the shared directory
+DEFAULT_FLUSH_INTERVAL = 5.0
+SNAPSHOT_PATTERN = 'metrics.*.json'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with optional labels: requests.inc('GET', '200')."""
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), v] for labels, v in self._values.items()]
+
+    def render(self, snapshots=None):
+        """Lines for this process, or for the sum of several snapshot() results."""
+        values = {}
+        for snapshot in snapshots if snapshots is not None else [self.snapshot()]:
+            for labels, v in snapshot:
+                values[tuple(labels)] = values.get(tuple(labels), 0) + v
+        return [f'{self.name}{_labels(self.labelnames, labels)} {_number(v)}'
+                for labels, v in sorted(values.items())]
+
+
+class Histogram:
+    """Bucketed distribution (cumulative buckets are only built when rendering)."""
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(labels), list(series)] for labels, series in self._series.items()]
+
+    def render(self, snapshots=None):
+        """Lines for this process, or for the bucket-wise sum of several snapshot() results."""
+        merged = {}
+        for snapshot in snapshots if snapshots is not None else [self.snapshot()]:
+            for labels, series in snapshot:
+                total = merged.get(tuple(labels))
+                if total is None:
+                    merged[tuple(labels)] = list(series)
+                else:
+                    merged[tuple(labels)] = [a + b for a, b in zip(total, series)]
+        items = sorted(merged.items())
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, [le])} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class TopMisses:
+    """Approximate most-frequent missed keys in bounded memory.
+
+    When capacity is exceeded the least frequent half is dropped, so a steady
+    stream of one-off typos cannot grow the table, while recurring misses
+    (vocabulary worth adding) keep their counts.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, capacity=1000, report=20):
+        self.name = name
+        self.help = help_text
+        self.capacity = capacity
+        self.report = report
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def add(self, key):
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if len(self._counts) > self.capacity:
+                keep = sorted(self._counts.items(), key=lambda kv: kv[1], reverse=True)[:self.capacity // 2]
+                self._counts = dict(keep)
+
+    def top(self, n=None):
+        with self._lock:
+            items = list(self._counts.items())
+        items.sort(key=lambda kv: (-kv[1], kv[0]))
+        return items[:n or self.report]
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts.items())
+
+    def render(self, snapshots=None):
+        if snapshots is None:
+            items = self.top()
+        else:
+            counts = {}
+            for snapshot in snapshots:
+                for key, count in snapshot:
+                    counts[key] = counts.get(key, 0) + count
+            items = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))[:self.report]
+        return [f'{self.name}{_labels(("phrase",), (key,))} {count}' for key, count in items]
+
+
+def clear_shared(directory):
+    """Remove the worker snapshots in a shared directory (call once before the workers start)."""
+    for path in glob.glob(os.path.join(directory, SNAPSHOT_PATTERN)):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _alive(pid):
+    if pid == os.getpid() or os.name == 'nt':  # os.kill(pid, 0) would terminate it on Windows
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class MetricsRegistry:
+    """Owns the metrics and renders them, plus collector callbacks for stats read at scrape time.
+
+    With shared_dir set, render() merges the snapshots every process using
+    that directory writes (see start() and flush()).
+    """
+
+    def __init__(self, shared_dir=None, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self._metrics = []
+        self._collectors = []
+        self.shared_dir = shared_dir
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self.register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help_text, labelnames, buckets))
+
+    def top_misses(self, name, help_text, capacity=1000, report=20):
+        return self.register(TopMisses(name, help_text, capacity, report))
+
+    def add_collector(self, collect):
+        """collect() yields (name, kind, help, [(labels dict, value), ...]) at scrape time."""
+        self._collectors.append(collect)
+
+    def snapshot(self, collect=True):
+        """This process's metrics and collector output as JSON-ready data."""
+        families, errors = [], []
+        for collector in self._collectors if collect else ():
+            try:
+                families += [[name, kind, help_text, [[dict(labels), value] for labels, value in samples]]
+                             for name, kind, help_text, samples in collector()]
+            except Exception as e:  # a broken collector must not break the scrape
+                errors.append(str(e))
+        return {
+            'pid': os.getpid(),
+            'metrics': {metric.name: metric.snapshot() for metric in self._metrics},
+            'collected': families,
+            'errors': errors,
+        }
+
+    def flush(self, final=False):
+        """Write this process's snapshot into shared_dir.
+
+        final=True (when the worker exits) drops the collector gauges, which
+        describe a process that is going away, and keeps its counters.
+        """
+        if not self.shared_dir:
+            return
+        os.makedirs(self.shared_dir, exist_ok=True)
+        path = os.path.join(self.shared_dir, f'metrics.{os.getpid()}.json')
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(collect=not final), f)
+        os.replace(tmp_path, path)  # atomic: a scrape never reads half a snapshot
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except OSError as e:
+                print("Metrics snapshot failed:", e)
+
+    def start(self):
+        """Start writing snapshots every flush_interval seconds (idempotent; no-op without shared_dir)."""
+        if not self.shared_dir or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._flush_loop, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.flush_interval + 1)
+            self._thread = None
+
+    def _shared_snapshots(self):
+        self.flush()
+        snapshots = []
+        for path in sorted(glob.glob(os.path.join(self.shared_dir, SNAPSHOT_PATTERN))):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not _alive(snapshot['pid']):
+                snapshot['collected'] = []  # killed before its final flush
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        shared = bool(self.shared_dir)
+        snapshots = self._shared_snapshots() if shared else [self.snapshot()]
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.render([s['metrics'].get(metric.name, []) for s in snapshots]))
+        families = {}  # name -> (kind, help, samples), in first-seen order
+        for snapshot in snapshots:
+            lines.extend(f'# collector error: {_escape(e)}' for e in snapshot['errors'])
+            for name, kind, help_text, samples in snapshot['collected']:
+                family = families.setdefault(name, (kind, help_text, []))
+                for labels, value in samples:
+                    if shared:
+                        labels = {**labels, 'worker': snapshot['pid']}
+                    family[2].append((labels, value))
+        for name, (kind, help_text, samples) in families.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in samples:
+                if value is None:
+                    continue
+                lines.append(f'{name}{_labels(labels.keys(), labels.values())} {_number(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTimer:
+    """Per-request timing spans, reported as a Server-Timing header and a span histogram."""
+    __slots__ = ('start', 'spans')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans = []
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, time.perf_counter() - start))
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def server_timing(self, total):
+        parts = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in self.spans]
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
@@ -0,0 +1,253 @@
+"""
+Sub-linear phrase matcher for the ISL phrase library
+Replaces the linear "every query word is a substring of the filename" scan
+with a token inverted index plus an n-gram index over the token vocabulary,
+and an optional n-gram similarity fallback for fuzzy matches.
+
+Keys passed in are expected to be normalized already (see
+asset_index.normalize_phrase): lowercase, words separated by single spaces.
+"""
+
+import heapq
+from collections import defaultdict
+
+DEFAULT_NGRAM = 3
+DEFAULT_FUZZY_THRESHOLD = 0.45
+
+
+def _ngrams(text, n):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def _padded_ngrams(text, n):
+    """n-grams of a separator-free string padded with boundary markers."""
+    pad = '^' * (n - 1)
+    return _ngrams(f"{pad}{text.replace(' ', '')}$", n)
+
+
+class PhraseMatcher:
+    """Ranked phrase lookup over normalized keys.
+
+    A query matches an entry when every query word is a substring of one of
+    the entry's tokens (the same rule the original linear scan used). Entries
+    where every query word is a whole token rank first; ties and the rest are
+    ordered by fewest tokens, then shortest key, then the key itself, so the
+    winner no longer depends on directory listing order.
+    """
+
+    # Use a rank-ordered scan with early exit when the expected number of
+    # entries to visit is below SCAN_LIMIT; otherwise intersect postings.
+    SCAN_LIMIT = 512
+    # Check a word by substring on the surviving candidates instead of
+    # building its postings when that word is FILTER_RATIO times less selective.
+    FILTER_RATIO = 8
+
+    def __init__(self, ngram=DEFAULT_NGRAM):
+        self.ngram = ngram
+        self._keys = []            # entry id -> key
+        self._payloads = []        # entry id -> payload
+        self._by_key = {}          # key -> entry id
+        self._rank = []            # entry id -> precomputed tie-break rank
+        self._order = []           # entry ids sorted by rank
+        self._tokens = {}          # token -> set(entry ids)
+        self._token_grams = defaultdict(set)    # n-gram -> set(tokens)
+        self._token_short = defaultdict(set)    # substring shorter than n -> set(tokens)
+        self._entry_grams = defaultdict(list)   # padded n-gram -> [entry ids] (fuzzy)
+        self._entry_gram_counts = []            # entry id -> number of padded n-grams
+        self._frozen = False
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, payload):
+        """Index one entry. The first payload added for a key wins."""
+        if not key or key in self._by_key:
+            return
+        self._frozen = False
+        eid = len(self._keys)
+        self._keys.append(key)
+        self._payloads.append(payload)
+        self._by_key[key] = eid
+
+        n = self.ngram
+        for token in set(key.split()):
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = set()
+                for gram in _ngrams(token, n):
+                    self._token_grams[gram].add(token)
+                for size in range(1, min(n, len(token) + 1)):
+                    for gram in _ngrams(token, size):
+                        self._token_short[gram].add(token)
+            postings.add(eid)
+
+        grams = _padded_ngrams(key, n)
+        for gram in grams:
+            self._entry_grams[gram].append(eid)
+        self._entry_gram_counts.append(len(grams))
+
+    def freeze(self):
+        """Precompute tie-break ranks; call once after the last add()."""
+        order = sorted(range(len(self._keys)),
+                       key=lambda i: (len(self._keys[i].split()), len(self._keys[i]), self._keys[i]))
+        self._order = order
+        self._rank = [0] * len(order)
+        for rank, eid in enumerate(order):
+            self._rank[eid] = rank
+        self._frozen = True
+
+    # --- substring matching ---
+    def _tokens_containing(self, word):
+        """Vocabulary tokens that contain word as a substring."""
+        n = self.ngram
+        if len(word) < n:
+            return self._token_short.get(word, set())
+        grams = sorted(_ngrams(word, n), key=lambda g: len(self._token_grams.get(g, ())))
+        candidates = None
+        for gram in grams:
+            tokens = self._token_grams.get(gram)
+            if not tokens:
+                return set()
+            candidates = set(tokens) if candidates is None else candidates & tokens
+            if not candidates:
+                return set()
+        if len(word) == n:  # the single n-gram is the word itself
+            return candidates
+        return {t for t in candidates if word in t}
+
+    def _exact_candidates(self, words):
+        """Entries in which every query word is a whole token."""
+        sets = []
+        for word in words:
+            postings = self._tokens.get(word)
+            if not postings:
+                return set()
+            sets.append(postings)
+        sets.sort(key=len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+        return result
+
+    def _word_postings(self, words):
+        """(estimated entry count, word, tokens containing word) per word, rarest first; None if a word is absent."""
+        total = len(self._keys)
+        per_word = []
+        for word in words:
+            tokens = self._tokens_containing(word)
+            if not tokens:
+                return None
+            size = sum(len(self._tokens[t]) for t in tokens)
+            per_word.append((min(size, total), word, tokens))
+        per_word.sort(key=lambda item: item[0])
+        return per_word
+
+    def _substring_ids(self, per_word):
+        """All entries containing every word: intersect per-word posting unions (set operations run in C)."""
+        keys = self._keys
+        candidates = None
+        for size, word, tokens in per_word:
+            if candidates is not None and len(candidates) * self.FILTER_RATIO <= size:
+                candidates = {eid for eid in candidates if word in keys[eid]}
+            else:
+                postings = set().union(*(self._tokens[t] for t in tokens))
+                candidates = postings if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        return candidates
+
+    def _partial_matches(self, words, limit, exclude):
+        """Up to `limit` entries (in rank order) containing every word as a substring."""
+        total = len(self._keys)
+        per_word = self._word_postings(words)
+        if per_word is None:
+            return []
+
+        keys = self._keys
+        density = 1.0
+        for size, _, _ in per_word:
+            density *= size / total
+        if density > 0 and (limit + len(exclude)) / density < min(self.SCAN_LIMIT, per_word[0][0]):
+            # Dense matches (e.g. one- or two-letter words): walking entries in
+            # rank order finds the best ones after a handful of checks.
+            found = []
+            for eid in self._order:
+                if eid in exclude:
+                    continue
+                key = keys[eid]
+                if all(w in key for w in words):
+                    found.append(eid)
+                    if len(found) >= limit:
+                        break
+            return found
+
+        # Sparse matches: only the entries sharing the rarest words are touched.
+        candidates = self._substring_ids(per_word) - exclude
+        return heapq.nsmallest(limit, candidates, key=self._rank.__getitem__)
+
+    # --- fuzzy matching ---
+    def _fuzzy_candidates(self, key, threshold):
+        grams = _padded_ngrams(key, self.ngram)
+        if not grams:
+            return []
+        shared = defaultdict(int)
+        for gram in grams:
+            for eid in self._entry_grams.get(gram, ()):
+                shared[eid] += 1
+        scored = []
+        q = len(grams)
+        for eid, common in shared.items():
+            similarity = common / (q + self._entry_gram_counts[eid] - common)
+            if similarity >= threshold:
+                scored.append((-similarity, self._rank[eid], eid))
+        return scored
+
+    # --- public API ---
+    def search(self, key, limit=5, fuzzy=False, fuzzy_threshold=DEFAULT_FUZZY_THRESHOLD):
+        """Return up to `limit` (payload, kind) pairs, best first.
+
+        kind is 'exact', 'partial' or 'fuzzy'. Fuzzy results are only produced
+        when fuzzy=True and no exact or partial match exists.
+        """
+        if not self._frozen:
+            self.freeze()
+        if not key or limit <= 0:
+            return []
+        results = []
+        exclude = set()
+        eid = self._by_key.get(key)
+        if eid is not None:
+            results.append((self._payloads[eid], 'exact'))
+            exclude.add(eid)
+
+        words = sorted(set(key.split()))
+        if len(results) < limit:
+            whole = self._exact_candidates(words) - exclude
+            best = heapq.nsmallest(limit - len(results), whole, key=self._rank.__getitem__)
+            results.extend((self._payloads[i], 'partial') for i in best)
+            exclude.update(best)
+        if len(results) < limit:
+            best = self._partial_matches(words, limit - len(results), exclude)
+            results.extend((self._payloads[i], 'partial') for i in best)
+
+        if not results and fuzzy:
+            scored = heapq.nsmallest(limit, self._fuzzy_candidates(key, fuzzy_threshold))
+            results.extend((self._payloads[i], 'fuzzy') for _, _, i in scored)
+        return results
+
+    def containing(self, key):
+        """Payloads of every entry that contains each word of key as a substring (unordered)."""
+        if not self._frozen:
+            self.freeze()
+        words = sorted(set(key.split()))
+        if not words:
+            return list(self._payloads)
+        per_word = self._word_postings(words)
+        if per_word is None:
+            return []
+        return [self._payloads[eid] for eid in self._substring_ids(per_word)]
+
+    def match(self, key, fuzzy=False, fuzzy_threshold=DEFAULT_FUZZY_THRESHOLD):
+        """Return the single best payload for key, or None."""
+        results = self.search(key, limit=1, fuzzy=fuzzy, fuzzy_threshold=fuzzy_threshold)
+        return results[0][0] if results else None
@@ -0,0 +1,231 @@
+"""
+Type-ahead phrase suggestions for the ISL phrase library
+Completes a partially typed phrase from a prefix trie over every word start
+of every phrase ("mor" finds "good morning"), and corrects typos through a
+deletion-variant index over the phrase vocabulary (edit distance 1, or 2 for
+long words) so "helo wor" still finds "hello world".
+
+Keys passed in are expected to be normalized already (see
+asset_index.normalize_phrase): lowercase, words separated by single spaces.
+"""
+
+import heapq
+import threading
+from bisect import bisect_left
+from operator import itemgetter
+
+MAX_SUGGESTIONS = 20
+
+
+def edit_distance(a, b, limit):
+    """Damerau-Levenshtein (adjacent transpositions) distance, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def _max_typos(word):
+    return 0 if len(word) < 3 else 1 if len(word) < 8 else 2
+
+
+def _deletes(word, depth):
+    """word with up to `depth` characters removed (including word itself)."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        variants |= frontier
+    return variants
+
+
+class _TrieNode:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []   # ids of the best completions below this node, best first, at most MAX_SUGGESTIONS
+
+
+class PhraseSuggester:
+    """Ranked completions for a typed prefix, with typo-tolerant fallback.
+
+    The trie is built to TRIE_DEPTH characters and every node keeps its best
+    completions precomputed, so short prefixes (the common case while typing,
+    and the ones matching the most phrases) are answered by a walk of a few
+    nodes. Longer prefixes narrow to a handful of phrases, which a bisect over
+    the sorted word-start suffixes finds directly.
+    """
+
+    TRIE_DEPTH = 3
+
+    def __init__(self):
+        self._keys = []
+        self._payloads = []
+        self._by_key = {}
+        self._frozen = False
+        self._freeze_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, key, payload):
+        if not key or key in self._by_key:
+            return
+        self._by_key[key] = len(self._keys)
+        self._keys.append(key)
+        self._payloads.append(payload)
+        self._frozen = False
+
+    def freeze(self):
+        """Build the trie, suffix array and typo index after the last add()."""
+        keys = self._keys
+        # phrase starts beat word starts; then fewer words, shorter, alphabetical
+        base = sorted(range(len(keys)), key=lambda i: (len(keys[i].split()), len(keys[i]), keys[i]))
+        rank = [0] * len(keys)
+        for r, eid in enumerate(base):
+            rank[eid] = r
+        offset = len(keys)
+
+        suffixes = []
+        tokens = {}
+        for eid, key in enumerate(keys):
+            start = 0
+            for word in key.split(' '):
+                suffixes.append((key[start:], (rank[eid] if start == 0 else offset + rank[eid]), eid))
+                tokens.setdefault(word, set()).add(eid)
+                start += len(word) + 1
+        suffixes.sort()
+        self._suffix_text = [s[0] for s in suffixes]
+        self._suffix_score = [(s[1], s[2]) for s in suffixes]
+
+        # trie of the first TRIE_DEPTH characters; inserting best-first lets each
+        # node stop collecting once it holds MAX_SUGGESTIONS completions
+        root = _TrieNode()
+        for text, _, eid in sorted(suffixes, key=itemgetter(1)):
+            node = root
+            for ch in text[:self.TRIE_DEPTH]:
+                child = node.children.get(ch)
+                if child is None:
+                    child = node.children[ch] = _TrieNode()
+                node = child
+                if len(node.top) < MAX_SUGGESTIONS and eid not in node.top:
+                    node.top.append(eid)
+        self._root = root
+
+        self._tokens = tokens
+        self._vocabulary = sorted(tokens)
+        deletes = {}
+        for token in tokens:
+            variants = _deletes(token, _max_typos(token))
+            # prefixes too (one typo), so a half-typed word can be corrected
+            for n in range(3, len(token)):
+                variants |= _deletes(token[:n], 1)
+            for variant in variants:
+                deletes.setdefault(variant, []).append(token)
+        self._deletes = deletes
+        self._frozen = True
+
+    def prepare(self):
+        """Freeze once, thread-safely (the first suggest() does this if nobody did before)."""
+        if not self._frozen:
+            with self._freeze_lock:
+                if not self._frozen:
+                    self.freeze()
+
+    # --- prefix completion ---
+    def _complete(self, prefix, limit):
+        if len(prefix) <= self.TRIE_DEPTH:
+            node = self._root
+            for ch in prefix:
+                node = node.children.get(ch)
+                if node is None:
+                    return []
+            return node.top[:limit]
+        lo = bisect_left(self._suffix_text, prefix)
+        hi = bisect_left(self._suffix_text, prefix + '\uffff', lo)
+        best = {}
+        for score, eid in heapq.nsmallest(limit * 2, self._suffix_score[lo:hi]):
+            best.setdefault(eid, score)
+        return sorted(best, key=best.get)[:limit]
+
+    # --- typo correction ---
+    def _similar_tokens(self, word, is_prefix):
+        """{token: distance} for vocabulary tokens within the word's typo budget.
+
+        For the word still being typed (is_prefix), token prefixes count too.
+        """
+        budget = _max_typos(word)
+        if is_prefix and len(word) == 2:
+            budget = 1  # "yu" -> "you": short words are often the ones being typed
+        found = {}
+        if is_prefix:
+            lo = bisect_left(self._vocabulary, word)
+            hi = bisect_left(self._vocabulary, word + '\uffff', lo)
+            found = dict.fromkeys(self._vocabulary[lo:hi], 0)
+        for variant in _deletes(word, budget):
+            for token in self._deletes.get(variant, ()):
+                if token in found:
+                    continue
+                distance = edit_distance(word, token, budget)
+                if distance > budget and is_prefix:
+                    distance = min(edit_distance(word, token[:n], budget)
+                                   for n in (len(word) - 1, len(word), len(word) + 1))
+                if distance <= budget:
+                    found[token] = distance
+        return found
+
+    def _correct(self, words, limit, exclude):
+        """Entries with a close-enough token for every word, fewest total typos first."""
+        per_word = []
+        for position, word in enumerate(words):
+            similar = self._similar_tokens(word, is_prefix=position == len(words) - 1)
+            if not similar:
+                return []
+            per_word.append((sum(len(self._tokens[t]) for t in similar), similar))
+        per_word.sort(key=itemgetter(0))
+
+        # expand the rarest word's postings, then only check the survivors' own tokens
+        keys = self._keys
+        cost = {}
+        for token, distance in per_word[0][1].items():
+            for eid in self._tokens[token]:
+                if distance < cost.get(eid, MAX_SUGGESTIONS):
+                    cost[eid] = distance
+        for _, similar in per_word[1:]:
+            narrowed = {}
+            for eid, total in cost.items():
+                distances = [similar[t] for t in keys[eid].split(' ') if t in similar]
+                if distances:
+                    narrowed[eid] = total + min(distances)
+            cost = narrowed
+            if not cost:
+                return []
+        for eid in exclude:
+            cost.pop(eid, None)
+        return heapq.nsmallest(limit, cost,
+                               key=lambda eid: (cost[eid], len(keys[eid].split()), len(keys[eid]), keys[eid]))
+
+    # --- public API ---
+    def suggest(self, query, limit=10):
+        """Up to `limit` (payload, kind) pairs for a typed query; kind is 'prefix' or 'typo'."""
+        self.prepare()
+        limit = max(1, min(limit, MAX_SUGGESTIONS))
+        if not query or not self._keys:
+            return []
+        results = [(eid, 'prefix') for eid in self._complete(query, limit)]
+        if len(results) < limit:
+            seen = {eid for eid, _ in results}
+            results += [(eid, 'typo') for eid in self._correct(query.split(), limit - len(results), seen)]
+        return [(self._payloads[eid], kind) for eid, kind in results]
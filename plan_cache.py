@@ -0,0 +1,182 @@
+"""
+Sign plan cache for the ISL converter
+Remembers resolved sign plans by normalized input text, so a common sentence
+is planned once instead of on every request or utterance. Entries expire
+after a TTL, the least recently used are evicted past max_entries, and
+everything is dropped when the asset index changes. A small usage log of the
+most frequent inputs is persisted, so a restarted process can plan them
+again before the first request arrives.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL = 3600.0
+USAGE_LOG_CAPACITY = 2000
+USAGE_FLUSH_INTERVAL = 60.0
+
+
+class UsageLog:
+    """Approximate input frequencies, persisted as JSON {text: count}.
+
+    Several processes may share one file: each save merges only the counts
+    added since its last save into what is on disk, then replaces the file
+    atomically. When capacity is exceeded the least frequent half is dropped.
+    """
+
+    def __init__(self, path, capacity=USAGE_LOG_CAPACITY, flush_interval=USAGE_FLUSH_INTERVAL):
+        self.path = str(path)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._counts = self._read()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {str(k): int(v) for k, v in data.items()} if isinstance(data, dict) else {}
+
+    def _trim(self, counts):
+        if len(counts) <= self.capacity:
+            return counts
+        return dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True)[:self.capacity // 2])
+
+    def record(self, text):
+        with self._lock:
+            self._counts[text] = self._counts.get(text, 0) + 1
+            self._pending[text] = self._pending.get(text, 0) + 1
+            self._counts = self._trim(self._counts)
+            due = time.monotonic() - self._last_flush > self.flush_interval
+            if due:
+                self._last_flush = time.monotonic()
+        if due:
+            threading.Thread(target=self.flush, name="plan-usage-flush", daemon=True).start()
+
+    def flush(self):
+        """Merge counts recorded since the last flush into the file."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        counts = self._read()
+        for text, count in pending.items():
+            counts[text] = counts.get(text, 0) + count
+        counts = self._trim(counts)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(counts, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print("Could not save plan usage log:", e)
+
+    def top(self, n):
+        with self._lock:
+            items = list(self._counts.items())
+        items.sort(key=lambda kv: (-kv[1], kv[0]))
+        return [text for text, _ in items[:n]]
+
+
+class PlanCache:
+    """Thread-safe TTL + LRU map from (normalized text, options) to a computed plan.
+
+    Use get_or_compute(); call invalidate() (e.g. from an AssetIndex listener)
+    when the assets the plans refer to change.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, usage_log=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.usage_log = usage_log
+        self._items = OrderedDict()  # key -> (expires, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and item[0] < now:
+                del self._items[key]
+                self.expirations += 1
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def note_use(self, text):
+        """Count an input in the usage log (get_or_compute does this itself)."""
+        if self.usage_log is not None and text:
+            self.usage_log.record(text)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() stored under it; key[0] is the text logged for warm-up."""
+        self.note_use(key[0])
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, compute())
+        return value
+
+    def invalidate(self, *_):
+        with self._lock:
+            self._items.clear()
+            self.invalidations += 1
+
+    def warm(self, compute, options=(), limit=500, budget=2.0):
+        """Precompute the most frequent logged inputs (at most `budget` seconds). Returns the count."""
+        if self.usage_log is None:
+            return 0
+        deadline = time.monotonic() + budget
+        warmed = 0
+        for text in self.usage_log.top(limit):
+            if time.monotonic() > deadline:
+                break
+            try:
+                self.put((text, *options), compute(text))
+            except Exception as e:
+                print("Plan cache warm-up failed for", repr(text), e)
+                continue
+            warmed += 1
+        return warmed
+
+    def stats(self):
+        with self._lock:
+            entries = len(self._items)
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'bytes': None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+        }
@@ -0,0 +1,226 @@
+"""
+Pluggable speech recognition backends
+Backends are raced in parallel (or tried in order) and the first confident
+result wins. Remote backends share a NetworkState that remembers recent
+connectivity failures and skips remote calls until an exponential backoff
+expires, so offline use no longer pays a failed request per utterance.
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+DEFAULT_MIN_CONFIDENCE = 0.7
+DEFAULT_TIMEOUT = 10.0
+GOOGLE_DEFAULT_CONFIDENCE = 0.8  # when Google omits a confidence for its top alternative
+SPHINX_CONFIDENCE = 0.5          # PocketSphinx reports none; below the threshold, so Google is preferred
+
+
+class BackendUnavailable(Exception):
+    """The backend could not run (network down, API error, engine missing)."""
+
+
+class RecognitionResult:
+    __slots__ = ('text', 'confidence', 'backend', 'latency_ms')
+
+    def __init__(self, text, confidence, backend, latency_ms=None):
+        self.text = text
+        self.confidence = confidence
+        self.backend = backend
+        self.latency_ms = latency_ms
+
+    def __repr__(self):
+        return f"RecognitionResult({self.text!r}, confidence={self.confidence}, backend={self.backend!r})"
+
+
+def _speech_recognition():
+    # imported on first use: it is slow to import, and only the real backends need it
+    import speech_recognition
+    return speech_recognition
+
+
+class RecognizerBackend:
+    """Base class: recognize(audio) returns RecognitionResult, or None if nothing was understood,
+    and raises BackendUnavailable when it cannot run at all."""
+    name = "backend"
+    remote = False
+
+    def recognize(self, audio):
+        raise NotImplementedError
+
+
+class GoogleBackend(RecognizerBackend):
+    """Google Web Speech API via speech_recognition (remote)."""
+    name = "google"
+    remote = True
+
+    def __init__(self, recognizer, language="en-US"):
+        self.recognizer = recognizer
+        self.language = language
+
+    def recognize(self, audio):
+        sr = _speech_recognition()
+        try:
+            response = self.recognizer.recognize_google(audio, language=self.language, show_all=True)
+        except sr.RequestError as e:
+            raise BackendUnavailable(str(e)) from e
+        except sr.UnknownValueError:
+            return None
+        alternatives = response.get("alternative") if isinstance(response, dict) else None
+        if not alternatives:
+            return None
+        best = alternatives[0]
+        # Google only reports confidence for the top alternative, and not always
+        return RecognitionResult(best.get("transcript", ""), float(best.get("confidence", GOOGLE_DEFAULT_CONFIDENCE)), self.name)
+
+
+class SphinxBackend(RecognizerBackend):
+    """CMU PocketSphinx via speech_recognition (local, offline, less accurate).
+
+    PocketSphinx reports no usable confidence, so every transcript gets the
+    fixed `confidence`, below the chain's threshold: a race still waits for
+    Google and only takes Sphinx's answer once no remote answer can come.
+    """
+    name = "sphinx"
+    remote = False
+
+    def __init__(self, recognizer, confidence=SPHINX_CONFIDENCE):
+        self.recognizer = recognizer
+        self.confidence = confidence
+
+    def recognize(self, audio):
+        sr = _speech_recognition()
+        try:
+            text = self.recognizer.recognize_sphinx(audio)
+        except ImportError as e:
+            raise BackendUnavailable("PocketSphinx not installed") from e
+        except sr.RequestError as e:
+            raise BackendUnavailable(str(e)) from e
+        except sr.UnknownValueError:
+            return None
+        return RecognitionResult(text, self.confidence, self.name)
+
+
+class NetworkState:
+    """Tracks remote-backend failures and when remote calls may be retried."""
+
+    def __init__(self, initial_backoff=5.0, max_backoff=300.0, clock=time.monotonic):
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def available(self):
+        return self.clock() >= self._retry_at
+
+    def record_failure(self):
+        with self._lock:
+            self._backoff = min(self.max_backoff, self._backoff * 2 or self.initial_backoff)
+            self._retry_at = self.clock() + self._backoff
+
+    def record_success(self):
+        with self._lock:
+            self._backoff = 0.0
+            self._retry_at = 0.0
+
+    def seconds_until_retry(self):
+        return max(0.0, self._retry_at - self.clock())
+
+
+class RecognizerChain:
+    """Runs backends in "race" (parallel) or "sequential" mode.
+
+    Race: all eligible backends start at once; the first result at or above
+    min_confidence is returned immediately. A less confident (local) result
+    is returned as soon as no remote backend is still running (it failed,
+    understood nothing, or was skipped because the NetworkState is backing
+    off); otherwise the chain waits for the remote answer until the timeout.
+    Sequential: backends are tried in order with the same confidence rule.
+    One chain is meant to be built once and reused for every utterance: it
+    owns a thread pool.
+    """
+
+    def __init__(self, backends, mode="race", min_confidence=DEFAULT_MIN_CONFIDENCE,
+                 timeout=DEFAULT_TIMEOUT, network=None):
+        if mode not in ("race", "sequential"):
+            raise ValueError(f"Unknown recognizer mode: {mode}")
+        self.backends = list(backends)
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self.timeout = timeout
+        self.network = network or NetworkState()
+        # remote calls that lost the race keep running; leave room for them
+        self._executor = ThreadPoolExecutor(max_workers=max(2, 2 * len(self.backends)),
+                                            thread_name_prefix="recognize")
+
+    def _eligible(self):
+        online = self.network.available()
+        return [b for b in self.backends if online or not b.remote]
+
+    def _run(self, backend, audio):
+        start = time.monotonic()
+        try:
+            result = backend.recognize(audio)
+        except BackendUnavailable as e:
+            if backend.remote:
+                self.network.record_failure()
+                print(f"{backend.name} unavailable ({e}); skipping remote recognition for "
+                      f"{self.network.seconds_until_retry():.0f}s")
+            else:
+                print(f"{backend.name} unavailable:", e)
+            return None
+        if backend.remote:
+            self.network.record_success()
+        if result is not None:
+            result.latency_ms = (time.monotonic() - start) * 1000
+        return result
+
+    def _accepted(self, result):
+        return result is not None and result.confidence >= self.min_confidence
+
+    def _better(self, best, result):
+        if result is None or not result.text:
+            return best
+        if best is None or result.confidence > best.confidence:
+            return result
+        return best
+
+    def recognize(self, audio):
+        """Return the winning RecognitionResult, or None if no backend understood the audio."""
+        backends = self._eligible()
+        if not backends:
+            return None
+        if self.mode == "sequential":
+            best = None
+            for backend in backends:
+                best = self._better(best, self._run(backend, audio))
+                if self._accepted(best):
+                    break
+            return best
+
+        pending = {self._executor.submit(self._run, b, audio): b for b in backends}
+        deadline = time.monotonic() + self.timeout
+        best = None
+        while pending:
+            done, _ = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                break  # timed out; go with what we have
+            for future in done:
+                del pending[future]
+                best = self._better(best, future.result())
+            if self._accepted(best):
+                break
+            if best is not None and not any(b.remote for b in pending.values()):
+                break  # no remote answer can come any more: the local one is the best there will be
+        return best
+
+    def recognize_text(self, audio):
+        """Convenience wrapper returning only the text (or None)."""
+        result = self.recognize(audio)
+        if result is None:
+            return None
+        print(f"Recognized with {result.backend} ({result.confidence:.2f}):", result.text)
+        return result.text
@@ -0,0 +1,325 @@
+"""
+Asset renditions for the ISL converter
+Defines where resized/re-encoded copies of letter images and phrase GIFs
+live and how they are produced: palette-optimized GIF, animated WebP and a
+first-frame PNG thumbnail per configured width. Used by the offline build
+tool (convert_letters_to_gif.py) and by the API server.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: eviction is then only serialized within one process
+    fcntl = None
+
+from PIL import Image
+
+from gif_frames import compose_frames
+
+RENDITIONS_DIR = "renditions"
+RENDITION_WIDTHS = (120, 240, 500)
+RENDITION_FORMATS = ('gif', 'webp')
+THUMBNAIL_WIDTH = 120
+BACKGROUND = (255, 255, 255)
+WEBP_QUALITY = 80
+
+KIND_LETTERS = "letters"
+KIND_PHRASES = "phrases"
+
+PREBUILT_DIRS = tuple(os.path.join(RENDITIONS_DIR, kind) for kind in (KIND_LETTERS, KIND_PHRASES))
+
+RENDITION_MIMETYPES = {'gif': 'image/gif', 'webp': 'image/webp', 'png': 'image/png'}
+CACHE_DIR = os.path.join(RENDITIONS_DIR, "cache")
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+LOCK_NAME = ".lock"
+
+
+def rendition_stem(entry):
+    """File stem for an asset's renditions: its file name without the extension ("Thank_You").
+
+    Unlike the normalized key, which "thank you.gif" and "Thank_You.gif"
+    share, the name is unique within a folder, so two sources never write
+    the same renditions.
+    """
+    return entry.name
+
+
+def rendition_suffix(width, fmt):
+    """"w240.webp" for a resized rendition, "webp" for one at the source's own size (width None)."""
+    return f"w{width}.{fmt}" if width else fmt
+
+
+def rendition_relpath(kind, stem, width, fmt):
+    """Relative path of one rendition, e.g. renditions/letters/a.w240.webp."""
+    return os.path.join(RENDITIONS_DIR, kind, f"{stem}.{rendition_suffix(width, fmt)}")
+
+
+def thumbnail_relpath(kind, stem):
+    return os.path.join(RENDITIONS_DIR, kind, f"{stem}.thumb.png")
+
+
+def _flatten(frame):
+    rgb = Image.new("RGB", frame.size, BACKGROUND)
+    rgb.paste(frame, (0, 0), frame)
+    return rgb
+
+
+def load_frames(src_path):
+    """Composed full-size RGBA frames of an image or GIF and their delays in ms."""
+    with Image.open(src_path) as im:
+        frames = compose_frames(im, maxdim=max(im.size))
+    durations = [int(f.info.get("duration", 100)) or 100 for f in frames]
+    return frames, durations
+
+
+def resize_frames(frames, width):
+    """Flatten frames onto white and shrink them to at most `width` pixels wide (never upscale).
+
+    width None keeps the frames as they are: source size and transparency.
+    """
+    if width is None:
+        return list(frames)
+    resized = []
+    for frame in frames:
+        if frame.width > width:
+            height = max(1, round(frame.height * width / frame.width))
+            frame = frame.resize((width, height), Image.Resampling.LANCZOS)
+        resized.append(_flatten(frame))
+    return resized
+
+
+def save_frames(frames, durations, dst_path, fmt):
+    """Encode frames as a palette-optimized GIF or a WebP (animated when several frames)."""
+    os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+    tmp_path = f"{dst_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    options = {}
+    if len(frames) > 1:
+        options = {'save_all': True, 'append_images': frames[1:], 'duration': durations, 'loop': 0}
+    if fmt == 'gif':
+        # one adaptive palette per frame, then let Pillow drop unused entries;
+        # RGBA frames are left to Pillow's GIF writer, which keeps their transparency
+        first, rest = frames[0], frames[1:]
+        if first.mode != 'RGBA':
+            first, rest = first.quantize(colors=256), [f.quantize(colors=256) for f in rest]
+        if rest:
+            options['append_images'] = rest
+        first.save(tmp_path, format='GIF', optimize=True, **options)
+    elif fmt == 'webp':
+        frames[0].save(tmp_path, format='WEBP', quality=WEBP_QUALITY, method=4, **options)
+    elif fmt == 'png':
+        frames[0].save(tmp_path, format='PNG', optimize=True)
+    else:
+        raise ValueError(f"Unsupported rendition format: {fmt}")
+    os.replace(tmp_path, dst_path)  # atomic: readers never see a half-written file
+
+
+def build_rendition(src_path, dst_path, width, fmt, frames=None, durations=None):
+    """Produce a single rendition of src_path at dst_path.
+
+    Pass frames/durations from load_frames() to reuse one decode for several renditions.
+    """
+    if frames is None:
+        frames, durations = load_frames(src_path)
+    if not frames:
+        raise ValueError(f"No frames in {src_path}")
+    if fmt == 'png':
+        frames, durations = frames[:1], durations[:1]
+    save_frames(resize_frames(frames, width), durations, dst_path, fmt)
+
+
+def snap_width(width):
+    """Round a requested width up to the nearest configured rendition width (capped at the largest)."""
+    for candidate in sorted(RENDITION_WIDTHS):
+        if width <= candidate:
+            return candidate
+    return max(RENDITION_WIDTHS)
+
+
+def pick_rendition(width=None, fmt=None, accepts_webp=False):
+    """Resolve ?w= / ?fmt= / Accept into (width, fmt, negotiated).
+
+    fmt is None when the original file should be sent; negotiated means the
+    choice depended on the Accept header. width is None unless ?w= asked for
+    one: a format-only rendition keeps the source's size and transparency.
+    Raises ValueError for bad input.
+    """
+    fmt = (fmt or '').lower()
+    if width is not None:
+        try:
+            width = int(width)
+        except ValueError:
+            raise ValueError(f"Invalid width: {width}")
+        if width <= 0:
+            raise ValueError(f"Invalid width: {width}")
+    if fmt and fmt not in RENDITION_MIMETYPES:
+        raise ValueError(f"Unsupported format: {fmt}")
+    negotiated = not fmt
+    if negotiated and accepts_webp:
+        fmt = 'webp'
+    if width is None and not fmt:
+        return None, None, negotiated
+    return (snap_width(width) if width is not None else None), fmt or 'gif', negotiated
+
+
+class RenditionStore:
+    """Finds or lazily builds renditions for the API server.
+
+    Pre-built files from the build tool are used when they are at least as
+    new as their source; the index (an AssetIndex scanning PREBUILT_DIRS)
+    knows which exist, so a request never stats them. Anything else is generated on first request into
+    cache_dir, named by the source's content hash so edits never serve stale
+    bytes, and the directory is kept under max_bytes by evicting the least
+    recently used files.
+
+    Several server processes may share cache_dir, so the directory itself is
+    the source of truth: a hit touches the file's mtime (the shared recency)
+    and is rebuilt if another process evicted it, and eviction rescans the
+    directory under a lock file rather than trusting this process's counters.
+    """
+
+    def __init__(self, base_dir, index, cache_dir=CACHE_DIR, max_bytes=DEFAULT_CACHE_BYTES):
+        self.base_dir = str(base_dir)
+        self.index = index
+        self.cache_dir = os.path.join(self.base_dir, cache_dir)
+        self.max_bytes = max_bytes
+        self._files = OrderedDict()  # path -> size, least recently used first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._building = {}          # path -> lock, so concurrent requests build once
+        self.prebuilt = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._scan()
+
+    def _scan(self):
+        """Reload the view of cache_dir from disk, least recently used first."""
+        found = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith('.tmp') or name == LOCK_NAME:
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                found.append((st.st_mtime, path, st.st_size))
+        files = OrderedDict((path, size) for _, path, size in sorted(found))
+        with self._lock:
+            self._files = files
+            self._bytes = sum(files.values())
+
+    def _cache_path(self, entry, kind, width, fmt):
+        stem = rendition_stem(entry)
+        return os.path.join(self.cache_dir, kind, f"{stem}.{entry.content_hash}.{rendition_suffix(width, fmt)}")
+
+    def get(self, entry, kind, width, fmt):
+        """Path of the rendition of entry at (snapped) width in fmt, building it if needed.
+
+        width None means the source's own size; the source itself is returned
+        when it is already in fmt.
+        """
+        if width is None and os.path.splitext(entry.filename)[1].lower() == f'.{fmt}':
+            return entry.path
+        relpath = rendition_relpath(kind, rendition_stem(entry), width, fmt)
+        prebuilt_mtime = self.index.rendition_mtime(relpath)
+        if prebuilt_mtime is not None and prebuilt_mtime >= entry.mtime:
+            self.prebuilt += 1
+            return os.path.join(self.base_dir, relpath)
+
+        path = self._cache_path(entry, kind, width, fmt)
+        with self._lock:
+            known = path in self._files
+        if known and self._touch(path):
+            with self._lock:
+                if path in self._files:
+                    self._files.move_to_end(path)
+                self.hits += 1
+            return path
+        with self._lock:
+            if known:  # another process evicted it
+                self._bytes -= self._files.pop(path, 0)
+            self.misses += 1
+            build_lock = self._building.setdefault(path, threading.Lock())
+        try:
+            with build_lock:
+                # a concurrent request, or another process, may have built it meanwhile
+                if not self._touch(path):
+                    build_rendition(entry.path, path, width, fmt)
+                self._evict(keep=path)
+        finally:
+            with self._lock:
+                self._building.pop(path, None)
+        return path
+
+    @staticmethod
+    def _touch(path):
+        """Mark path as just used; False when it no longer exists."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _dir_lock(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        lock_file = open(os.path.join(self.cache_dir, LOCK_NAME), 'a')
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)  # released when the file is closed
+        return lock_file
+
+    def _evict(self, keep=None):
+        """Rescan cache_dir and delete the least recently used files until it fits max_bytes.
+
+        Runs after each build, so the scan's cost is small next to the encode
+        it follows. `keep` (the file just built) is never evicted.
+        """
+        with self._dir_lock():
+            self._scan()
+            with self._lock:
+                victims = []
+                total = self._bytes
+                for path, size in self._files.items():
+                    if total <= self.max_bytes:
+                        break
+                    if path != keep:
+                        victims.append(path)
+                        total -= size
+            for path in victims:
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                with self._lock:
+                    self._bytes -= self._files.pop(path, 0)
+                    self.evictions += 1
+
+    def clear(self):
+        with self._dir_lock():
+            self._scan()
+            with self._lock:
+                for path in self._files:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                self._files.clear()
+                self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._files),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'prebuilt': self.prebuilt,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+            }
@@ -9,8 +9,16 @@ const CONFIG = {
     ANIMATION_DURATION: 500,  // Animation duration in ms
     API_LETTER_URL: '/api/letter',  // API endpoint for letter images
     API_PHRASE_URL: '/api/phrase',  // API endpoint for phrase/word GIFs
+    API_TRANSLATE_URL: '/api/translate',  // API endpoint that plans a whole sentence in one request
+    API_TRANSLATE_STREAM_URL: '/api/translate/stream',  // Server-Sent Events: the plan one sign at a time
+    API_SUGGEST_URL: '/api/phrase/suggest',  // API endpoint for type-ahead phrase suggestions
+    API_LETTER_BUNDLE_URL: '/api/letter/bundle',  // API endpoint for the letter sprite sheet map
+    USE_LETTER_SPRITE: true,  // Fetch all letters once as a sprite sheet instead of one request per letter
+    SUGGEST_DEBOUNCE: 150,  // Wait this long after the last keystroke before asking for suggestions
     USE_API: true,  // Use API endpoint instead of direct file access
     PHRASE_FIRST: true,  // Try to match phrases/words before splitting into letters
+    USE_TRANSLATE_PLAN: true,  // Ask the server for the full phrase/letter plan instead of probing per variation
+    USE_STREAMING_PLAN: true,  // Start playing the first sign while the rest of the plan is still arriving
 };
 
 // ===== State Management =====
@@ -21,9 +29,16 @@ const state = {
     currentSentence: '',
     currentLetterIndex: 0,
     letters: [],
+    planSteps: [],
+    planStream: null,  // EventSource while a streamed plan is arriving
+    planStreamDone: true,
+    waitingForStep: null,  // resumes playback when the next streamed step arrives
     displayTimeout: null,
     isDarkMode: localStorage.getItem('darkMode') === 'true' || false,
     history: JSON.parse(localStorage.getItem('islHistory') || '[]'),
+    suggestTimeout: null,
+    letterSprite: null,  // { image, letters: { A: {x, y, w, h}, ... } } once the sprite sheet has loaded
+    suggestController: null,
 };
 
 // ===== DOM Elements =====
@@ -38,6 +53,7 @@ const elements = {
     letterSequence: document.getElementById('letterSequence'),
     darkModeToggle: document.getElementById('darkModeToggle'),
     textInput: document.getElementById('textInput'),
+    phraseSuggestions: document.getElementById('phraseSuggestions'),
     submitTextBtn: document.getElementById('submitTextBtn'),
     stopTextBtn: document.getElementById('stopTextBtn'),
     historyContainer: document.getElementById('historyContainer'),
@@ -131,12 +147,34 @@ function processText(text) {
     // Save to history
     addToHistory(text);
     
+    // Preferred: one connection streams the playback plan, so the first sign plays right away
+    if (CONFIG.USE_TRANSLATE_PLAN && CONFIG.USE_STREAMING_PLAN && window.EventSource) {
+        streamTranslationPlan(state.currentSentence);
+        return;
+    }
+    
+    // Otherwise one request returns the whole playback plan (phrases + letters)
+    if (CONFIG.USE_TRANSLATE_PLAN) {
+        requestTranslationPlan(state.currentSentence)
+            .then(plan => playPlan(plan))
+            .catch(error => {
+                console.error('Translate plan failed, falling back to per-request lookup:', error);
+                processWithoutPlan(state.currentSentence);
+            });
+        return;
+    }
+    
+    processWithoutPlan(state.currentSentence);
+}
+
+// ===== Process Text Without Server Plan (per-variation lookups) =====
+function processWithoutPlan(sentence) {
     // First, try to match as a phrase/word (this will show video-like GIF)
     if (CONFIG.PHRASE_FIRST) {
-        checkPhraseMatch(state.currentSentence, (matched) => {
+        checkPhraseMatch(sentence, (matched) => {
             if (matched) {
                 // Phrase matched, GIF is already displayed in video format
-                updateStatus(`Playing GIF for: ${state.currentSentence}`, false);
+                updateStatus(`Playing GIF for: ${sentence}`, false);
                 // Reset processing state after a delay (phrase GIFs don't need stop)
                 setTimeout(() => {
                     state.isProcessing = false;
@@ -146,11 +184,151 @@ function processText(text) {
                 return;
             } else {
                 // No phrase match, fall back to letter-by-letter
-                processAsLetters(state.currentSentence);
+                processAsLetters(sentence);
             }
         });
     } else {
-        processAsLetters(state.currentSentence);
+        processAsLetters(sentence);
+    }
+}
+
+// ===== Request Server-Side Translation Plan =====
+function requestTranslationPlan(text) {
+    return fetch(CONFIG.API_TRANSLATE_URL, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ text: text, letter_ms: CONFIG.LETTER_DISPLAY_DURATION }),
+    }).then(response => {
+        if (!response.ok) {
+            throw new Error(`Translate request failed with status ${response.status}`);
+        }
+        return response.json();
+    });
+}
+
+// ===== Stream Translation Plan (Server-Sent Events) =====
+function streamTranslationPlan(text) {
+    closePlanStream();
+    state.planSteps = [];
+    state.planStreamDone = false;
+    elements.letterSequence.innerHTML = '';
+    
+    const params = new URLSearchParams({ text: text, letter_ms: CONFIG.LETTER_DISPLAY_DURATION });
+    const source = new EventSource(`${CONFIG.API_TRANSLATE_STREAM_URL}?${params}`);
+    state.planStream = source;
+    let started = false;
+    
+    const resumePlayback = () => {
+        if (state.waitingForStep) {
+            const resume = state.waitingForStep;
+            state.waitingForStep = null;
+            resume();
+        }
+    };
+    
+    source.addEventListener('step', (event) => {
+        const step = JSON.parse(event.data);
+        if (!step.url) {
+            return;  // Skip letters that have no image on the server
+        }
+        state.planSteps.push(step);
+        appendLetterBadge(step.text.toUpperCase(), state.planSteps.length - 1);
+        if (!started) {
+            started = true;
+            playPlanStep(0);
+        } else {
+            resumePlayback();
+        }
+    });
+    
+    source.addEventListener('end', () => {
+        closePlanStream();
+        if (!started) {
+            playPlan({ steps: [] });  // shows the "no signs found" message
+        }
+        resumePlayback();
+    });
+    
+    // Fired for the server's own error event and for connection failures;
+    // EventSource would reconnect and replay the plan, so close it instead
+    source.addEventListener('error', (event) => {
+        closePlanStream();
+        if (!started && state.isProcessing) {
+            console.error('Streamed plan failed, falling back to a single request:', event.data || 'connection error');
+            requestTranslationPlan(text)
+                .then(plan => playPlan(plan))
+                .catch(() => processWithoutPlan(text));
+            return;
+        }
+        resumePlayback();
+    });
+}
+
+function closePlanStream() {
+    if (state.planStream) {
+        state.planStream.close();
+        state.planStream = null;
+    }
+    state.planStreamDone = true;
+}
+
+// ===== Play Translation Plan =====
+function playPlan(plan) {
+    // Skip letters that have no image on the server
+    state.planSteps = plan.steps.filter(step => step.url);
+    
+    if (state.planSteps.length === 0) {
+        showError('No signs found for this text. Please try different words.');
+        state.isProcessing = false;
+        elements.stopTextBtn.disabled = true;
+        elements.submitTextBtn.disabled = false;
+        return;
+    }
+    
+    displayLetterSequence(state.planSteps.map(step => step.text.toUpperCase()));
+    playPlanStep(0);
+}
+
+// ===== Play One Plan Step (phrase GIF or letter image) =====
+function playPlanStep(index) {
+    // Check if processing was stopped
+    if (!state.isProcessing) {
+        updateStatus('Stopped', false);
+        elements.stopTextBtn.disabled = true;
+        elements.submitTextBtn.disabled = false;
+        return;
+    }
+    
+    if (index >= state.planSteps.length && !state.planStreamDone) {
+        // Streamed plan: the next sign has not arrived yet
+        state.waitingForStep = () => playPlanStep(index);
+        return;
+    }
+    
+    if (index >= state.planSteps.length) {
+        updateStatus('Display complete', false);
+        state.isProcessing = false;
+        elements.stopTextBtn.disabled = true;
+        elements.submitTextBtn.disabled = false;
+        return;
+    }
+    
+    const step = state.planSteps[index];
+    updateLetterSequenceBadges(index);
+    
+    const scheduleNext = () => {
+        state.displayTimeout = setTimeout(() => {
+            playPlanStep(index + 1);
+        }, step.duration_ms);
+    };
+    
+    if (step.type === 'phrase') {
+        displayPhraseGIF(step.text, step.url, { keepSequence: true });
+        scheduleNext();
+    } else {
+        elements.currentLetter.textContent = step.text;
+        elements.currentLetter.classList.add('has-letter');
+        loadAndDisplayGIF(step.text, scheduleNext, step.url);
     }
 }
 
@@ -231,10 +409,13 @@ function checkPhraseMatch(phrase, callback) {
 }
 
 // ===== Display Phrase GIF (Video-like Format) =====
-function displayPhraseGIF(phrase, blob) {
+// `source` is either a Blob or a URL; pass { keepSequence: true } to leave the badges alone
+function displayPhraseGIF(phrase, source, options = {}) {
     elements.currentLetter.textContent = phrase.toUpperCase();
     elements.currentLetter.classList.add('has-letter');
-    elements.letterSequence.innerHTML = `<div class="letter-badge active">${phrase}</div>`;
+    if (!options.keepSequence) {
+        elements.letterSequence.innerHTML = `<div class="letter-badge active">${phrase}</div>`;
+    }
     
     // Create video-like container
     const videoContainer = document.createElement('div');
@@ -242,8 +423,7 @@ function displayPhraseGIF(phrase, blob) {
     
     // Create the GIF image (GIFs play automatically)
     const img = document.createElement('img');
-    const blobUrl = URL.createObjectURL(blob);
-    img.src = blobUrl;
+    img.src = (source instanceof Blob) ? URL.createObjectURL(source) : source;
     img.alt = `ISL sign for: ${phrase}`;
     img.className = 'phrase-gif-video';
     img.style.width = '100%';
@@ -360,14 +540,64 @@ function displayLettersSequentially(index) {
     });
 }
 
+// ===== Load Letter Sprite Sheet =====
+// One map request plus one (immutable, cacheable) image holds the whole alphabet
+function loadLetterSprite() {
+    if (!CONFIG.USE_API || !CONFIG.USE_LETTER_SPRITE) {
+        return;
+    }
+    fetch(CONFIG.API_LETTER_BUNDLE_URL)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(`Letter bundle request failed with status ${response.status}`);
+            }
+            return response.json();
+        })
+        .then(bundle => {
+            const image = new Image();
+            image.onload = () => {
+                state.letterSprite = { image: image, letters: bundle.letters };
+                console.log('Letter sprite loaded:', bundle.count, 'letters');
+            };
+            image.src = bundle.sprite.url;
+        })
+        .catch(error => {
+            console.log('Letter sprite unavailable, using per-letter requests:', error.message);
+        });
+}
+
+// ===== Display Letter From Sprite Sheet =====
+// Returns false when the sprite is not loaded (yet) or has no cell for the letter
+function displaySpriteLetter(letter) {
+    const box = state.letterSprite && state.letterSprite.letters[letter.toUpperCase()];
+    if (!box) {
+        return false;
+    }
+    const canvas = document.createElement('canvas');
+    canvas.width = box.w;
+    canvas.height = box.h;
+    canvas.setAttribute('aria-label', `Letter ${letter}`);
+    canvas.getContext('2d').drawImage(state.letterSprite.image, box.x, box.y, box.w, box.h, 0, 0, box.w, box.h);
+    elements.gifContainer.innerHTML = '';
+    elements.gifContainer.appendChild(canvas);
+    return true;
+}
+
 // ===== Load and Display Letter Image =====
-function loadAndDisplayGIF(letter, callback) {
+// `url` is optional; plan steps pass their fingerprinted (long-cacheable) URL
+function loadAndDisplayGIF(letter, callback, url) {
+    // Sprite sheet already in memory: no request needed
+    if (displaySpriteLetter(letter)) {
+        if (callback) callback();
+        return;
+    }
+    
     // Show loading state
     elements.gifContainer.innerHTML = '<div class="gif-loading">Loading letter image...</div>';
     
     if (CONFIG.USE_API) {
         // Use API endpoint for letters
-        const apiUrl = `${CONFIG.API_LETTER_URL}/${letter}`;
+        const apiUrl = url || `${CONFIG.API_LETTER_URL}/${letter}`;
         const img = document.createElement('img');
         img.src = apiUrl;
         img.alt = `Letter ${letter}`;
@@ -444,13 +674,15 @@ function tryAlternativePaths(letter, onSuccess, onError) {
 function displayLetterSequence(letters) {
     elements.letterSequence.innerHTML = '';
     
-    letters.forEach((letter, index) => {
-        const badge = document.createElement('div');
-        badge.className = 'letter-badge';
-        badge.textContent = letter;
-        badge.dataset.index = index;
-        elements.letterSequence.appendChild(badge);
-    });
+    letters.forEach((letter, index) => appendLetterBadge(letter, index));
+}
+
+function appendLetterBadge(letter, index) {
+    const badge = document.createElement('div');
+    badge.className = 'letter-badge';
+    badge.textContent = letter;
+    badge.dataset.index = index;
+    elements.letterSequence.appendChild(badge);
 }
 
 // ===== Update Letter Sequence Badges =====
@@ -514,6 +746,10 @@ function stopTextProcessing() {
         state.displayTimeout = null;
     }
     
+    // Stop receiving a streamed plan
+    closePlanStream();
+    state.waitingForStep = null;
+    
     // Stop processing
     state.isProcessing = false;
     elements.stopTextBtn.disabled = true;
@@ -695,11 +931,47 @@ elements.textInput.addEventListener('keypress', (e) => {
 
 elements.stopTextBtn.addEventListener('click', stopTextProcessing);
 
+// Type-ahead: fill the input's datalist with phrase suggestions as the user types
+elements.textInput.addEventListener('input', () => {
+    clearTimeout(state.suggestTimeout);
+    state.suggestTimeout = setTimeout(updatePhraseSuggestions, CONFIG.SUGGEST_DEBOUNCE);
+});
+
+async function updatePhraseSuggestions() {
+    const query = elements.textInput.value.trim();
+    if (state.suggestController) {
+        state.suggestController.abort();  // a newer keystroke wins
+    }
+    if (!query || !CONFIG.USE_API) {
+        elements.phraseSuggestions.replaceChildren();
+        return;
+    }
+    state.suggestController = new AbortController();
+    try {
+        const response = await fetch(`${CONFIG.API_SUGGEST_URL}?q=${encodeURIComponent(query)}&limit=8`,
+                                     { signal: state.suggestController.signal });
+        if (!response.ok) {
+            return;
+        }
+        const data = await response.json();
+        elements.phraseSuggestions.replaceChildren(...data.suggestions.map(s => {
+            const option = document.createElement('option');
+            option.value = s.phrase;
+            return option;
+        }));
+    } catch (error) {
+        if (error.name !== 'AbortError') {
+            console.log('Suggestions unavailable:', error.message);
+        }
+    }
+}
+
 // ===== Initialize on Page Load =====
 document.addEventListener('DOMContentLoaded', () => {
     initializeDarkMode();
     updateStatus('Ready to start', false);
     displayHistory(); // Load and display history
+    loadLetterSprite(); // Prefetch the whole alphabet for fingerspelling
     console.log('Indian Sign Language Converter initialized');
     console.log('ISL GIFs directory:', CONFIG.ISL_GIFS_DIR);
     console.log('History items:', state.history.length);
@@ -0,0 +1,142 @@
+"""
+Server-side sentence rendering
+Stitches the letter images and phrase GIFs of a sign plan into one animated
+GIF or WebP, so a translated sentence can be downloaded or shared. Rendered
+files are kept in a size-bounded LRU cache keyed by the normalized text.
+Frames are composed one at a time as the encoder asks for them, but both
+Pillow writers still hold every frame until the file is written (the GIF
+writer a full palette image per frame, the WebP writer the RGB canvases), so a
+render is capped in signs, frames and the memory those frames take.
+"""
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from gif_frames import frame_cache
+from gif_info import browser_delay
+
+DEFAULT_RENDER_SIZE = 320
+MAX_RENDER_SIZE = 640
+MAX_RENDER_TEXT_CHARS = 500
+MAX_RENDER_STEPS = 120
+MAX_RENDER_FRAMES = 600
+MAX_RENDER_BYTES = 256 * 1024 * 1024
+# bytes held per output pixel until the encoder finishes: the RGBA source
+# frame plus the writer's copy (a P-mode frame for GIF, an RGB canvas for WebP)
+RENDER_BYTES_PER_PIXEL = {'gif': 4 + 1, 'webp': 4 + 3}
+RENDER_FORMATS = {
+    'gif': ('GIF', 'image/gif'),
+    'webp': ('WEBP', 'image/webp'),
+}
+BACKGROUND = (255, 255, 255)
+
+
+class RenderError(Exception):
+    """Raised when a plan cannot be rendered (no frames, too long, bad format)."""
+
+
+def _fit_on_canvas(frame, size):
+    """Center an RGBA frame on a size x size opaque canvas."""
+    canvas = Image.new('RGB', (size, size), BACKGROUND)
+    if frame.width > size or frame.height > size:
+        frame = frame.copy()
+        frame.thumbnail((size, size), Image.Resampling.LANCZOS)
+    offset = ((size - frame.width) // 2, (size - frame.height) // 2)
+    canvas.paste(frame, offset, frame)
+    return canvas
+
+
+def _step_frames(step, base_dir, size):
+    """(source RGBA frames, duration ms of each) for one plan step; frames are shared with frame_cache."""
+    frames = frame_cache.get_frames(str(base_dir / step['path']), maxdim=size)
+    if step['type'] == 'letter' or len(frames) <= 1:
+        # still image: hold it for the step's display time
+        return frames[:1], [step['duration_ms']] * len(frames[:1])
+    return frames, [browser_delay(int(frame.info.get('duration', 0))) for frame in frames]
+
+
+def render_plan(plan, base_dir, fmt='gif', size=DEFAULT_RENDER_SIZE):
+    """Render every step of a sign plan into one animation. Returns the encoded bytes."""
+    if fmt not in RENDER_FORMATS:
+        raise RenderError(f'Unsupported format: {fmt}')
+    steps = [step for step in plan['steps'] if step.get('path')]  # skip missing letter images
+    if len(steps) > MAX_RENDER_STEPS:
+        raise RenderError(f'Sentence too long to render (over {MAX_RENDER_STEPS} signs)')
+    max_frames = max(1, min(MAX_RENDER_FRAMES, MAX_RENDER_BYTES // (size * size * RENDER_BYTES_PER_PIXEL[fmt])))
+    # the encoder needs every delay up front; the canvases are composed as it asks for them
+    sources, durations = [], []
+    for step in steps:
+        frames, step_durations = _step_frames(step, base_dir, size)
+        sources += frames
+        durations += step_durations
+        if len(durations) > max_frames:
+            raise RenderError(f'Sentence too long to render (over {max_frames} frames at {size}px)')
+    if not durations:
+        raise RenderError('Nothing to render for this text')
+
+    canvases = (_fit_on_canvas(frame, size) for frame in sources)
+    pil_format, _ = RENDER_FORMATS[fmt]
+    out = io.BytesIO()
+    options = {'save_all': True, 'append_images': canvases, 'duration': durations, 'loop': 0}
+    if pil_format == 'WEBP':
+        options['quality'] = 80
+    else:
+        options['optimize'] = True
+    next(canvases).save(out, format=pil_format, **options)
+    return out.getvalue()
+
+
+class RenderCache:
+    """Thread-safe LRU of rendered animations bounded by total bytes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()  # key -> (data, etag)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key, data):
+        etag = hashlib.blake2b(data, digest_size=8).hexdigest()
+        if len(data) > self.max_bytes:
+            return data, etag  # too large to cache; still usable by the caller
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._items[key] = (data, etag)
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+        return data, etag
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
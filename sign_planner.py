@@ -0,0 +1,149 @@
+"""
+Sentence-to-sign sequence planner
+Turns a sentence into a playback plan: known phrase GIFs are matched over the
+word sequence (covering as many words as possible with as few clips as
+possible) and every remaining word is fingerspelled letter by letter.
+Shared by the Flask API (POST /api/translate) and the desktop app (main2.py).
+"""
+
+import re
+import string
+
+from asset_index import letter_url, normalize_phrase, phrase_url
+
+DEFAULT_LETTER_DURATION_MS = 2000  # matches LETTER_DISPLAY_DURATION in script.js
+MIN_LETTER_DURATION_MS = 100
+MAX_LETTER_DURATION_MS = 10000
+LETTERS = frozenset(string.ascii_lowercase)
+
+_PUNCTUATION = re.compile(r"[^\w\s\-]")
+
+
+def tokenize(text):
+    """Normalize a sentence and split it into words (punctuation dropped)."""
+    return normalize_phrase(_PUNCTUATION.sub('', text or '')).split()
+
+
+def _is_phrase_clip(entry):
+    # single-letter GIFs in ISL_Gifs are letters, not phrases (same rule as /api/phrase/list)
+    return len(entry.name) > 1 or not entry.name.isalpha()
+
+
+def _find_clip(phrase, index, allowed_phrases):
+    if allowed_phrases is not None and phrase not in allowed_phrases:
+        return None
+    entry = index.find_phrase(phrase)
+    return entry if entry is not None and _is_phrase_clip(entry) else None
+
+
+def segment(words, index, allowed_phrases=None):
+    """Split words into phrase-clip and spelled segments.
+
+    Returns a list of (phrase_text, entry) tuples where entry is None for a
+    word that has to be fingerspelled. Uses dynamic programming so the plan
+    spells as few words as possible, then uses as few segments as possible;
+    on ties the longer phrase starting earlier wins.
+    """
+    n = len(words)
+    max_words = max(1, index.max_phrase_words)
+    # best[i] = (spelled words, segments) for words[i:]; choice[i] = (end, entry)
+    best = [None] * (n + 1)
+    choice = [None] * (n + 1)
+    best[n] = (0, 0)
+    for i in range(n - 1, -1, -1):
+        best[i] = (best[i + 1][0] + 1, best[i + 1][1] + 1)
+        choice[i] = (i + 1, None)
+        for j in range(min(n, i + max_words), i, -1):
+            entry = _find_clip(' '.join(words[i:j]), index, allowed_phrases)
+            if entry is None:
+                continue
+            cost = (best[j][0], best[j][1] + 1)
+            if cost < best[i]:
+                best[i] = cost
+                choice[i] = (j, entry)
+
+    segments = []
+    i = 0
+    while i < n:
+        end, entry = choice[i]
+        segments.append((' '.join(words[i:end]), entry))
+        i = end
+    return segments
+
+
+def iter_segments(words, index, allowed_phrases=None):
+    """Yield the same segments as segment(), without waiting for the end of the input.
+
+    A position no multi-word clip spans splits the words into parts that can
+    be segmented independently, so each part is yielded as soon as the words
+    within max_phrase_words after it have been checked.
+    """
+    max_words = max(1, index.max_phrase_words)
+    start = 0
+    span_end = 0  # furthest end of a multi-word clip starting in the current part
+    for i in range(len(words)):
+        if i > start and i >= span_end:
+            yield from segment(words[start:i], index, allowed_phrases)
+            start = i
+        for j in range(i + 2, min(len(words), i + max_words) + 1):
+            if j > span_end and _find_clip(' '.join(words[i:j]), index, allowed_phrases) is not None:
+                span_end = j
+    yield from segment(words[start:], index, allowed_phrases)
+
+
+def iter_plan_steps(words, index, letter_duration_ms=DEFAULT_LETTER_DURATION_MS, allowed_phrases=None):
+    """Yield the playback steps for tokenized words one sign at a time (see plan_sentence)."""
+    for phrase, entry in iter_segments(words, index, allowed_phrases):
+        if entry is not None:
+            yield {
+                'type': 'phrase',
+                'text': phrase,
+                'filename': entry.filename,
+                'path': entry.relpath,
+                'url': phrase_url(entry),
+                'duration_ms': entry.duration_ms or letter_duration_ms,
+            }
+            continue
+        for ch in phrase:
+            if ch not in LETTERS:
+                continue  # digits and symbols have no sign images
+            letter = index.find_letter(ch)
+            step = {
+                'type': 'letter',
+                'text': ch.upper(),
+                'word': phrase,
+                'path': letter.relpath if letter else None,
+                'url': letter_url(letter) if letter else None,
+                'duration_ms': letter_duration_ms,
+            }
+            if letter is None:
+                step['missing'] = True
+            yield step
+
+
+def plan_summary(steps):
+    """Counts and total duration of a list of plan steps."""
+    return {
+        'count': len(steps),
+        'phrase_count': sum(1 for s in steps if s['type'] == 'phrase'),
+        'letter_count': sum(1 for s in steps if s['type'] == 'letter'),
+        'total_duration_ms': sum(s['duration_ms'] for s in steps),
+    }
+
+
+def plan_sentence(text, index, letter_duration_ms=DEFAULT_LETTER_DURATION_MS, allowed_phrases=None):
+    """Build the full playback plan for a sentence.
+
+    Each step is a dict with 'type' ('phrase' or 'letter'), 'text', 'url' and
+    'duration_ms'. Letter steps also carry the 'word' they spell and
+    'missing': True when no image exists for that letter. allowed_phrases
+    optionally restricts which normalized phrases may use a clip.
+    """
+    words = tokenize(text)
+    steps = list(iter_plan_steps(words, index, letter_duration_ms, allowed_phrases))
+    return {
+        'text': text,
+        'normalized': ' '.join(words),
+        'steps': steps,
+        **plan_summary(steps),
+    }
@@ -0,0 +1,36 @@
+@echo off
+REM ========================================
+REM ISL Web Converter API Server (production)
+REM ========================================
+
+title ISL Converter - API Server (production)
+
+cd /d "%~dp0"
+
+echo ========================================
+echo Starting ISL Web Converter API Server
+echo (multi-threaded waitress, no debugger)
+echo ========================================
+echo.
+
+REM Check Python
+python --version >nul 2>&1
+if errorlevel 1 (
+    echo [ERROR] Python not found!
+    pause
+    exit /b 1
+)
+
+echo Installing dependencies (if needed)...
+python -c "import flask, waitress" >nul 2>&1
+if errorlevel 1 (
+    pip install -r requirements-prod.txt --quiet
+)
+
+echo.
+echo Server will start on: http://localhost:5000
+echo See DEPLOYMENT.md for gunicorn / nginx / ASGI setups
+echo.
+
+python wsgi.py
+pause
@@ -0,0 +1,138 @@
+"""
+Startup helpers for the desktop app (main2.py)
+LazyModule defers a heavy import until the module is first used, so the menu
+window does not wait for subsystems that may never run (matplotlib when only
+the Tk renderer is used, speech_recognition until the microphone is needed).
+Warmup runs slow preparation (microphone calibration, asset caches) on
+background threads while the menu is shown, and StartupProfile records how
+long every phase took so startup regressions can be tracked.
+"""
+
+import importlib
+import json
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# taken when this module is first imported: main2 imports it before anything heavy
+PROCESS_START = time.perf_counter()
+
+
+class StartupProfile:
+    """Start offset and duration (ms) of named startup phases, relative to PROCESS_START."""
+
+    def __init__(self, origin=PROCESS_START):
+        self.origin = origin
+        self.phases = []  # (name, start ms, duration ms, thread name)
+        self._lock = threading.Lock()
+
+    def add(self, name, started, finished=None):
+        """Record a phase from perf_counter() timestamps (a mark when finished is omitted)."""
+        finished = started if finished is None else finished
+        with self._lock:
+            self.phases.append((name, (started - self.origin) * 1000, (finished - started) * 1000,
+                                threading.current_thread().name))
+
+    def mark(self, name):
+        self.add(name, time.perf_counter())
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, started, time.perf_counter())
+
+    def as_dict(self):
+        with self._lock:
+            phases = sorted(self.phases, key=lambda p: p[1])
+        return {
+            'timestamp': time.time(),
+            'phases': [{'name': name, 'start_ms': round(start, 1), 'duration_ms': round(duration, 1),
+                        'thread': thread} for name, start, duration, thread in phases],
+        }
+
+    def report(self):
+        print("=" * 78)
+        print(f"{'phase':<40} {'start ms':>9} {'took ms':>9}  thread")
+        print("-" * 78)
+        for p in self.as_dict()['phases']:
+            print(f"{p['name']:<40} {p['start_ms']:>9.1f} {p['duration_ms']:>9.1f}  {p['thread']}")
+        print("=" * 78)
+
+    def append_to(self, path):
+        """Append this run as one JSON line, so runs can be compared over time."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.as_dict()) + '\n')
+
+
+# process-wide profile; phases are always recorded (it is cheap), and printed with --profile-startup
+profile = StartupProfile()
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access.
+
+    `plt = LazyModule("matplotlib.pyplot")` keeps call sites like
+    plt.pause() unchanged while the import cost moves to the first call.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with profile.phase(f"import {self._name}"):
+                        self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+class Warmup:
+    """Named background tasks; result() waits for one and returns None if it failed."""
+
+    def __init__(self):
+        self._tasks = {}
+
+    def start(self, name, func, *args):
+        future = Future()
+
+        def run():
+            started = time.perf_counter()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                print(f"Warm-up '{name}' failed:", e)
+                future.set_exception(e)
+            finally:
+                profile.add(f"warm-up: {name}", started, time.perf_counter())
+
+        self._tasks[name] = future
+        threading.Thread(target=run, name=f"warmup-{name}", daemon=True).start()
+        return future
+
+    def result(self, name, timeout=None):
+        future = self._tasks.get(name)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout)
+        except Exception:
+            return None
+
+    def wait_all(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for name in list(self._tasks):
+            self.result(name, None if deadline is None else max(0.0, deadline - time.monotonic()))
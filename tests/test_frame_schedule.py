@@ -0,0 +1,157 @@
+"""
+Deterministic playback timing tests for frame_schedule
+FramePlayer runs against a virtual clock that only moves when the simulated
+UI loop sleeps, so lateness, drift and skipped frames are exact and the tests
+take no wall time.
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_schedule import LATENESS_SAMPLES, FramePlayer, FrameSchedule  # noqa: E402
+
+VARIABLE = [40, 40, 200, 30, 30, 500, 60, 60, 120, 40]
+
+
+class VirtualClock:
+    """Monotonic clock that only advances when sleep() is called."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+def play(delays, loops, work=lambda tick: 0.0):
+    """Drive a FramePlayer like ImageLabel does: sleep the wait it asks for plus work(tick) ms of UI time.
+
+    Returns (player, [(ms since start, frame index) for every tick], overrun ms).
+    """
+    clock = VirtualClock()
+    player = FramePlayer(FrameSchedule(delays), loops=loops, clock=clock)
+    player.start()
+    ticks = []
+    while True:
+        index, wait_ms = player.tick()
+        if index is None:
+            break
+        ticks.append(((clock() - player.started) * 1000, index))
+        clock.sleep((max(1, round(wait_ms)) + work(len(ticks))) / 1000)
+    overrun_ms = (clock() - player.started) * 1000 - loops * player.schedule.loop_ms
+    return player, ticks, overrun_ms
+
+
+class FrameScheduleTest(unittest.TestCase):
+
+    def test_delays_are_normalized_like_browsers(self):
+        schedule = FrameSchedule([0, 10, 20, 150])
+        self.assertEqual(schedule.delays_ms, [100, 100, 20, 150])
+        self.assertEqual(schedule.starts_ms, [0, 100, 200, 220])
+        self.assertEqual(schedule.loop_ms, 370)
+
+    def test_frame_at_wraps_around_the_loop(self):
+        schedule = FrameSchedule([100, 50, 200])
+        self.assertEqual([schedule.frame_at(t) for t in (0, 99, 100, 149, 150, 349, 350, 450)],
+                         [0, 0, 1, 1, 2, 2, 0, 1])
+
+
+class FramePlayerTimingTest(unittest.TestCase):
+
+    def test_idle_ui_shows_every_frame_on_time(self):
+        player, ticks, overrun_ms = play(VARIABLE, loops=3)
+        schedule = player.schedule
+        self.assertEqual(player.shown, 3 * len(VARIABLE))
+        self.assertEqual(player.skipped, 0)
+        self.assertAlmostEqual(player.late_max_ms, 0, places=6)
+        # one tick per frame, each exactly at the frame's scheduled start
+        expected = [(loop * schedule.loop_ms + start, index)
+                    for loop in range(3) for index, start in enumerate(schedule.starts_ms)]
+        self.assertEqual([(round(t, 6), index) for t, index in ticks], expected)
+        self.assertAlmostEqual(overrun_ms, 0, places=6)
+
+    def test_ui_work_does_not_accumulate_lateness(self):
+        # 5ms of UI work per tick: a fixed-delay chain would drift 5ms per frame
+        player, _, overrun_ms = play([100] * 20, loops=5, work=lambda tick: 5)
+        self.assertEqual(player.shown, 100)
+        self.assertEqual(player.skipped, 0)
+        self.assertLessEqual(player.late_max_ms, 5 + 1e-6)
+        # the first frame is shown at start; every later one exactly one tick's work late
+        self.assertAlmostEqual(player.late_samples_ms[0], 0, places=6)
+        for late in player.late_samples_ms[1:]:
+            self.assertAlmostEqual(late, 5, places=6)
+        self.assertAlmostEqual(player.late_sum_ms, 5 * 99, places=6)
+        self.assertLessEqual(overrun_ms, 5 + 1e-6)
+
+    def test_jitter_stays_bounded_over_a_long_playback(self):
+        rng = random.Random(7)
+        work_ms = {}
+
+        def work(tick):
+            work_ms[tick] = abs(rng.gauss(0, 4))
+            return work_ms[tick]
+
+        player, _, overrun_ms = play(VARIABLE, loops=50, work=work)
+        worst = max(work_ms.values())
+        self.assertEqual(player.shown + player.skipped, 50 * len(VARIABLE))
+        # lateness is bounded by one tick's work plus the 1ms timer granularity, however long playback runs
+        self.assertLessEqual(player.late_max_ms, worst + 1)
+        self.assertLessEqual(overrun_ms, worst + 1)
+        # the first and last tenth of the frames are no later than each other on average: no drift
+        tenth = len(player.late_samples_ms) // 10
+        first = sum(player.late_samples_ms[:tenth]) / tenth
+        last = sum(player.late_samples_ms[-tenth:]) / tenth
+        self.assertLess(abs(last - first), 4)
+
+    def test_stall_skips_frames_instead_of_overrunning(self):
+        # a 250ms stall on the fourth tick: frames whose slots passed are dropped
+        player, ticks, overrun_ms = play([100] * 10, loops=1, work=lambda tick: 250 if tick == 4 else 0)
+        self.assertEqual(player.skipped, 2)
+        self.assertEqual(player.shown + player.skipped, 10)
+        self.assertEqual([index for _, index in ticks], [0, 1, 2, 3, 6, 7, 8, 9])
+        self.assertLessEqual(player.late_max_ms, 50 + 1e-6)
+        self.assertAlmostEqual(overrun_ms, 0, places=6)
+
+    def test_frames_are_never_shown_before_their_start(self):
+        player, _, _ = play(VARIABLE, loops=3, work=lambda tick: tick % 7)
+        self.assertGreaterEqual(min(player.late_samples_ms), 0)
+
+    def test_endless_playback_keeps_lateness_stats_bounded(self):
+        # loops=None as ImageLabel plays; stop after many more frames than the sample holds
+        clock = VirtualClock()
+        player = FramePlayer(FrameSchedule([20, 30]), clock=clock)
+        player.start()
+        frames = 5 * LATENESS_SAMPLES
+        while player.shown < frames:
+            _, wait_ms = player.tick()
+            clock.sleep((max(1, round(wait_ms)) + player.shown % 3) / 1000)
+        self.assertEqual(len(player.late_samples_ms), LATENESS_SAMPLES)
+        stats = player.stats()
+        self.assertEqual(stats['frames'], frames)
+        self.assertLessEqual(stats['max_late_ms'], 2 + 1e-6)
+        self.assertLessEqual(stats['p95_late_ms'], stats['max_late_ms'])
+        self.assertAlmostEqual(stats['mean_late_ms'], player.late_sum_ms / frames, places=2)
+
+    def test_finishes_after_the_requested_loops(self):
+        player, ticks, _ = play([30, 30], loops=2)
+        self.assertEqual(len(ticks), 4)
+        self.assertEqual(player.tick(), (None, None))
+
+    def test_tick_before_start_or_without_frames(self):
+        self.assertEqual(FramePlayer(FrameSchedule([100])).tick(), (None, None))
+        player = FramePlayer(FrameSchedule([]), clock=VirtualClock())
+        player.start()
+        self.assertEqual(player.tick(), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Acceptance rule of RecognizerChain with mock backends (no audio, no network)
+The local mock is configured like the shipped SphinxBackend: a fixed
+confidence below the chain's threshold. A faster Sphinx answer must not beat
+a confident Google one, but is taken as soon as no remote answer can come.
+
+Run: python -m pytest tests   (or python -m unittest discover tests)
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recognizers import (DEFAULT_MIN_CONFIDENCE, SPHINX_CONFIDENCE, BackendUnavailable,  # noqa: E402
+                         NetworkState, RecognitionResult, RecognizerBackend, RecognizerChain)
+
+
+class MockBackend(RecognizerBackend):
+    """Answers `text` at `confidence` after `latency` seconds; fail=True raises BackendUnavailable."""
+
+    def __init__(self, name, remote, latency, confidence, text=None, fail=False):
+        self.name = name
+        self.remote = remote
+        self.latency = latency
+        self.confidence = confidence
+        self.text = text if text is not None else name
+        self.fail = fail
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise BackendUnavailable("network unreachable")
+        if not self.text:
+            return None
+        return RecognitionResult(self.text, self.confidence, self.name)
+
+
+def google(latency=0.2, confidence=0.9, **kwargs):
+    return MockBackend("google", True, latency, confidence, **kwargs)
+
+
+def sphinx(latency=0.01):
+    return MockBackend("sphinx", False, latency, SPHINX_CONFIDENCE)
+
+
+class RecognizerChainTest(unittest.TestCase):
+
+    def chain(self, backends, mode="race", network=None):
+        return RecognizerChain(backends, mode=mode, min_confidence=DEFAULT_MIN_CONFIDENCE,
+                               timeout=5.0, network=network or NetworkState())
+
+    def test_sphinx_is_below_the_threshold(self):
+        self.assertLess(SPHINX_CONFIDENCE, DEFAULT_MIN_CONFIDENCE)
+
+    def test_faster_sphinx_loses_to_confident_google(self):
+        result = self.chain([google(), sphinx()]).recognize(b"audio")
+        self.assertEqual(result.backend, "google")
+
+    def test_sphinx_taken_once_google_fails(self):
+        start = time.monotonic()
+        result = self.chain([google(latency=0.05, fail=True), sphinx()]).recognize(b"audio")
+        self.assertEqual(result.backend, "sphinx")
+        self.assertLess(time.monotonic() - start, 1.0)  # not the 5s timeout
+
+    def test_sphinx_taken_once_google_understood_nothing(self):
+        result = self.chain([google(latency=0.05, text=""), sphinx()]).recognize(b"audio")
+        self.assertEqual(result.backend, "sphinx")
+
+    def test_sphinx_answers_alone_while_backing_off(self):
+        network = NetworkState(initial_backoff=60.0)
+        network.record_failure()
+        remote = google(latency=1.0)
+        start = time.monotonic()
+        result = self.chain([remote, sphinx()], network=network).recognize(b"audio")
+        self.assertEqual(result.backend, "sphinx")
+        self.assertEqual(remote.calls, 0)
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_unconfident_google_still_beats_nothing(self):
+        result = self.chain([google(latency=0.05, confidence=0.6, text="hello"),
+                             MockBackend("sphinx", False, 0.01, SPHINX_CONFIDENCE, text="")]).recognize(b"audio")
+        self.assertEqual(result.text, "hello")
+
+    def test_sequential_tries_sphinx_only_after_google(self):
+        local = sphinx()
+        result = self.chain([google(latency=0.01), local], mode="sequential").recognize(b"audio")
+        self.assertEqual(result.backend, "google")
+        self.assertEqual(local.calls, 0)
+
+    def test_chain_is_reusable_across_utterances(self):
+        chain = self.chain([google(latency=0.01), sphinx()])
+        threads_before = threading.active_count()
+        for _ in range(5):
+            self.assertEqual(chain.recognize(b"audio").backend, "google")
+        self.assertLessEqual(threading.active_count(), threads_before + 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+"""
+Pipelined voice loop for the desktop app
+A capture thread keeps listening while a worker pool recognizes earlier
+utterances; recognized text is planned and pushed, in the order it was
+spoken, onto a bounded playback queue that the UI thread drains. Each stage
+records its latency so slow recognizers or a backed-up player are visible.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+STOP = object()  # sentinel placed on the playback queue when the pipeline ends
+
+
+class Utterance:
+    """One captured phrase and the timestamps of its trip through the pipeline."""
+    __slots__ = ('seq', 'audio', 'text', 'plan', 'captured_at', 'recognize_started_at',
+                 'recognized_at', 'queued_at', 'played_at')
+
+    def __init__(self, seq, audio):
+        self.seq = seq
+        self.audio = audio
+        self.text = None
+        self.plan = None
+        self.captured_at = time.monotonic()
+        self.recognize_started_at = None
+        self.recognized_at = None
+        self.queued_at = None
+        self.played_at = None
+
+    def latencies(self):
+        """Per-stage latency in ms (stages that have not happened yet are omitted)."""
+        spans = {
+            'recognize_wait': (self.captured_at, self.recognize_started_at),
+            'recognize': (self.recognize_started_at, self.recognized_at),
+            'order_wait': (self.recognized_at, self.queued_at),
+            'playback_wait': (self.queued_at, self.played_at),
+            'end_to_end': (self.captured_at, self.played_at),
+        }
+        return {name: round((end - start) * 1000, 1)
+                for name, (start, end) in spans.items() if start is not None and end is not None}
+
+
+class StageStats:
+    """Collects per-stage latencies across utterances."""
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, utterance):
+        with self._lock:
+            for stage, ms in utterance.latencies().items():
+                self._samples.setdefault(stage, []).append(ms)
+
+    def summary(self):
+        with self._lock:
+            result = {}
+            for stage, values in self._samples.items():
+                ordered = sorted(values)
+                result[stage] = {
+                    'count': len(ordered),
+                    'p50_ms': ordered[len(ordered) // 2],
+                    'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max_ms': ordered[-1],
+                }
+            return result
+
+
+class VoicePipeline:
+    """capture thread -> recognizer pool -> in-order sequencer -> bounded playback queue.
+
+    listen() blocks until a phrase was captured and returns audio (or None on
+    a timeout); recognize(audio) returns text or None; plan(text) turns text
+    into whatever the player consumes. Saying stop_word ends the pipeline.
+    """
+
+    def __init__(self, listen, recognize, plan, workers=2, max_pending=4,
+                 playback_size=8, stop_word="goodbye"):
+        self.listen = listen
+        self.recognize = recognize
+        self.plan = plan
+        self.stop_word = stop_word
+        self.stats = StageStats()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="recognizer")
+        self._pending = queue.Queue(maxsize=max_pending)      # (utterance, future) in capture order
+        self._playback = queue.Queue(maxsize=playback_size)   # planned utterances for the UI
+        self._stop = threading.Event()
+        self._threads = []
+        self._seq = 0
+
+    # --- stages ---
+    def _recognize(self, utterance):
+        utterance.recognize_started_at = time.monotonic()
+        try:
+            text = self.recognize(utterance.audio)
+            utterance.text = text.lower().strip() if text else None
+            if utterance.text and utterance.text != self.stop_word:
+                utterance.plan = self.plan(utterance.text)
+        finally:
+            utterance.recognized_at = time.monotonic()
+            utterance.audio = None  # release the audio buffer early
+        return utterance
+
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            try:
+                audio = self.listen()
+            except Exception as e:
+                print("Listen error:", e)
+                continue
+            if audio is None or self._stop.is_set():
+                continue
+            self._seq += 1
+            utterance = Utterance(self._seq, audio)
+            try:
+                future = self._executor.submit(self._recognize, utterance)
+            except RuntimeError:
+                break  # executor shut down by stop()
+            self._put(self._pending, (utterance, future))
+
+    def _sequence_loop(self):
+        """Hand recognized utterances to the player in the order they were spoken."""
+        while not self._stop.is_set():
+            try:
+                utterance, future = self._pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            try:
+                future.result()
+            except Exception as e:
+                print("Recognition error:", e)
+                continue
+            if not utterance.text:
+                continue
+            print("You said:", utterance.text)
+            if utterance.text == self.stop_word:
+                print("Exiting voice loop.")
+                self.stop()
+                break
+            utterance.queued_at = time.monotonic()
+            self._put(self._playback, utterance)
+
+    def _put(self, q, item):
+        # bounded queues apply backpressure, but never block past stop()
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    # --- control ---
+    def start(self):
+        for target, name in ((self._capture_loop, "capture"), (self._sequence_loop, "sequencer")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        # make sure the UI thread wakes up even if the playback queue is full
+        while True:
+            try:
+                self._playback.put_nowait(STOP)
+                break
+            except queue.Full:
+                try:
+                    self._playback.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def join(self, timeout=None):
+        """Wait for the capture and sequencer threads to exit (call from the UI thread)."""
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    @property
+    def running(self):
+        return not self._stop.is_set()
+
+    def next_item(self, timeout=0.05):
+        """Called from the UI thread: the next utterance to play, STOP, or None if nothing yet."""
+        try:
+            return self._playback.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def played(self, utterance):
+        """Mark an utterance as started on screen and record its stage latencies."""
+        utterance.played_at = time.monotonic()
+        self.stats.add(utterance)
+        print(f"Latency #{utterance.seq}:", utterance.latencies())
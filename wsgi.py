@@ -0,0 +1,30 @@
+"""
+Production WSGI entry point for the ISL Converter API
+Imports the Flask app with its asset index fully built and every content hash
+computed, so a pre-forking server (gunicorn --preload) shares one warm index
+with all workers instead of each worker scanning the asset folders.
+
+Linux/macOS:  gunicorn -c gunicorn.conf.py wsgi:app
+Windows:      python wsgi.py   (multi-threaded waitress server)
+"""
+
+import os
+
+from app import app, asset_index
+
+# Hash every asset now (in the master process when preloaded)
+asset_index.warm()
+
+application = app  # conventional WSGI name
+
+if __name__ == '__main__':
+    try:
+        from waitress import serve
+    except ImportError:
+        raise SystemExit("waitress is not installed: pip install -r requirements-prod.txt "
+                         "(or use gunicorn -c gunicorn.conf.py wsgi:app on Linux/macOS)")
+    host = os.environ.get('ISL_HOST', '0.0.0.0')
+    port = int(os.environ.get('ISL_PORT', '5000'))
+    threads = int(os.environ.get('ISL_THREADS', '16'))
+    print(f"Serving ISL Converter API on http://{host}:{port} ({threads} threads)")
+    serve(app, host=host, port=port, threads=threads)